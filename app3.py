@@ -6,12 +6,41 @@
 
 import streamlit as st
 import pandas as pd
-import datetime
+import json
 import os
-import unicodedata
-import re
-import difflib
-import plotly.express as px
+import uuid
+
+from indicadores import diagnostico
+from indicadores.agregados import aggregate_results, category_summary
+from indicadores.apresentacao import icon_for_innovation, illustration_for_innovation
+from indicadores.catalogo import LazyCatalog, sources_signature
+from indicadores.comparacao import (
+    COMPARISON_COLUMNS,
+    SCORE_COLUMN,
+    SEM_CATEGORIA,
+    comparison_matrix,
+    composite_scores,
+)
+from indicadores.config import (
+    ASSETS_DIR,
+    CATALOG_PATHS,
+    CATALOG_SNAPSHOT,
+    DIAGNOSTICS_LOG,
+    EXPORT_DIR,
+    LOGOS,
+    MAPPING_CACHE,
+    RESULTS_DB,
+    RESULTS_FILE,
+    RESULTS_HISTORY,
+)
+from indicadores.escrita import ResultsWriter
+from indicadores.exportacao import EXPORT_FORMATS, Exportador, available_formats
+from indicadores.formulario import FormularioSessao
+from indicadores.recursos import AssetCache
+from indicadores.graficos import series_plan
+from indicadores.resultados import make_result_records, open_results_store
+from indicadores.tags import query_tags, split_tags
+from indicadores.validacao import valida_lote, valida_valor
 
 # =========================
 # CONFIGURAÇÕES GERAIS
@@ -25,16 +54,21 @@ BRAND_PRIMARY = "#184868"   # azul petróleo
 BRAND_SECONDARY = "#6a9739" # verde oliva
 BRAND_ACCENT = "#f0b323"    # amarelo suave
 
-# Caminhos dos arquivos (ajuste se necessário no seu ambiente local)
-PATH_INO_TAGS = r"C:\Users\User\Formulario3\InoDescTagsEng.xlsx"
-PATH_IND_META = r"C:\Users\User\Formulario3\IndDescMensCat.xlsx"
-PATH_LINK_INV_IND = r"C:\Users\User\Formulario3\Inovação_Ind.xlsx"
-PATH_IND_REF = r"C:\Users\User\Formulario3\indicadores_classificados_114.xlsx"
-RESULTS_FILE = r"C:\Users\User\Formulario3\Resultados_Inovacoes.xlsx"
+# Nº máximo de registos mostrados na tabela da Página 4, e as suas colunas
+MAX_TABLE_ROWS = 1000
+TABLE_COLUMNS = [
+    "Inovação",
+    "Categoria",
+    "Indicador (PT)",
+    "Indicador (modelo/ref)",
+    "Valor Normalizado",
+    "Mensuração (modelo)",
+    "Mensuração Referência",
+]
+
+# Nº de cartões de indicadores por página no formulário da Página 3
+CARDS_PER_PAGE = 10
 
-# Logos
-LOGO_CETRAD = r"C:\Users\User\Formulario3\cetrad.png"
-LOGO_VINEWINE = r"C:\Users\User\Formulario3\vinewine.png"
 
 # =========================
 # ESTILO (CSS)
@@ -131,203 +165,48 @@ st.markdown(
 # FUNÇÕES AUXILIARES
 # =========================
 
+@st.cache_resource
+def get_assets() -> AssetCache:
+    """Logos e ilustrações redimensionadas, em memória (sem leituras por execução)."""
+    assets = AssetCache(LOGOS, ASSETS_DIR)
+    assets.preload()
+    return assets
+
 def show_logos_footer():
     """Mostra as duas logos no rodapé de cada página."""
     st.markdown('<div class="footer-logos">', unsafe_allow_html=True)
     col_l, col_r = st.columns(2)
-    with col_l:
-        if os.path.exists(LOGO_CETRAD):
-            st.image(LOGO_CETRAD, width=150)
-    with col_r:
-        if os.path.exists(LOGO_VINEWINE):
-            st.image(LOGO_VINEWINE, width=150)
+    for col, nome in ((col_l, "logo_cetrad"), (col_r, "logo_vinewine")):
+        logo = get_assets().get(nome)
+        if logo is not None:
+            with col:
+                st.image(logo.dados, width=150)
     st.markdown(
         '<div class="footer-text">Smart Green Innovation Indicators – CETRAD & Vine&Wine • Desenvolvido por Cibele</div>',
         unsafe_allow_html=True,
     )
 
-def normaliza_num(texto: str) -> str:
-    if texto is None:
-        return ""
-    t = str(texto).strip().replace(",", ".")
-    return t
-
-def infere_tipo(metrica: str) -> str:
-    """Classifica a métrica para validação numérica."""
-    if not isinstance(metrica, str):
-        return "livre"
-    m = metrica.lower()
-    if "%" in m or "percent" in m:
-        return "percent"
-    if "€" in m or "eur" in m or "euro" in m or "r$" in m or "$" in m:
-        return "money"
-    if any(u in m for u in ["tco2", "t co2", "t co₂", "t co2e", " t", "ton", "kg", "kwh", "m³", "m3", " l", " l/"]):
-        return "nonneg"
-    if "hora" in m or m.strip() == "h" or " h/" in m:
-        return "nonneg"
-    if "nº" in m or "num" in m or "publica" in m or "patent" in m or "contagem" in m:
-        return "integer"
-    return "nonneg"
-
-def valida_valor(valor_texto: str, metrica: str, fracao_percent=False):
-    """
-    Retorna (ok, valor_normalizado, msg_erro).
-    - percent: 0..100 (ou 0..1 se fracao_percent=True, converte para %)
-    - money/nonneg: >= 0
-    - integer: inteiro >= 0
-    """
-    tipo = infere_tipo(metrica)
-    t = normaliza_num(valor_texto)
-    if t == "":
-        return False, None, "Obrigatório preencher um valor."
-    try:
-        if tipo == "percent":
-            x = float(t)
-            if fracao_percent:
-                if 0 <= x <= 1:
-                    return True, x * 100, ""
-                return False, None, "Para fração, use 0–1 (ex.: 0.25 para 25%)."
-            else:
-                if 0 <= x <= 100:
-                    return True, x, ""
-                return False, None, "Percentual deve estar entre 0 e 100."
-        elif tipo == "money":
-            x = float(t)
-            if x < 0:
-                return False, None, "Valor monetário deve ser ≥ 0."
-            return True, x, ""
-        elif tipo == "integer":
-            x = int(float(t))
-            if x < 0:
-                return False, None, "Deve ser inteiro ≥ 0."
-            return True, x, ""
-        else:
-            x = float(t)
-            if x < 0:
-                return False, None, "Valor deve ser ≥ 0."
-            return True, x, ""
-    except Exception:
-        return False, None, "Formato inválido. Utilize apenas números (ponto ou vírgula)."
-
-@st.cache_data
-def load_inov_tags(path: str) -> pd.DataFrame:
-    """Carrega a tabela de inovações, tags e descrição."""
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Arquivo não encontrado: {path}")
-    df = pd.read_excel(path)
-    for col in ["Inovação", "Descrição", "Tags"]:
-        if col not in df.columns:
-            raise ValueError(f"A planilha InoDescTagsEng.xlsx deve conter a coluna '{col}'.")
-    return df
-
-@st.cache_data
-def load_ind_meta(path: str) -> pd.DataFrame:
-    """Carrega a tabela de metadados de indicadores (modelo do App3)."""
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Arquivo não encontrado: {path}")
-    df = pd.read_excel(path)
-    for col in ["Indicadores", "Descrição", "Mensuração", "Categoria"]:
-        if col not in df.columns:
-            raise ValueError(f"A planilha IndDescMensCat.xlsx deve conter as colunas 'Indicadores', 'Descrição', 'Mensuração', 'Categoria'.")
-    return df
-
-@st.cache_data
-def load_ind_ref(path: str) -> pd.DataFrame:
-    """Carrega a tabela de métricas de referência (indicadores_classificados_114.xlsx)."""
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Arquivo não encontrado: {path}")
-    df = pd.read_excel(path)
-    for col in ["Indicadores", "Descrição", "Mensuração"]:
-        if col not in df.columns:
-            raise ValueError("A planilha indicadores_classificados_114.xlsx deve conter as colunas 'Indicadores', 'Descrição', 'Mensuração'.")
-    df = df.rename(
-        columns={
-            "Descrição": "Descricao_Ref",
-            "Mensuração": "Mensuracao_Ref",
-            "Categoria": "Categoria_Ref" if "Categoria" in df.columns else "Categoria_Ref"
-        }
-    )
-    return df
-
-@st.cache_data
-def load_link_inv_ind(path: str) -> pd.DataFrame:
-    """Carrega a tabela que liga Inovação ↔ Indicador."""
-    if not os.path.exists(path):
-        raise FileNotFoundError(f"Arquivo não encontrado: {path}")
-    df = pd.read_excel(path)
-    for col in ["Inovação", "Indicador"]:
-        if col not in df.columns:
-            raise ValueError("A planilha Inovação_Ind.xlsx deve conter as colunas 'Inovação' e 'Indicador'.")
-    df["Inovação"] = df["Inovação"].ffill()
-    return df
-
-def normalize_key(s: str) -> str:
-    """Normaliza texto para comparação (sem acentos, minúsculo, sem pontuação)."""
-    s = unicodedata.normalize("NFKD", str(s))
-    s = "".join(ch for ch in s if not unicodedata.combining(ch))
-    s = s.lower()
-    s = re.sub(r"[^a-z0-9]+", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
-def extract_abbrev_token(name: str):
-    """Extrai um token de abreviação entre parênteses, ex.: (ROI), (PBP), (LCC)."""
-    m = re.search(r"\(([^)]+)\)", str(name))
-    if m:
-        content = m.group(1).strip()
-        token = re.split(r"[ /]", content)[0].strip()
-        if len(token) >= 2:
-            return token
-    return None
-
-@st.cache_data
-def build_indicator_mapping(df_link: pd.DataFrame, df_meta: pd.DataFrame) -> pd.DataFrame:
-    """
-    Constrói uma tabela de mapeamento entre:
-    - Indicador (PT) da Inovação_Ind.xlsx
-    - Indicadores (EN/PT misto) da IndDescMensCat.xlsx
-    Usa abreviações (ROI, PBP, LCC...) e similaridade.
-    """
-    pt_list = df_link["Indicador"].dropna().astype(str).unique().tolist()
-    en_list = df_meta["Indicadores"].dropna().astype(str).unique().tolist()
-
-    # mapa de abreviações
-    meta_abbrev = {}
-    for name in en_list:
-        ab = extract_abbrev_token(name)
-        if ab:
-            meta_abbrev.setdefault(ab, []).append(name)
-
-    # mapa de texto normalizado
-    meta_norm_map = {normalize_key(n): n for n in en_list}
-
-    mapping_rows = []
-    for pt_name in pt_list:
-        ab = extract_abbrev_token(pt_name)
-        chosen = None
-        method = None
-
-        # 1) tentar por abreviação
-        if ab and ab in meta_abbrev and len(meta_abbrev[ab]) == 1:
-            chosen = meta_abbrev[ab][0]
-            method = "abbrev"
-
-        # 2) se ainda não casou, tentar similaridade de texto
-        if chosen is None:
-            n = normalize_key(pt_name)
-            candidates = difflib.get_close_matches(n, list(meta_norm_map.keys()), n=1, cutoff=0.8)
-            if candidates:
-                chosen = meta_norm_map[candidates[0]]
-                method = "similar"
-
-        mapping_rows.append(
-            {
-                "Indicador_PT": pt_name,
-                "Indicador_EN": chosen,
-                "Metodo_Mapeamento": method if chosen is not None else "nenhum",
-            }
-        )
-    return pd.DataFrame(mapping_rows)
+@st.cache_resource
+def get_results_store(path: str):
+    """Abre o armazenamento de resultados (importa o Excel antigo na primeira vez)."""
+    store = open_results_store(path, history=RESULTS_HISTORY)
+    if hasattr(store, "import_excel_once"):
+        store.import_excel_once(RESULTS_FILE)
+    return store
+
+@st.cache_resource
+def get_results_writer(path: str) -> ResultsWriter:
+    """Escritor único partilhado por todas as sessões do servidor."""
+    return ResultsWriter(get_results_store(path))
+
+@st.cache_resource
+def get_exporter(path: str) -> Exportador:
+    """Exportações em segundo plano, partilhadas por todas as sessões do servidor."""
+    return Exportador(get_results_store(path), EXPORT_DIR)
+
+def read_export_file(path: str) -> bytes:
+    with open(path, "rb") as fh:
+        return fh.read()
 
 def set_page(p: int):
     st.session_state.current_page = p
@@ -337,68 +216,47 @@ def init_session_state():
         st.session_state.current_page = 1
     if "selected_inovacao" not in st.session_state:
         st.session_state.selected_inovacao = None
-    if "selected_tag" not in st.session_state:
-        st.session_state.selected_tag = None
-    if "metric_values" not in st.session_state:
-        st.session_state.metric_values = {}
-    if "metric_errors" not in st.session_state:
-        st.session_state.metric_errors = {}
+    if "selected_tags" not in st.session_state:
+        st.session_state.selected_tags = []
+    if "formulario" not in st.session_state:
+        st.session_state.formulario = FormularioSessao()
     if "project_name" not in st.session_state:
         st.session_state.project_name = ""
+    if "sessao_id" not in st.session_state:
+        st.session_state.sessao_id = uuid.uuid4().hex[:12]
 
 init_session_state()
 
+# tempos das etapas desta execução (log rotativo + painel de diagnóstico)
+rerun = diagnostico.start_rerun(st.session_state.sessao_id, DIAGNOSTICS_LOG)
+
 # =========================
 # CARREGAMENTO DAS TABELAS
 # =========================
-try:
-    df_inov_tags = load_inov_tags(PATH_INO_TAGS)
-except Exception as e:
-    st.error(f"Não foi possível carregar a tabela de Inovações (InoDescTagsEng.xlsx): {e}")
-    st.stop()
-
-try:
-    df_ind_meta = load_ind_meta(PATH_IND_META)
-except Exception as e:
-    st.error(f"Não foi possível carregar a tabela de Indicadores (IndDescMensCat.xlsx): {e}")
-    st.stop()
-
-try:
-    df_ind_ref = load_ind_ref(PATH_IND_REF)
-except Exception as e:
-    st.error(f"Não foi possível carregar a tabela de métricas de referência (indicadores_classificados_114.xlsx): {e}")
-    st.stop()
+@st.cache_resource(max_entries=2)
+def get_catalog(assinatura: tuple) -> LazyCatalog:
+    """
+    Catálogo partilhado pelas sessões, carregado a pedido: cada página só lê
+    as tabelas de que precisa (snapshot binário, recompilado se as planilhas
+    mudarem).
+    """
+    return LazyCatalog(CATALOG_PATHS, CATALOG_SNAPSHOT, MAPPING_CACHE)
 
-try:
-    df_link = load_link_inv_ind(PATH_LINK_INV_IND)
-except Exception as e:
-    st.error(f"Não foi possível carregar a tabela de ligação Inovação_Ind.xlsx: {e}")
-    st.stop()
+catalogo = get_catalog(sources_signature(CATALOG_PATHS))
 
-df_map_ind = build_indicator_mapping(df_link, df_ind_meta)
+def activate_innovation(inovacao: str):
+    """Torna `inovacao` a atual no formulário; as inovações deixadas perdem valores e campos."""
+    for k in st.session_state.formulario.ativa(inovacao):
+        st.session_state.pop(k, None)
 
-# =========================
-# Ícone e imagem por inovação
-# =========================
-def icon_for_innovation(name: str) -> str:
-    n = name.lower()
-    if "clima" in n or "climate" in n:
-        return "🌱"
-    if "vine" in n or "wine" in n:
-        return "🍇"
-    if "energia" in n or "energy" in n:
-        return "⚡"
-    if "agua" in n or "água" in n or "water" in n:
-        return "💧"
-    if "digital" in n or "data" in n or "smart" in n:
-        return "💻"
-    if "carbon" in n or "co2" in n:
-        return "🌍"
-    return "💡"
-
-def image_url_for_innovation(name: str) -> str:
-    slug = name.replace(" ", "-")
-    return f"https://source.unsplash.com/320x200/?innovation,{slug}"
+def catalog_table(nome: str):
+    """Tabela/estrutura do catálogo; se não puder ser carregada, mostra o erro e pára."""
+    try:
+        with diagnostico.span(f"catalogo_{nome}"):
+            return catalogo.get(nome)
+    except Exception as e:
+        st.error(f"Não foi possível carregar o catálogo de inovações e indicadores: {e}")
+        st.stop()
 
 # =========================
 # PÁGINA 1 – ABERTURA E SELEÇÃO
@@ -416,15 +274,11 @@ def page_1():
 
     st.markdown("### 1️⃣ Escolha a inovação que pretende analisar")
 
+    df_inov_tags = catalog_table("inov_tags")
+    tag_index = catalog_table("indice_tags")
     inovacoes = sorted(df_inov_tags["Inovação"].astype(str).unique().tolist())
 
-    # Tags
-    all_tags_series = df_inov_tags["Tags"].astype(str).fillna("")
-    all_tags = []
-    for t in all_tags_series:
-        parts = [p.strip() for p in re.split(r"[;,]", t) if p.strip()]
-        all_tags.extend(parts)
-    tags_unicas = sorted(set(all_tags))
+    tags_unicas = list(tag_index.keys())
 
     col_left, col_right = st.columns(2)
     with col_left:
@@ -436,27 +290,46 @@ def page_1():
         )
     with col_right:
         st.markdown("**Selecionar por Tag**")
-        sel_tag = st.selectbox(
-            "Tag:",
-            options=["— opcional —"] + tags_unicas,
-            index=0,
+        sel_tags = st.multiselect(
+            "Tags (opcional):",
+            options=tags_unicas,
+        )
+        modo_tags = st.radio(
+            "Combinar tags:",
+            options=["Todas (E)", "Qualquer (OU)"],
+            horizontal=True,
         )
 
     selected_inovacao = None
-    selected_tag = None
+    selected_tags = []
 
     if sel_inov != "— selecione uma inovação —":
         selected_inovacao = sel_inov
 
-    if sel_tag != "— opcional —":
-        selected_tag = sel_tag
-        mask = df_inov_tags["Tags"].astype(str).str.contains(selected_tag, case=False, na=False)
-        rel = df_inov_tags[mask]
-        if len(rel) > 0:
-            selected_inovacao = str(rel.iloc[0]["Inovação"])
+    if sel_tags:
+        selected_tags = sel_tags
+        rel = query_tags(tag_index, sel_tags, mode="AND" if modo_tags.startswith("Todas") else "OR")
+        if len(rel) == 0:
+            st.info("Nenhuma inovação tem a combinação de tags selecionada.")
+        elif len(rel) == 1:
+            selected_inovacao = rel[0]
+        else:
+            st.markdown(f"**{len(rel)} inovações com as tags selecionadas:**")
+            selected_inovacao = st.radio(
+                "Inovações encontradas:",
+                options=rel,
+                index=rel.index(selected_inovacao) if selected_inovacao in rel else 0,
+                label_visibility="collapsed",
+            )
 
     st.session_state.selected_inovacao = selected_inovacao
-    st.session_state.selected_tag = selected_tag
+    st.session_state.selected_tags = selected_tags
+
+    # com uma inovação escolhida, a vista dos indicadores (mapeamento e
+    # junções) começa a ser preparada enquanto o utilizador lê as páginas 1–2
+    if selected_inovacao:
+        activate_innovation(selected_inovacao)
+        catalogo.prefetch("vista")
 
     # cartão da inovação
     if selected_inovacao:
@@ -498,7 +371,7 @@ def page_1():
                         unsafe_allow_html=True,
                     )
                     pills = ""
-                    for t in [p.strip() for p in re.split(r"[;,]", tags_text) if p.strip()]:
+                    for t in split_tags(tags_text):
                         pills += f"<span class='pill'>#{t}</span>"
                     st.markdown(pills, unsafe_allow_html=True)
             st.markdown("</div>", unsafe_allow_html=True)
@@ -527,7 +400,9 @@ def page_2():
         return
 
     st.markdown("### 2️⃣ Descrição detalhada da inovação")
+    catalogo.prefetch("vista")
 
+    df_inov_tags = catalog_table("inov_tags")
     rel_inv = df_inov_tags[df_inov_tags["Inovação"].astype(str) == selected_inovacao]
     if len(rel_inv) == 0:
         st.error("Não foi possível localizar a inovação na tabela InoDescTagsEng.")
@@ -541,7 +416,7 @@ def page_2():
     eng = str(row.get("Engajamento", ""))
     tags_text = str(row["Tags"])
     icon = icon_for_innovation(selected_inovacao)
-    img_url = image_url_for_innovation(selected_inovacao)
+    ilustracao = get_assets().get(illustration_for_innovation(selected_inovacao))
 
     st.markdown('<div class="card">', unsafe_allow_html=True)
     c1, c2 = st.columns([0.75, 0.25])
@@ -566,11 +441,11 @@ def page_2():
                 unsafe_allow_html=True,
             )
             pills = ""
-            for t in [p.strip() for p in re.split(r"[;,]", tags_text) if p.strip()]:
+            for t in split_tags(tags_text):
                 pills += f"<span class='pill'>#{t}</span>"
             st.markdown(pills, unsafe_allow_html=True)
     with c2:
-        st.image(img_url, caption="Inovação (imagem ilustrativa)", use_container_width=True)
+        st.image(ilustracao.dados, caption="Inovação (imagem ilustrativa)", use_container_width=True)
 
     st.markdown("</div>", unsafe_allow_html=True)
 
@@ -591,6 +466,99 @@ def page_2():
 # =========================
 # PÁGINA 3 – MÉTRICAS E TOMADA DE DECISÃO
 # =========================
+@st.fragment
+def indicator_card(selected_inovacao: str, ind_id: int, row: pd.Series):
+    """Cartão de um indicador; editar o valor só volta a executar este cartão."""
+    indicador_pt = str(row["Indicador"])
+    indicador_en = str(row.get("Indicadores_EN", "")) if pd.notna(row.get("Indicadores_EN", "")) else ""
+    desc = str(row.get("Descrição", "")) if pd.notna(row.get("Descrição", "")) else ""
+    metr = str(row.get("Mensuração", "")) if pd.notna(row.get("Mensuração", "")) else ""
+    categ = str(row.get("Categoria", "")) if pd.notna(row.get("Categoria", "")) else ""
+
+    desc_ref = str(row.get("Descricao_Ref", "")) if pd.notna(row.get("Descricao_Ref", "")) else ""
+    metr_ref = str(row.get("Mensuracao_Ref", "")) if pd.notna(row.get("Mensuracao_Ref", "")) else ""
+
+    key_txt = f"val_{ind_id}"
+    key_frac = f"frac_{ind_id}"
+
+    st.markdown('<div class="card">', unsafe_allow_html=True)
+    c1, c2 = st.columns([0.72, 0.28])
+    with c1:
+        titulo = indicador_pt if indicador_pt and indicador_pt.lower() != "nan" else indicador_en
+        st.markdown(
+            f"<div class='card-header'>📊 {titulo}</div>",
+            unsafe_allow_html=True,
+        )
+
+        if desc:
+            st.markdown(
+                f"<p style='font-size:0.98rem; color:#34495e;'><b>Descrição (modelo da inovação):</b> {desc}</p>",
+                unsafe_allow_html=True,
+            )
+        if metr:
+            st.markdown(
+                f"<p style='font-size:0.95rem; color:#7f8c8d;'><b>Mensuração no modelo da inovação:</b><br>{metr}</p>",
+                unsafe_allow_html=True,
+            )
+
+        if metr_ref:
+            with st.expander("Ver métrica de referência oficial (114 indicadores)", expanded=False):
+                if desc_ref:
+                    st.markdown(
+                        f"<p style='font-size:0.95rem; color:#34495e;'><b>Descrição de referência:</b> {desc_ref}</p>",
+                        unsafe_allow_html=True,
+                    )
+                st.markdown(
+                    f"<p style='font-size:0.95rem; color:#7f8c8d;'><b>Mensuração / fórmula de referência:</b><br>{metr_ref}</p>",
+                    unsafe_allow_html=True,
+                )
+        else:
+            st.markdown(
+                "<p class='small-muted'>Sem métrica de referência explícita associada na tabela de 114 indicadores.</p>",
+                unsafe_allow_html=True,
+            )
+
+        if categ:
+            st.markdown(
+                f"<p style='font-size:0.9rem; color:#7f8c8d;'><b>Categoria (modelo da inovação):</b> {categ}</p>",
+                unsafe_allow_html=True,
+            )
+
+    with c2:
+        metr_lower = (metr or "").lower()
+        if "%" in metr_lower:
+            fr = st.toggle("Valor em fração (0–1)", key=key_frac)
+        else:
+            fr = False
+
+    valor_bruto = st.text_input(
+        f"Valor para '{titulo}':",
+        key=key_txt,
+        placeholder="ex.: 12,5  |  0.25  |  3500",
+    )
+
+    ok, val_norm, msg = valida_valor(valor_bruto, metr, fracao_percent=fr)
+    st.session_state.formulario.regista(
+        selected_inovacao, ind_id, valor_bruto, ok, val_norm, msg, campos=(key_txt, key_frac)
+    )
+    if ok:
+        st.markdown(
+            "<span style='color:#27ae60; font-size:0.9rem;'>✔ Valor válido</span>",
+            unsafe_allow_html=True,
+        )
+    elif valor_bruto.strip() != "":
+        st.markdown(
+            f"<span style='color:#c0392b; font-size:0.9rem;'>✖ {msg}</span>",
+            unsafe_allow_html=True,
+        )
+    else:
+        st.markdown(
+            "<span class='small-muted'>Preencha o valor para este indicador.</span>",
+            unsafe_allow_html=True,
+        )
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
 def page_3():
     selected_inovacao = st.session_state.get("selected_inovacao", None)
     if not selected_inovacao:
@@ -607,8 +575,10 @@ def page_3():
         value=st.session_state.project_name,
     ).strip()
 
-    inv_links = df_link[df_link["Inovação"].astype(str) == str(selected_inovacao)].copy()
-    if len(inv_links) == 0:
+    activate_innovation(selected_inovacao)
+    form = st.session_state.formulario
+    df_inv_inds = catalog_table("vista").get(str(selected_inovacao))
+    if df_inv_inds is None or len(df_inv_inds) == 0:
         st.warning("Não há indicadores associados a esta inovação na planilha Inovação_Ind.xlsx.")
         col_back, _ = st.columns([1, 3])
         with col_back:
@@ -617,33 +587,6 @@ def page_3():
         show_logos_footer()
         return
 
-    # juntar com mapeamento PT ↔ EN
-    df_inv = inv_links.merge(
-        df_map_ind,
-        left_on="Indicador",
-        right_on="Indicador_PT",
-        how="left",
-    )
-    df_inv["Indicadores_EN"] = df_inv["Indicador_EN"]
-
-    # merge com metadados do modelo (IndDescMensCat)
-    df_inv_inds = df_inv.merge(
-        df_ind_meta,
-        left_on="Indicadores_EN",
-        right_on="Indicadores",
-        how="left",
-        suffixes=("", "_modelo"),
-    )
-
-    # merge com métricas de referência (indicadores_classificados_114)
-    df_inv_inds = df_inv_inds.merge(
-        df_ind_ref,
-        left_on="Indicadores_EN",
-        right_on="Indicadores",
-        how="left",
-        suffixes=("", "_ref"),
-    )
-
     st.markdown(
         f"**Inovação selecionada:** `{selected_inovacao}` – preencha os valores dos indicadores abaixo."
     )
@@ -658,101 +601,60 @@ def page_3():
     # opcional: mostrar mapeamento técnico
     with st.expander("Ver mapeamento técnico Indicador (PT) → Indicadores (modelo/ref)", expanded=False):
         st.dataframe(
-            df_inv[["Indicador", "Indicadores_EN", "Metodo_Mapeamento"]],
+            df_inv_inds[["Indicador", "Indicadores_EN", "Metodo_Mapeamento"]],
             use_container_width=True,
         )
 
-    for i, row in df_inv_inds.iterrows():
-        indicador_pt = str(row["Indicador"])
-        indicador_en = str(row.get("Indicadores_EN", "")) if pd.notna(row.get("Indicadores_EN", "")) else ""
-        desc = str(row.get("Descrição", "")) if pd.notna(row.get("Descrição", "")) else ""
-        metr = str(row.get("Mensuração", "")) if pd.notna(row.get("Mensuração", "")) else ""
-        categ = str(row.get("Categoria", "")) if pd.notna(row.get("Categoria", "")) else ""
-
-        desc_ref = str(row.get("Descricao_Ref", "")) if pd.notna(row.get("Descricao_Ref", "")) else ""
-        metr_ref = str(row.get("Mensuracao_Ref", "")) if pd.notna(row.get("Mensuracao_Ref", "")) else ""
-
-        key_txt = f"val_{i}"
-        key_frac = f"frac_{i}"
-
-        st.markdown('<div class="card">', unsafe_allow_html=True)
-        c1, c2 = st.columns([0.72, 0.28])
-        with c1:
-            titulo = indicador_pt if indicador_pt and indicador_pt.lower() != "nan" else indicador_en
-            st.markdown(
-                f"<div class='card-header'>📊 {titulo}</div>",
-                unsafe_allow_html=True,
-            )
-
-            if desc:
-                st.markdown(
-                    f"<p style='font-size:0.98rem; color:#34495e;'><b>Descrição (modelo da inovação):</b> {desc}</p>",
-                    unsafe_allow_html=True,
-                )
-            if metr:
-                st.markdown(
-                    f"<p style='font-size:0.95rem; color:#7f8c8d;'><b>Mensuração no modelo da inovação:</b><br>{metr}</p>",
-                    unsafe_allow_html=True,
-                )
-
-            if metr_ref:
-                with st.expander("Ver métrica de referência oficial (114 indicadores)", expanded=False):
-                    if desc_ref:
-                        st.markdown(
-                            f"<p style='font-size:0.95rem; color:#34495e;'><b>Descrição de referência:</b> {desc_ref}</p>",
-                            unsafe_allow_html=True,
-                        )
-                    st.markdown(
-                        f"<p style='font-size:0.95rem; color:#7f8c8d;'><b>Mensuração / fórmula de referência:</b><br>{metr_ref}</p>",
-                        unsafe_allow_html=True,
-                    )
-            else:
-                st.markdown(
-                    "<p class='small-muted'>Sem métrica de referência explícita associada na tabela de 114 indicadores.</p>",
-                    unsafe_allow_html=True,
-                )
-
-            if categ:
-                st.markdown(
-                    f"<p style='font-size:0.9rem; color:#7f8c8d;'><b>Categoria (modelo da inovação):</b> {categ}</p>",
-                    unsafe_allow_html=True,
-                )
-
-        with c2:
-            metr_lower = (metr or "").lower()
-            if "%" in metr_lower:
-                fr = st.toggle("Valor em fração (0–1)", key=key_frac, value=False)
-            else:
-                fr = False
-
-        valor_bruto = st.text_input(
-            f"Valor para '{titulo}':",
-            key=key_txt,
-            placeholder="ex.: 12,5  |  0.25  |  3500",
+    # os valores de indicadores fora da página visível continuam na sessão
+    for i in df_inv_inds.index:
+        for k in (f"val_{i}", f"frac_{i}"):
+            if k in st.session_state:
+                st.session_state[k] = st.session_state[k]
+
+    # validação em bloco de todos os valores do formulário
+    with diagnostico.span("p3_validacao") as sp:
+        metricas = df_inv_inds["Mensuração"].where(df_inv_inds["Mensuração"].notna(), "").astype(str)
+        brutos = [st.session_state.get(f"val_{i}", "") for i in df_inv_inds.index]
+        validacoes = valida_lote(
+            brutos,
+            metricas,
+            [("%" in m.lower()) and bool(st.session_state.get(f"frac_{i}", False)) for i, m in metricas.items()],
         )
+        for i, bruto, (ok, val_norm, msg) in zip(df_inv_inds.index, brutos, validacoes.itertuples(index=False)):
+            form.regista(selected_inovacao, i, bruto, ok, val_norm, msg, campos=(f"val_{i}", f"frac_{i}"))
+        sp["linhas"] = len(df_inv_inds)
+
+    n_ok = int(validacoes["ok"].sum())
+    n_err = len(form.erros(selected_inovacao))
+    st.caption(
+        f"{n_ok} de {len(df_inv_inds)} indicadores com valor válido"
+        + (f" • {n_err} com erro" if n_err else "")
+    )
 
-        ok, val_norm, msg = valida_valor(valor_bruto, metr, fracao_percent=fr)
-        if ok:
-            st.session_state.metric_values[(selected_inovacao, i)] = val_norm
-            st.session_state.metric_errors.pop((selected_inovacao, i), None)
-            st.markdown(
-                "<span style='color:#27ae60; font-size:0.9rem;'>✔ Valor válido</span>",
-                unsafe_allow_html=True,
-            )
-        else:
-            if valor_bruto.strip() != "":
-                st.session_state.metric_errors[(selected_inovacao, i)] = msg
-                st.markdown(
-                    f"<span style='color:#c0392b; font-size:0.9rem;'>✖ {msg}</span>",
-                    unsafe_allow_html=True,
-                )
-            else:
-                st.markdown(
-                    "<span class='small-muted'>Preencha o valor para este indicador.</span>",
-                    unsafe_allow_html=True,
-                )
-
-        st.markdown("</div>", unsafe_allow_html=True)
+    # indicadores por categoria e por páginas
+    # (filtro sobre os códigos inteiros da coluna categórica)
+    cod_cat = df_inv_inds["Categoria"].cat.codes.to_numpy()
+    nomes_cat = df_inv_inds["Categoria"].cat.categories
+    opcoes_cat = {("(sem categoria)" if c < 0 else str(nomes_cat[c])): c for c in set(cod_cat.tolist())}
+    col_cat, col_pag = st.columns([0.7, 0.3])
+    with col_cat:
+        cat_sel = st.selectbox(
+            "Mostrar indicadores da categoria:",
+            ["(todas)"] + sorted(opcoes_cat),
+            key="p3_categoria",
+        )
+    visiveis = df_inv_inds.index if cat_sel == "(todas)" else df_inv_inds.index[cod_cat == opcoes_cat[cat_sel]]
+    n_paginas = max(1, -(-len(visiveis) // CARDS_PER_PAGE))
+    with col_pag:
+        pagina = st.selectbox("Página:", list(range(1, n_paginas + 1)), key="p3_pagina")
+    inicio = (pagina - 1) * CARDS_PER_PAGE
+    fim = min(inicio + CARDS_PER_PAGE, len(visiveis))
+    st.caption(f"Indicadores {inicio + 1}–{fim} de {len(visiveis)}")
+
+    with diagnostico.span("p3_cartoes") as sp:
+        for i in visiveis[inicio:fim]:
+            indicator_card(selected_inovacao, i, df_inv_inds.loc[i])
+        sp["linhas"] = fim - inicio
 
     st.markdown("----")
     col_back, col_process, col_next = st.columns([1, 1, 1])
@@ -763,59 +665,48 @@ def page_3():
     with col_process:
         if st.button("Processar e guardar resultados"):
             erros = []
-            registros = []
+            validos = []
+            valores, erros_form = form.valores(selected_inovacao), form.erros(selected_inovacao)
             for i, row in df_inv_inds.iterrows():
-                chave = (selected_inovacao, i)
                 indicador_pt = str(row["Indicador"])
                 indicador_en = str(row.get("Indicadores_EN", "")) if pd.notna(row.get("Indicadores_EN", "")) else ""
-                desc = str(row.get("Descrição", "")) if pd.notna(row.get("Descrição", "")) else ""
-                metr = str(row.get("Mensuração", "")) if pd.notna(row.get("Mensuração", "")) else ""
-                categ = str(row.get("Categoria", "")) if pd.notna(row.get("Categoria", "")) else ""
-                desc_ref = str(row.get("Descricao_Ref", "")) if pd.notna(row.get("Descricao_Ref", "")) else ""
-                metr_ref = str(row.get("Mensuracao_Ref", "")) if pd.notna(row.get("Mensuracao_Ref", "")) else ""
-
-                if chave in st.session_state.metric_errors:
-                    erros.append((indicador_pt or indicador_en, st.session_state.metric_errors[chave]))
+
+                if i in erros_form:
+                    erros.append((indicador_pt or indicador_en, erros_form[i]))
                     continue
-                if chave not in st.session_state.metric_values:
+                if i not in valores:
                     erros.append((indicador_pt or indicador_en, "Valor não preenchido."))
                     continue
-
-                registros.append(
-                    {
-                        "Projeto": st.session_state.project_name if st.session_state.project_name else "",
-                        "Inovação": selected_inovacao,
-                        "Indicador (PT)": indicador_pt,
-                        "Indicador (modelo/ref)": indicador_en,
-                        "Descrição (modelo)": desc,
-                        "Mensuração (modelo)": metr,
-                        "Categoria": categ,
-                        "Descrição Referência": desc_ref,
-                        "Mensuração Referência": metr_ref,
-                        "Valor Normalizado": st.session_state.metric_values[chave],
-                        "Data/Hora": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    }
-                )
+                validos.append(i)
 
             if erros:
                 st.error("Existem valores inválidos ou em falta. Corrija antes de finalizar.")
                 df_erros = pd.DataFrame(erros, columns=["Indicador", "Problema"])
                 st.dataframe(df_erros, use_container_width=True)
-            elif not registros:
+            elif not validos:
                 st.warning("Nenhum valor foi preenchido para esta inovação.")
             else:
-                novo = pd.DataFrame(registros)
-                if os.path.exists(RESULTS_FILE):
-                    try:
-                        antigo = pd.read_excel(RESULTS_FILE)
-                        combinado = pd.concat([antigo, novo], ignore_index=True)
-                    except Exception:
-                        combinado = novo.copy()
+                novo = make_result_records(
+                    df_inv_inds.loc[validos],
+                    [valores[i] for i in validos],
+                    st.session_state.project_name,
+                    selected_inovacao,
+                )
+                try:
+                    with diagnostico.span("p3_gravacao") as sp:
+                        conf = get_results_writer(RESULTS_DB).submit(novo).result(timeout=60)
+                        sp["linhas"] = len(novo)
+                except Exception as e:
+                    st.error(f"Não foi possível guardar os resultados: {e}")
                 else:
-                    combinado = novo.copy()
-                combinado.to_excel(RESULTS_FILE, index=False)
-                st.success(f"✅ Resultados processados e guardados em '{RESULTS_FILE}'")
-                st.dataframe(novo, use_container_width=True)
+                    if conf.registos == 0:
+                        st.info(f"Os {len(novo)} valores já estavam guardados em '{RESULTS_DB}'; nada foi alterado.")
+                    else:
+                        st.success(
+                            f"✅ {conf.registos} resultados processados e guardados em '{RESULTS_DB}' "
+                            f"(registos {conf.primeiro_id}–{conf.ultimo_id}, {conf.gravado_em})"
+                        )
+                    st.dataframe(novo, use_container_width=True)
 
     with col_next:
         if st.button("Ir para Página 4 – Resultados e Gráficos"):
@@ -826,19 +717,148 @@ def page_3():
 # =========================
 # PÁGINA 4 – RESULTADOS E GRÁFICOS (Plotly)
 # =========================
+def category_charts(agg: pd.DataFrame) -> tuple:
+    """Médias e contagens por categoria e as especificações (JSON) dos dois gráficos."""
+    # o Plotly só é importado quando há gráficos a construir
+    import plotly.express as px
+
+    df_mean, df_count = category_summary(agg)
+    fig_mean = fig_count = None
+    if not df_mean.empty:
+        fig = px.bar(
+            df_mean,
+            x="Categoria",
+            y="Média por Categoria",
+            title="Média dos valores por categoria",
+        )
+        fig.update_layout(xaxis_title="Categoria", yaxis_title="Média dos valores")
+        fig_mean = fig.to_json()
+    if not df_count.empty:
+        fig = px.bar(
+            df_count,
+            x="Categoria",
+            y="Nº de indicadores preenchidos",
+            title="Distribuição de indicadores preenchidos por categoria",
+        )
+        fig.update_layout(xaxis_title="Categoria", yaxis_title="Nº de indicadores preenchidos")
+        fig_count = fig.to_json()
+    return df_mean, df_count, fig_mean, fig_count
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def category_figures(versao: int, projeto: str, inovacao: str) -> tuple:
+    """Como `category_charts`, por versão dos resultados guardados e filtros."""
+    return category_charts(get_results_store(RESULTS_DB).aggregates(projeto=projeto, inovacao=inovacao))
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def indicator_series_figure(versao: int, projeto: str, inovacao: str, indicador: str) -> tuple:
+    """
+    Gráfico (JSON) dos valores submetidos de um indicador (com as versões
+    substituídas, se o histórico estiver ativo) ao longo do tempo, reduzido
+    aos mínimos e máximos por intervalo em históricos longos; devolve
+    (figura, pontos desenhados, pontos guardados).
+    """
+    import plotly.express as px
+
+    partes = [
+        df.assign(**{"Valor Normalizado": pd.to_numeric(df["Valor Normalizado"], errors="coerce")})
+        for df in get_results_store(RESULTS_DB).read_chunks(
+            projeto=projeto,
+            inovacao=inovacao,
+            indicador=indicador,
+            columns=["Data/Hora", "Valor Normalizado"],
+            revisoes=True,
+        )
+    ]
+    df = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=["Data/Hora", "Valor Normalizado"])
+    dados, modo, n = series_plan(df.dropna(subset=["Data/Hora"]), "Data/Hora", "Valor Normalizado")
+    if dados.empty:
+        return None, 0, n
+    fig = px.scatter(
+        dados,
+        x="Data/Hora",
+        y="Valor Normalizado",
+        render_mode=modo,
+        title=f"Valores submetidos – {indicador}",
+    )
+    fig.update_layout(xaxis_title="Data/Hora", yaxis_title="Valor normalizado")
+    return fig.to_json(), len(dados), n
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def comparison_data(versao: int, inovacao: str):
+    """Matriz projetos × indicadores dos resultados guardados, por versão e inovação."""
+    df = get_results_store(RESULTS_DB).read(inovacao=inovacao, columns=COMPARISON_COLUMNS)
+    return comparison_matrix(df)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def project_ranking(versao: int, inovacao: str, metodo: str, pesos: tuple, menor_melhor: tuple) -> pd.DataFrame:
+    """
+    Pontuações e posição de cada projeto (pesos como pares (categoria, peso);
+    `menor_melhor`: indicadores em que menor é melhor).
+    """
+    return composite_scores(comparison_data(versao, inovacao), metodo, dict(pesos), menor_melhor)
+
+# Normalizações da comparação entre projetos (rótulo → método)
+COMPARISON_METHODS = {"Mín–máx (0 a 1)": "minmax", "Z-score": "zscore"}
+
+# Agregações temporais da Página 4 (rótulo → período das séries guardadas)
+TREND_PERIODS = {"Diária": "dia", "Semanal": "semana", "Mensal": "mes"}
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def indicator_trend_figure(versao: int, projeto: str, inovacao: str, indicador: str, periodo: str):
+    """
+    Tendência (JSON) de um indicador a partir das séries por período já
+    agregadas: média, com o intervalo mínimo–máximo sombreado.
+    """
+    import plotly.graph_objects as go
+
+    df = get_results_store(RESULTS_DB).rollups(periodo, projeto=projeto, inovacao=inovacao, indicador=indicador)
+    if df.empty:
+        return None
+    fig = go.Figure(
+        [
+            go.Scatter(x=df["Início"], y=df["Máximo"], mode="lines", line={"width": 0}, name="Máximo"),
+            go.Scatter(
+                x=df["Início"],
+                y=df["Mínimo"],
+                mode="lines",
+                line={"width": 0},
+                fill="tonexty",
+                fillcolor="rgba(106, 151, 57, 0.2)",
+                name="Mínimo",
+            ),
+            go.Scatter(
+                x=df["Início"],
+                y=df["Média"],
+                mode="lines+markers",
+                line={"color": BRAND_PRIMARY},
+                customdata=df["Nº de valores"],
+                hovertemplate="%{x|%Y-%m-%d}<br>Média: %{y}<br>Nº de valores: %{customdata}<extra></extra>",
+                name="Média",
+            ),
+        ]
+    )
+    fig.update_layout(
+        title=f"Tendência – {indicador}",
+        xaxis_title="Início do período",
+        yaxis_title="Valor normalizado",
+    )
+    return fig.to_json()
+
 def page_4():
     st.markdown("### 4️⃣ Resultados consolidados e gráficos para decisão")
 
-    df_res_file = None
-    if os.path.exists(RESULTS_FILE):
-        try:
-            df_res_file = pd.read_excel(RESULTS_FILE)
-        except Exception as e:
-            st.error(f"Não foi possível ler o ficheiro de resultados: {e}")
-            df_res_file = None
-
-    if df_res_file is None or df_res_file.empty:
-        if "metric_values" in st.session_state and st.session_state.metric_values:
+    store = None
+    n_guardados = 0
+    try:
+        store = get_results_store(RESULTS_DB)
+        n_guardados = store.count()
+    except Exception as e:
+        st.error(f"Não foi possível ler os resultados guardados: {e}")
+        store = None
+
+    df_res = None
+    if n_guardados == 0:
+        if len(st.session_state.formulario) > 0:
             st.info(
                 "Ainda não há ficheiro de resultados guardado, "
                 "mas existem valores na sessão atual. Usando-os para gerar os gráficos."
@@ -851,86 +871,72 @@ def page_4():
                 show_logos_footer()
                 return
 
-            inv_links = df_link[df_link["Inovação"].astype(str) == str(selected_inovacao)].copy()
-            df_inv = inv_links.merge(
-                df_map_ind,
-                left_on="Indicador",
-                right_on="Indicador_PT",
-                how="left",
-            )
-            df_inv["Indicadores_EN"] = df_inv["Indicador_EN"]
-            df_inv_inds = df_inv.merge(
-                df_ind_meta,
-                left_on="Indicadores_EN",
-                right_on="Indicadores",
-                how="left",
-            )
-            df_inv_inds = df_inv_inds.merge(
-                df_ind_ref,
-                left_on="Indicadores_EN",
-                right_on="Indicadores",
-                how="left",
-            )
+            df_inv_inds = catalog_table("vista").get(str(selected_inovacao))
+            if df_inv_inds is None:
+                df_inv_inds = pd.DataFrame(columns=["Indicador"])
 
-            registros = []
-            for i, row in df_inv_inds.iterrows():
-                chave = (selected_inovacao, i)
-                if chave not in st.session_state.metric_values:
-                    continue
-                indicador_pt = str(row["Indicador"])
-                indicador_en = str(row.get("Indicadores_EN", "")) if pd.notna(row.get("Indicadores_EN", "")) else ""
-                desc = str(row.get("Descrição", "")) if pd.notna(row.get("Descrição", "")) else ""
-                metr = str(row.get("Mensuração", "")) if pd.notna(row.get("Mensuração", "")) else ""
-                categ = str(row.get("Categoria", "")) if pd.notna(row.get("Categoria", "")) else ""
-                desc_ref = str(row.get("Descricao_Ref", "")) if pd.notna(row.get("Descricao_Ref", "")) else ""
-                metr_ref = str(row.get("Mensuracao_Ref", "")) if pd.notna(row.get("Mensuracao_Ref", "")) else ""
-                registros.append(
-                    {
-                        "Projeto": st.session_state.project_name if st.session_state.project_name else "",
-                        "Inovação": selected_inovacao,
-                        "Indicador (PT)": indicador_pt,
-                        "Indicador (modelo/ref)": indicador_en,
-                        "Descrição (modelo)": desc,
-                        "Mensuração (modelo)": metr,
-                        "Categoria": categ,
-                        "Descrição Referência": desc_ref,
-                        "Mensuração Referência": metr_ref,
-                        "Valor Normalizado": st.session_state.metric_values[chave],
-                        "Data/Hora": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    }
-                )
-            if not registros:
+            valores = st.session_state.formulario.valores(selected_inovacao)
+            validos = [i for i in df_inv_inds.index if i in valores]
+            if not validos:
                 st.warning("Não há valores preenchidos na sessão atual. Volte à Página 3 e processe os dados.")
                 if st.button("⬅ Voltar para Página 3"):
                     set_page(3)
                 show_logos_footer()
                 return
-            df_res = pd.DataFrame(registros)
+            df_res = make_result_records(
+                df_inv_inds.loc[validos],
+                [valores[i] for i in validos],
+                st.session_state.project_name,
+                selected_inovacao,
+            )
         else:
             st.info("Ainda não há resultados guardados. Volte à Página 3, preencha os indicadores e processe os dados.")
             if st.button("⬅ Voltar para Página 3"):
                 set_page(3)
             show_logos_footer()
             return
+
+    # Filtros (servidos pela tabela de agregados, sem ler o histórico)
+    if df_res is not None:
+        agg_res = aggregate_results(df_res)
+        opcoes_proj = sorted(agg_res["Projeto"].unique().tolist())
+        opcoes_inov = sorted(agg_res["Inovação"].unique().tolist())
     else:
-        df_res = df_res_file.copy()
+        opcoes_proj, opcoes_inov = store.filter_options()
 
-    # Filtros
     col_f1, col_f2 = st.columns(2)
     with col_f1:
-        projetos = ["(todos)"] + sorted(df_res["Projeto"].fillna("").astype(str).unique().tolist())
+        projetos = ["(todos)"] + opcoes_proj
         proj_sel = st.selectbox("Filtrar por projeto:", projetos)
     with col_f2:
-        inovs = ["(todas)"] + sorted(df_res["Inovação"].fillna("").astype(str).unique().tolist())
+        inovs = ["(todas)"] + opcoes_inov
         inov_sel = st.selectbox("Filtrar por inovação:", inovs)
 
-    dfv = df_res.copy()
-    if proj_sel != "(todos)":
-        dfv = dfv[dfv["Projeto"].astype(str) == proj_sel]
-    if inov_sel != "(todas)":
-        dfv = dfv[dfv["Inovação"].astype(str) == inov_sel]
+    filtro_proj = proj_sel if proj_sel != "(todos)" else None
+    filtro_inov = inov_sel if inov_sel != "(todas)" else None
+
+    if df_res is not None:
+        dfv = df_res
+        if filtro_proj is not None:
+            dfv = dfv[dfv["Projeto"].fillna("").astype(str) == filtro_proj]
+        if filtro_inov is not None:
+            dfv = dfv[dfv["Inovação"].fillna("").astype(str) == filtro_inov]
+        agg = aggregate_results(dfv)
+        n_filtrados = len(dfv)
+    else:
+        with diagnostico.span("p4_leitura") as sp:
+            versao = store.data_version()
+            agg = store.aggregates(projeto=filtro_proj, inovacao=filtro_inov)
+            n_filtrados = int(agg["linhas"].sum())
+            dfv = store.read(
+                projeto=filtro_proj,
+                inovacao=filtro_inov,
+                limit=MAX_TABLE_ROWS,
+                columns=TABLE_COLUMNS,
+            )
+            sp["linhas"] = len(dfv)
 
-    if dfv.empty:
+    if n_filtrados == 0:
         st.warning("Não há dados para os filtros selecionados.")
         if st.button("⬅ Voltar para Página 3"):
             set_page(3)
@@ -944,67 +950,170 @@ def page_4():
         unsafe_allow_html=True,
     )
 
-    cols_to_show = [
-        "Inovação",
-        "Categoria",
-        "Indicador (PT)",
-        "Indicador (modelo/ref)",
-        "Valor Normalizado",
-        "Mensuração (modelo)",
-        "Mensuração Referência",
-    ]
-    cols_exist = [c for c in cols_to_show if c in dfv.columns]
+    cols_exist = [c for c in TABLE_COLUMNS if c in dfv.columns]
+    if n_filtrados > len(dfv):
+        st.caption(f"A mostrar os {len(dfv)} registos mais recentes de {n_filtrados}.")
     st.dataframe(dfv[cols_exist], use_container_width=True)
 
     st.markdown("----")
     st.markdown("#### 4.2 Média dos valores por categoria")
 
-    dfv_num = dfv.copy()
-    dfv_num["Valor Numérico"] = pd.to_numeric(dfv_num["Valor Normalizado"], errors="coerce")
-    grp_mean = (
-        dfv_num.groupby("Categoria")["Valor Numérico"]
-        .mean()
-        .dropna()
-        .sort_values(ascending=False)
-    )
+    with diagnostico.span("p4_resumo") as sp:
+        if df_res is not None:
+            df_mean, df_count, fig_mean, fig_count = category_charts(agg)
+        else:
+            # gráficos refeitos só quando há novas gravações ou outros filtros
+            df_mean, df_count, fig_mean, fig_count = category_figures(versao, filtro_proj, filtro_inov)
+        sp["linhas"] = len(agg)
 
-    if grp_mean.empty:
+    if df_mean.empty:
         st.info("Não há valores numéricos suficientes para calcular médias por categoria.")
     else:
-        df_mean = grp_mean.rename("Média por Categoria").reset_index()
         st.dataframe(df_mean, use_container_width=True)
-        fig_mean = px.bar(
-            df_mean,
-            x="Categoria",
-            y="Média por Categoria",
-            title="Média dos valores por categoria",
-        )
-        fig_mean.update_layout(xaxis_title="Categoria", yaxis_title="Média dos valores")
-        st.plotly_chart(fig_mean, use_container_width=True)
+        with diagnostico.span("p4_graficos"):
+            st.plotly_chart(json.loads(fig_mean), use_container_width=True)
 
     st.markdown("----")
     st.markdown("#### 4.3 Distribuição – contagem de indicadores preenchidos por categoria")
 
-    grp_count = (
-        dfv_num.dropna(subset=["Valor Numérico"])
-        .groupby("Categoria")["Indicador (modelo/ref)"]
-        .count()
-        .sort_values(ascending=False)
-    )
-
-    if grp_count.empty:
+    if df_count.empty:
         st.info("Não há indicadores preenchidos suficientes para a contagem por categoria.")
     else:
-        df_count = grp_count.rename("Nº de indicadores preenchidos").reset_index()
         st.dataframe(df_count, use_container_width=True)
-        fig_count = px.bar(
-            df_count,
-            x="Categoria",
-            y="Nº de indicadores preenchidos",
-            title="Distribuição de indicadores preenchidos por categoria",
+        with diagnostico.span("p4_graficos"):
+            st.plotly_chart(json.loads(fig_count), use_container_width=True)
+
+    if df_res is None:
+        st.markdown("----")
+        st.markdown("#### 4.4 Tendência de um indicador")
+        if filtro_inov is None:
+            st.info("Escolha uma inovação nos filtros acima para ver a evolução de cada indicador.")
+        else:
+            df_inov = catalog_table("vista").get(filtro_inov)
+            opcoes_ind = (
+                sorted(df_inov["Indicador"].dropna().astype(str).unique().tolist()) if df_inov is not None else []
+            )
+            if not opcoes_ind:
+                st.info("A inovação selecionada não tem indicadores no catálogo atual.")
+            else:
+                col_ind, col_per = st.columns([0.6, 0.4])
+                with col_ind:
+                    ind_sel = st.selectbox("Indicador:", opcoes_ind)
+                with col_per:
+                    agregacao = st.radio(
+                        "Agregação:",
+                        list(TREND_PERIODS) + ["Valores submetidos"],
+                        horizontal=True,
+                    )
+                st.caption(
+                    "Inclui todos os valores submetidos, também os que foram depois substituídos."
+                    if RESULTS_HISTORY
+                    else "Inclui só os valores atuais de cada indicador."
+                )
+                if agregacao in TREND_PERIODS:
+                    with diagnostico.span("p4_tendencia"):
+                        fig_tend = indicator_trend_figure(
+                            versao, filtro_proj, filtro_inov, ind_sel, TREND_PERIODS[agregacao]
+                        )
+                    if fig_tend is None:
+                        st.info("Ainda não há valores numéricos guardados para este indicador.")
+                    else:
+                        st.plotly_chart(json.loads(fig_tend), use_container_width=True)
+                else:
+                    with diagnostico.span("p4_serie") as sp:
+                        fig_serie, n_pontos, n_total = indicator_series_figure(
+                            versao, filtro_proj, filtro_inov, ind_sel
+                        )
+                        sp["linhas"] = n_total
+                    if fig_serie is None:
+                        st.info("Ainda não há valores guardados para este indicador.")
+                    else:
+                        if n_pontos < n_total:
+                            st.caption(
+                                f"A mostrar {n_pontos} de {n_total} valores "
+                                "(mínimo e máximo de cada intervalo de tempo)."
+                            )
+                        st.plotly_chart(json.loads(fig_serie), use_container_width=True)
+
+    if df_res is None:
+        st.markdown("----")
+        st.markdown("#### 4.5 Comparação entre projetos")
+        st.markdown(
+            "<p class='small-muted'>Cada indicador é normalizado entre projetos (contagens e montantes em escala "
+            "logarítmica; invertido quando menor é melhor, como nos custos ou emissões); a pontuação de cada "
+            "categoria é a média dos seus indicadores e a pontuação global é a média ponderada das categorias.</p>",
+            unsafe_allow_html=True,
         )
-        fig_count.update_layout(xaxis_title="Categoria", yaxis_title="Nº de indicadores preenchidos")
-        st.plotly_chart(fig_count, use_container_width=True)
+        with diagnostico.span("p4_comparacao") as sp:
+            comp = comparison_data(versao, filtro_inov)
+            sp["linhas"] = len(comp.projetos)
+        if len(comp.projetos) < 2:
+            st.info("São necessários resultados de pelo menos dois projetos para os comparar.")
+        else:
+            metodo = st.radio("Normalização:", list(COMPARISON_METHODS), horizontal=True)
+            # indicadores sem categoria são pontuados como SEM_CATEGORIA (também com peso)
+            categorias = sorted({c or SEM_CATEGORIA for c in comp.categorias})
+            pesos = {}
+            with st.expander("Pesos por categoria"):
+                cols_peso = st.columns(min(len(categorias), 4) or 1)
+                for i, cat in enumerate(categorias):
+                    with cols_peso[i % len(cols_peso)]:
+                        pesos[cat] = st.number_input(cat, min_value=0.0, value=1.0, step=0.5, key=f"peso_{cat}")
+            with st.expander("Sentido dos indicadores"):
+                menor_melhor = st.multiselect(
+                    "Indicadores em que menor é melhor:",
+                    comp.indicadores,
+                    default=[ind for ind, m in zip(comp.indicadores, comp.menor_melhor) if m],
+                    key=f"menor_melhor_{filtro_inov}",
+                    help="Sugeridos a partir do nome e da mensuração (custos, emissões, tempo de retorno, ...).",
+                )
+            ranking = project_ranking(
+                versao,
+                filtro_inov,
+                COMPARISON_METHODS[metodo],
+                tuple(sorted(pesos.items())),
+                tuple(sorted(menor_melhor)),
+            )
+            if filtro_proj is not None:
+                linha = ranking[ranking["Projeto"] == filtro_proj]
+                if not linha.empty and pd.notna(linha["Posição"].iloc[0]):
+                    st.caption(
+                        f"'{filtro_proj}' está na posição {linha['Posição'].iloc[0]} de {len(ranking)} projetos."
+                    )
+            st.dataframe(
+                ranking,
+                use_container_width=True,
+                hide_index=True,
+                column_config={SCORE_COLUMN: st.column_config.NumberColumn(format="%.3f")},
+            )
+
+    if store is not None and n_guardados > 0:
+        st.markdown("----")
+        st.markdown("#### 4.6 Exportar a vista filtrada")
+        col_fmt, col_btn = st.columns([0.6, 0.4])
+        with col_fmt:
+            formato = st.radio(
+                "Formato do ficheiro:",
+                available_formats(),
+                format_func=lambda f: EXPORT_FORMATS[f][0],
+                horizontal=True,
+            )
+        with col_btn:
+            if st.button("Preparar ficheiro para descarregar"):
+                st.session_state.exportacao = get_exporter(RESULTS_DB).submit(
+                    formato, projeto=filtro_proj, inovacao=filtro_inov
+                )
+        export_status()
+
+        if st.button("Exportar resultados para Excel"):
+            try:
+                with diagnostico.span("p4_exportacao") as sp:
+                    n = get_results_store(RESULTS_DB).export_excel(RESULTS_FILE)
+                    sp["linhas"] = n
+            except Exception as e:
+                st.error(f"Não foi possível exportar os resultados: {e}")
+            else:
+                st.success(f"✅ {n} registos exportados para '{RESULTS_FILE}'")
 
     st.markdown("----")
     col_back3, col_back1 = st.columns(2)
@@ -1017,19 +1126,73 @@ def page_4():
 
     show_logos_footer()
 
+@st.fragment(run_every=1.0)
+def export_progress():
+    """Acompanha a exportação em curso sem voltar a executar a página inteira."""
+    if st.session_state.exportacao.done():
+        st.rerun()
+    st.info("⏳ A preparar o ficheiro em segundo plano… pode continuar a usar a aplicação.")
+
+def export_status():
+    """Estado da última exportação desta sessão (em curso, pronta ou com erro)."""
+    fut = st.session_state.get("exportacao")
+    if fut is None:
+        return
+    if not fut.done():
+        export_progress()
+        return
+    try:
+        exp = fut.result()
+    except Exception as e:
+        st.error(f"Não foi possível exportar os resultados: {e}")
+        return
+    if not os.path.exists(exp.path):
+        # ficheiro já apagado (exportações mais recentes de outras sessões)
+        st.session_state.pop("exportacao", None)
+        return
+    st.download_button(
+        f"⬇ Descarregar ({exp.linhas} registos, {exp.gerado_em})",
+        data=lambda: read_export_file(exp.path),
+        file_name=exp.nome_ficheiro,
+        mime=exp.mime,
+        on_click="ignore",
+    )
+
+# =========================
+# DIAGNÓSTICO – painel oculto (abrir com ?diag=1 no endereço)
+# =========================
+def show_diagnostics_panel():
+    if st.query_params.get("diag") != "1":
+        return
+    with st.sidebar:
+        st.markdown("#### Diagnóstico de desempenho")
+        st.caption(f"Tempos por etapa neste servidor • log: {DIAGNOSTICS_LOG}")
+        df_diag = diagnostico.stage_percentiles()
+        if df_diag.empty:
+            st.info("Ainda não há execuções medidas.")
+        else:
+            st.dataframe(df_diag, hide_index=True, use_container_width=True)
+
 # =========================
 # ROTEAMENTO ENTRE PÁGINAS
 # =========================
 page = st.session_state.current_page
+rerun.pagina = page
+
+try:
+    with diagnostico.span(f"pagina_{page}"):
+        if page == 1:
+            page_1()
+        elif page == 2:
+            page_2()
+        elif page == 3:
+            page_3()
+        elif page == 4:
+            page_4()
+        else:
+            set_page(1)
+            page_1()
+finally:
+    rerun.finish()
 
-if page == 1:
-    page_1()
-elif page == 2:
-    page_2()
-elif page == 3:
-    page_3()
-elif page == 4:
-    page_4()
-else:
-    set_page(1)
-    page_1()
+show_diagnostics_panel()
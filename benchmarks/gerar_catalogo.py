@@ -0,0 +1,170 @@
+# =========================
+# benchmarks/gerar_catalogo.py - Catálogos e resultados sintéticos
+# =========================
+"""
+Gera planilhas sintéticas com o mesmo esquema das quatro planilhas do
+catálogo (InoDescTagsEng, IndDescMensCat, indicadores_classificados_114 e
+Inovação_Ind) e tabelas de resultados, para medir o desempenho da aplicação
+com catálogos maiores.
+
+Uso em linha de comando:
+    python benchmarks/gerar_catalogo.py PASTA --inovacoes 1000 --indicadores 1000
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+_PALAVRAS = (
+    "energy water carbon soil vine wine yield cost revenue return emission waste "
+    "biodiversity digital adoption training labour health safety quality export "
+    "innovation efficiency climate resilience irrigation fertilizer sensor platform "
+    "process product market investment payback risk circular recycling renewable"
+).split()
+_PALAVRAS_PT = (
+    "energia água carbono solo vinha vinho produção custo receita retorno emissão "
+    "resíduo biodiversidade digital adoção formação trabalho saúde segurança qualidade "
+    "exportação inovação eficiência clima resiliência rega fertilizante sensor plataforma"
+).split()
+_MENSURACOES = [
+    "Share of total, expressed as a percentage (%).",
+    "Total amount in euros (€).",
+    "Emissions avoided in tCO2e per year.",
+    "Energy consumption in kWh per hectare.",
+    "Number of patents or publications (nº).",
+    "Hours of training per worker (horas).",
+    "Composite index (0–10).",
+]
+_CATEGORIAS = ["Econômico", "Ambiental", "Social", "Tecnológico", "Governança"]
+
+
+def _nomes(rng, n: int, palavras, prefixo: str) -> list:
+    """Nomes únicos com 2–5 palavras e, às vezes, uma abreviação entre parênteses."""
+    nomes = []
+    for k in range(n):
+        partes = rng.choice(palavras, size=rng.integers(2, 6)).tolist()
+        nome = " ".join(partes).capitalize() + f" {prefixo}{k}"
+        if rng.random() < 0.3:
+            nome += f" ({''.join(p[0] for p in partes).upper()}{k})"
+        nomes.append(nome)
+    return nomes
+
+
+def _muta(rng, nome: str) -> str:
+    """Variante do nome (erros de escrita) para exercitar a semelhança de texto."""
+    s = list(nome)
+    for _ in range(rng.integers(0, 3)):
+        i = rng.integers(0, len(s))
+        s[i] = s[i].upper() if s[i].islower() else s[i].lower()
+    return "".join(s)
+
+
+def generate_catalog(n_inovacoes: int, n_indicadores: int, links_por_inovacao: int = 5, seed: int = 0) -> dict:
+    """Devolve as quatro tabelas sintéticas (DataFrames) do catálogo."""
+    rng = np.random.default_rng(seed)
+    inovacoes = [f"Inovação {k:06d}" for k in range(n_inovacoes)]
+    tags = [f"#Tag{k}" for k in range(max(10, n_inovacoes // 5))]
+    inov_tags = pd.DataFrame(
+        {
+            "Inovação": inovacoes,
+            "Descrição": [f"Descrição sintética da {i}." for i in inovacoes],
+            "Tags": ["; ".join(rng.choice(tags, size=rng.integers(1, 6), replace=False)) for _ in inovacoes],
+            "Engajamento": [f"Engajamento da {i}." for i in inovacoes],
+        }
+    )
+
+    en = _nomes(rng, n_indicadores, _PALAVRAS, "I")
+    ind_meta = pd.DataFrame(
+        {
+            "Indicadores": en,
+            "Descrição": [f"Description of {n}." for n in en],
+            "Mensuração": rng.choice(_MENSURACOES, size=n_indicadores),
+            "Categoria": rng.choice(_CATEGORIAS, size=n_indicadores),
+        }
+    )
+    ind_ref = ind_meta.sample(frac=0.8, random_state=seed).reset_index(drop=True)
+
+    # nomes PT: parte é o próprio nome EN com variações, parte é texto novo
+    pt = [
+        _muta(rng, n) if rng.random() < 0.6 else p
+        for n, p in zip(en, _nomes(rng, n_indicadores, _PALAVRAS_PT, "P"))
+    ]
+    escolha = rng.integers(0, n_indicadores, size=(n_inovacoes, links_por_inovacao))
+    link_inov = np.full(escolha.shape, None, dtype=object)
+    link_inov[:, 0] = inovacoes  # como na planilha original: só a 1ª linha preenchida
+    link = pd.DataFrame(
+        {
+            "Inovação": link_inov.ravel(),
+            "Indicador": np.asarray(pt, dtype=object)[escolha.ravel()],
+        }
+    )
+    return {"inov_tags": inov_tags, "ind_meta": ind_meta, "ind_ref": ind_ref, "link": link}
+
+
+def generate_results(n_linhas: int, n_inovacoes: int = 100, n_projetos: int = 200, seed: int = 0) -> pd.DataFrame:
+    """Tabela de resultados sintética, no formato gravado pela Página 3."""
+    rng = np.random.default_rng(seed)
+    inicio = np.datetime64("2024-01-01T00:00:00")
+    segundos = rng.integers(0, 2 * 365 * 86400, size=n_linhas)
+    mens = rng.choice(_MENSURACOES, size=n_linhas)
+    return pd.DataFrame(
+        {
+            "Projeto": [f"Projeto {k:04d}" for k in rng.integers(0, n_projetos, size=n_linhas)],
+            "Inovação": [f"Inovação {k:06d}" for k in rng.integers(0, n_inovacoes, size=n_linhas)],
+            "Indicador (PT)": [f"Indicador {k}" for k in rng.integers(0, 500, size=n_linhas)],
+            "Indicador (modelo/ref)": [f"Indicator {k}" for k in rng.integers(0, 500, size=n_linhas)],
+            "Descrição (modelo)": "Descrição",
+            "Mensuração (modelo)": mens,
+            "Categoria": rng.choice(_CATEGORIAS, size=n_linhas),
+            "Descrição Referência": "",
+            "Mensuração Referência": mens,
+            "Valor Normalizado": np.round(rng.random(n_linhas) * 100, 3),
+            "Data/Hora": pd.Series(inicio + segundos.astype("timedelta64[s]")),
+        }
+    )
+
+
+CATALOG_FILES = {
+    "inov_tags": "InoDescTagsEng.xlsx",
+    "ind_meta": "IndDescMensCat.xlsx",
+    "ind_ref": "indicadores_classificados_114.xlsx",
+    "link": "Inovação_Ind.xlsx",
+}
+
+
+def write_catalog(pasta: str, tabelas: dict) -> dict:
+    """Grava as tabelas como xlsx em `pasta` e devolve os caminhos (chaves de CATALOG_PATHS)."""
+    os.makedirs(pasta, exist_ok=True)
+    paths = {}
+    for nome, ficheiro in CATALOG_FILES.items():
+        paths[nome] = os.path.join(pasta, ficheiro)
+        tabelas[nome].to_excel(paths[nome], index=False)
+    return paths
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Gera planilhas sintéticas do catálogo.")
+    parser.add_argument("pasta")
+    parser.add_argument("--inovacoes", type=int, default=100)
+    parser.add_argument("--indicadores", type=int, default=100)
+    parser.add_argument("--links-por-inovacao", type=int, default=5)
+    parser.add_argument("--resultados", type=int, default=0, help="linhas de resultados (CSV) a gerar")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    tabelas = generate_catalog(args.inovacoes, args.indicadores, args.links_por_inovacao, args.seed)
+    paths = write_catalog(args.pasta, tabelas)
+    for nome, path in paths.items():
+        print(f"{nome:<10} {len(tabelas[nome]):>8} linhas -> {path}")
+    if args.resultados:
+        path = os.path.join(args.pasta, "resultados_sinteticos.csv")
+        generate_results(args.resultados, args.inovacoes, seed=args.seed).to_csv(path, index=False)
+        print(f"resultados {args.resultados:>8} linhas -> {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
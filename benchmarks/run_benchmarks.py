@@ -0,0 +1,249 @@
+# =========================
+# benchmarks/run_benchmarks.py - Medição de desempenho por etapa
+# =========================
+"""
+Mede, sem interface, cada etapa da aplicação com catálogos e históricos de
+resultados sintéticos de tamanho crescente:
+
+- catálogo: leitura das planilhas, mapeamento PT ↔ EN, compilação e leitura
+  do snapshot, vista por inovação (junções da Página 3, comparada com a
+  versão anterior sobre colunas de texto, em tempo e memória) e validação em
+  bloco;
+- resultados: gravação de uma submissão, opções de filtro, agregados por
+  categoria, tabela recente, tendência semanal de um indicador e contagem
+  (Página 4).
+
+As etapas usam diretamente o pacote `indicadores`, que não depende do
+Streamlit. O relatório é gravado em JSON.
+
+Uso em linha de comando:
+    python benchmarks/run_benchmarks.py --tamanhos 100,1000,10000 --resultados 1000,100000,1000000
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from benchmarks.gerar_catalogo import generate_catalog, generate_results, write_catalog  # noqa: E402
+from indicadores.agregados import category_summary  # noqa: E402
+from indicadores.comparacao import COMPARISON_COLUMNS, comparison_matrix, composite_scores  # noqa: E402
+from indicadores.catalogo import (  # noqa: E402
+    _LOADERS,
+    build_innovation_view,
+    compile_catalog,
+    indicator_ids,
+    read_snapshot,
+)
+from indicadores.mapeamento import build_indicator_mapping  # noqa: E402
+from indicadores.resultados import SQLiteResultsStore  # noqa: E402
+from indicadores.validacao import valida_lote  # noqa: E402
+
+MAX_TABLE_ROWS = 1000  # como em app3.py
+LINHAS_SUBMISSAO = 50  # nº típico de indicadores por inovação
+CARGA_BLOCO = 100_000
+
+
+def _mede(fn, repeticoes: int):
+    """Executa `fn` `repeticoes` vezes; devolve (tempos em s, último resultado)."""
+    tempos, res = [], None
+    for _ in range(repeticoes):
+        t0 = time.perf_counter()
+        res = fn()
+        tempos.append(time.perf_counter() - t0)
+    return tempos, res
+
+
+def _vista_texto(cat) -> dict:
+    """Vista por inovação com junções sobre colunas de texto (implementação anterior)."""
+    df_inv = cat.link.merge(cat.map_ind, left_on="Indicador", right_on="Indicador_PT", how="left")
+    df_inv["Indicadores_EN"] = df_inv["Indicador_EN"]
+    df_inv_inds = df_inv.merge(
+        cat.ind_meta, left_on="Indicadores_EN", right_on="Indicadores", how="left", suffixes=("", "_modelo")
+    )
+    df_inv_inds = df_inv_inds.merge(
+        cat.ind_ref, left_on="Indicadores_EN", right_on="Indicadores", how="left", suffixes=("", "_ref")
+    )
+    df_inv_inds["Indicador_ID"] = indicator_ids(df_inv_inds["Inovação"], df_inv_inds["Indicador"])
+    chaves = df_inv_inds["Inovação"].astype(str)
+    return {
+        inov: grupo.set_axis(pd.Index(grupo["Indicador_ID"].to_numpy()), axis=0)
+        for inov, grupo in df_inv_inds.groupby(chaves, sort=False)
+    }
+
+
+def _memoria(vista: dict) -> int:
+    """
+    Bytes ocupados pelos DataFrames da vista (incluindo o texto); as
+    categorias partilhadas pelas colunas categóricas contam uma só vez.
+    """
+    total, categorias = 0, {}
+    for df in vista.values():
+        total += int(df.index.memory_usage(deep=True))
+        for col in df.columns:
+            serie = df[col]
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                total += serie.cat.codes.nbytes
+                cats = serie.cat.categories
+                categorias.setdefault(id(cats), int(cats.memory_usage(deep=True)))
+            else:
+                total += int(serie.memory_usage(deep=True, index=False))
+    return total + sum(categorias.values())
+
+
+def _registo(grupo: str, etapa: str, tempos: list, **extra) -> dict:
+    reg = {
+        "grupo": grupo,
+        "etapa": etapa,
+        **extra,
+        "repeticoes": len(tempos),
+        "min_s": min(tempos),
+        "mediana_s": statistics.median(tempos),
+        "max_s": max(tempos),
+    }
+    mem = f"  {extra['memoria_bytes'] / 2**20:.1f} MiB" if "memoria_bytes" in extra else ""
+    print(f"  {etapa:<32} mediana {reg['mediana_s'] * 1000:>10.1f} ms  (min {reg['min_s'] * 1000:.1f} ms){mem}")
+    return reg
+
+
+def bench_catalog(n: int, pasta: str, links_por_inovacao: int, repeticoes: int, seed: int, workers: int = None) -> list:
+    """Etapas do catálogo para `n` inovações e `n` indicadores."""
+    print(f"\nCatálogo: {n} inovações × {n} indicadores")
+    tabelas = generate_catalog(n, n, links_por_inovacao, seed)
+    t0 = time.perf_counter()
+    paths = write_catalog(os.path.join(pasta, f"catalogo_{n}"), tabelas)
+    print(f"  (planilhas geradas em {time.perf_counter() - t0:.1f} s)")
+    ctx = {"n_inovacoes": n, "n_indicadores": n, "n_ligacoes": len(tabelas["link"])}
+    out = []
+
+    carregadas = {}
+    for nome, loader in _LOADERS.items():
+        tempos, carregadas[nome] = _mede(lambda: loader(paths[nome]), repeticoes)
+        out.append(_registo("catalogo", f"carregar_{nome}", tempos, linhas=len(carregadas[nome]), **ctx))
+
+    tempos, _ = _mede(lambda: build_indicator_mapping(carregadas["link"], carregadas["ind_meta"]), repeticoes)
+    out.append(_registo("catalogo", "mapeamento_pt_en", tempos, **ctx))
+    if workers and workers > 1:
+        tempos, _ = _mede(
+            lambda: build_indicator_mapping(carregadas["link"], carregadas["ind_meta"], workers=workers), repeticoes
+        )
+        out.append(_registo("catalogo", "mapeamento_pt_en_paralelo", tempos, workers=workers, **ctx))
+
+    snapshot = os.path.join(pasta, f"catalogo_{n}.snapshot.pkl")
+    tempos, cat = _mede(lambda: compile_catalog(paths, snapshot), 1)
+    out.append(_registo("catalogo", "compilar_snapshot", tempos, bytes=os.path.getsize(snapshot), **ctx))
+    tempos, _ = _mede(lambda: read_snapshot(snapshot, paths), repeticoes)
+    out.append(_registo("catalogo", "ler_snapshot", tempos, **ctx))
+
+    tempos, view = _mede(lambda: build_innovation_view(cat), repeticoes)
+    out.append(_registo("catalogo", "pagina3_vista_inovacoes", tempos, memoria_bytes=_memoria(view), **ctx))
+    tempos, view_texto = _mede(lambda: _vista_texto(cat), repeticoes)
+    out.append(_registo("catalogo", "pagina3_vista_inovacoes_texto", tempos, memoria_bytes=_memoria(view_texto), **ctx))
+
+    todas = pd.concat(view.values(), ignore_index=True)
+    metricas = todas["Mensuração"].where(todas["Mensuração"].notna(), "").astype(str)
+    valores = pd.Series(np.round(np.random.default_rng(seed).random(len(todas)) * 100, 2).astype(str))
+    tempos, _ = _mede(lambda: valida_lote(valores, metricas), repeticoes)
+    out.append(_registo("catalogo", "pagina3_validacao_lote", tempos, linhas=len(todas), **ctx))
+    return out
+
+
+def bench_results(n_linhas: int, pasta: str, repeticoes: int, seed: int) -> list:
+    """Etapas de gravação e da Página 4 com `n_linhas` resultados guardados."""
+    print(f"\nResultados: {n_linhas} linhas guardadas")
+    path = os.path.join(pasta, f"resultados_{n_linhas}.sqlite")
+    if os.path.exists(path):
+        os.remove(path)
+    store = SQLiteResultsStore(path)
+    dados = generate_results(n_linhas, seed=seed)
+    t0 = time.perf_counter()
+    store.append_many(dados.iloc[i:i + CARGA_BLOCO] for i in range(0, n_linhas, CARGA_BLOCO))
+    carga = time.perf_counter() - t0
+    print(f"  (carga inicial em {carga:.1f} s, {n_linhas / carga if carga > 0 else 0:.0f} linhas/s)")
+    ctx = {"linhas_guardadas": n_linhas}
+    out = [_registo("resultados", "carga_inicial", [carga], **ctx)]
+
+    submissao = generate_results(LINHAS_SUBMISSAO, seed=seed + 1)
+    tempos, _ = _mede(lambda: store.append(submissao), repeticoes)
+    out.append(_registo("resultados", "gravar_submissao", tempos, linhas=LINHAS_SUBMISSAO, **ctx))
+
+    tempos, (projetos, _) = _mede(store.filter_options, repeticoes)
+    out.append(_registo("resultados", "pagina4_opcoes_filtro", tempos, **ctx))
+
+    tempos, _ = _mede(lambda: category_summary(store.aggregates()), repeticoes)
+    out.append(_registo("resultados", "pagina4_resumo_categorias", tempos, **ctx))
+    tempos, _ = _mede(lambda: category_summary(store.aggregates(projeto=projetos[0])), repeticoes)
+    out.append(_registo("resultados", "pagina4_resumo_filtrado", tempos, **ctx))
+
+    tempos, _ = _mede(lambda: store.read(limit=MAX_TABLE_ROWS), repeticoes)
+    out.append(_registo("resultados", "pagina4_tabela_recente", tempos, linhas=MAX_TABLE_ROWS, **ctx))
+    tempos, _ = _mede(lambda: store.read(projeto=projetos[0], limit=MAX_TABLE_ROWS), repeticoes)
+    out.append(_registo("resultados", "pagina4_tabela_filtrada", tempos, **ctx))
+
+    indicador = submissao["Indicador (PT)"].iloc[0]
+    tempos, _ = _mede(lambda: store.rollups("semana", indicador=indicador), repeticoes)
+    out.append(_registo("resultados", "pagina4_tendencia_semanal", tempos, **ctx))
+
+    comp = comparison_matrix(store.read(columns=COMPARISON_COLUMNS))
+    tempos, _ = _mede(lambda: composite_scores(comparison_matrix(store.read(columns=COMPARISON_COLUMNS))), repeticoes)
+    out.append(_registo("resultados", "pagina4_comparacao_projetos", tempos, projetos=len(comp.projetos), **ctx))
+
+    tempos, _ = _mede(store.count, repeticoes)
+    out.append(_registo("resultados", "contagem", tempos, **ctx))
+    return out
+
+
+def _inteiros(texto: str) -> list:
+    return [int(float(v)) for v in texto.split(",") if v.strip()]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Mede o desempenho de cada etapa com dados sintéticos.")
+    parser.add_argument("--tamanhos", default="100,1000", help="nº de inovações/indicadores (ex.: 100,1000,1e4,1e5)")
+    parser.add_argument("--resultados", default="1000,100000", help="linhas de resultados guardadas (ex.: 1e3,1e6)")
+    parser.add_argument("--links-por-inovacao", type=int, default=5)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="mede também o mapeamento em N processos")
+    parser.add_argument("--pasta", default=None, help="pasta de trabalho (por omissão, temporária)")
+    parser.add_argument("--saida", default="bench_output.json", help="relatório JSON")
+    args = parser.parse_args(argv)
+
+    registos = []
+    with tempfile.TemporaryDirectory(prefix="bench_") as tmp:
+        pasta = args.pasta or tmp
+        os.makedirs(pasta, exist_ok=True)
+        for n in _inteiros(args.tamanhos):
+            registos += bench_catalog(n, pasta, args.links_por_inovacao, args.repeticoes, args.seed, args.workers)
+        for n in _inteiros(args.resultados):
+            registos += bench_results(n, pasta, args.repeticoes, args.seed)
+
+    relatorio = {
+        "gerado_em": datetime.datetime.now().isoformat(timespec="seconds"),
+        "ambiente": {
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+        },
+        "parametros": vars(args),
+        "resultados": registos,
+    }
+    with open(args.saida, "w", encoding="utf-8") as fh:
+        json.dump(relatorio, fh, ensure_ascii=False, indent=2)
+    print(f"\nRelatório gravado em {args.saida}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""
+Núcleo do Smart Green Innovation Indicators (App3).
+
+Lógica reutilizável fora da interface Streamlit: catálogo de indicadores,
+mapeamento PT ↔ EN, validação, armazenamento e exportação de resultados e
+agregados. O pacote não importa o Streamlit nem o Plotly, pelo que pode ser
+usado em processos de trabalho e ferramentas de linha de comando.
+"""
+
+from indicadores.catalogo import Catalogo, LazyCatalog, compile_catalog, load_catalog
+from indicadores.escrita import Confirmacao, FileLock, ResultsWriter
+from indicadores.exportacao import Exportacao, Exportador, write_export
+from indicadores.mapeamento import build_indicator_mapping, normalize_key
+from indicadores.validacao import infere_tipo, valida_lote, valida_valor
+from indicadores.resultados import (
+    RESULT_COLUMNS,
+    RESULT_KEY,
+    ResultsStore,
+    SQLiteResultsStore,
+    open_results_store,
+    register_backend,
+)
+
+__all__ = [
+    "Catalogo",
+    "LazyCatalog",
+    "compile_catalog",
+    "load_catalog",
+    "build_indicator_mapping",
+    "normalize_key",
+    "Confirmacao",
+    "FileLock",
+    "ResultsWriter",
+    "Exportacao",
+    "Exportador",
+    "write_export",
+    "RESULT_COLUMNS",
+    "RESULT_KEY",
+    "ResultsStore",
+    "SQLiteResultsStore",
+    "open_results_store",
+    "register_backend",
+    "infere_tipo",
+    "valida_lote",
+    "valida_valor",
+]
@@ -0,0 +1,105 @@
+# =========================
+# indicadores/agregados.py - Agregados por (Projeto, Inovação, Categoria)
+# =========================
+"""
+Somas e contagens dos valores numéricos por (Projeto, Inovação, Categoria).
+
+O armazenamento de resultados mantém estas tabelas atualizadas a cada
+gravação; a Página 4 calcula médias e contagens por categoria a partir delas,
+sem reler o histórico completo. O mesmo acontece com as séries temporais por
+indicador (nº de valores, média, mínimo e máximo por dia, semana e mês).
+"""
+
+import pandas as pd
+
+AGG_KEYS = ["Projeto", "Inovação", "Categoria"]
+
+
+def aggregate_results(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Agrega um bloco de resultados: colunas Projeto, Inovação, Categoria,
+    soma, contagem (valores numéricos) e linhas (todos os registos).
+    Projeto/Inovação/Categoria em falta passam a "".
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=AGG_KEYS + ["soma", "contagem", "linhas"])
+    chaves = df.reindex(columns=AGG_KEYS).fillna("").astype(str)
+    valor = pd.to_numeric(df["Valor Normalizado"], errors="coerce")
+    base = chaves.assign(
+        soma=valor.fillna(0.0),
+        contagem=valor.notna().astype("int64"),
+        linhas=1,
+    )
+    return base.groupby(AGG_KEYS, as_index=False, sort=False)[["soma", "contagem", "linhas"]].sum()
+
+
+def category_summary(agg: pd.DataFrame):
+    """
+    A partir dos agregados (já filtrados), devolve:
+    - média dos valores por categoria (ordem decrescente)
+    - nº de indicadores preenchidos por categoria (ordem decrescente)
+    Categorias vazias são ignoradas.
+    """
+    por_cat = (
+        agg[agg["Categoria"].astype(str) != ""]
+        .groupby("Categoria")[["soma", "contagem"]]
+        .sum()
+    )
+    por_cat = por_cat[por_cat["contagem"] > 0]
+
+    df_mean = (
+        (por_cat["soma"] / por_cat["contagem"])
+        .sort_values(ascending=False)
+        .rename("Média por Categoria")
+        .reset_index()
+    )
+    df_count = (
+        por_cat["contagem"]
+        .astype("int64")
+        .sort_values(ascending=False)
+        .rename("Nº de indicadores preenchidos")
+        .reset_index()
+    )
+    return df_mean, df_count
+
+
+# =========================
+# Séries temporais por indicador (dia, semana, mês)
+# =========================
+ROLLUP_PERIODS = ["dia", "semana", "mes"]
+ROLLUP_COLUMNS = ["Indicador (PT)", "Início", "Nº de valores", "Média", "Mínimo", "Máximo"]
+
+
+def period_start(horas: pd.Series, periodo: str) -> pd.Series:
+    """Início do dia, da semana (segunda-feira) ou do mês de cada data/hora."""
+    dia = horas.dt.normalize()
+    if periodo == "dia":
+        return dia
+    if periodo == "semana":
+        return dia - pd.to_timedelta(dia.dt.weekday, unit="D")
+    if periodo == "mes":
+        return dia - pd.to_timedelta(dia.dt.day - 1, unit="D")
+    raise ValueError(f"Período desconhecido: '{periodo}' (disponíveis: {', '.join(ROLLUP_PERIODS)}).")
+
+
+def rollup_results(df: pd.DataFrame, periodo: str) -> pd.DataFrame:
+    """
+    Nº de valores numéricos, média, mínimo e máximo por indicador (PT) e
+    período (colunas ROLLUP_COLUMNS, por ordem cronológica).
+    """
+    if df is None or df.empty:
+        return pd.DataFrame(columns=ROLLUP_COLUMNS)
+    base = pd.DataFrame(
+        {
+            "Indicador (PT)": df["Indicador (PT)"].fillna("").astype(str),
+            "Início": period_start(pd.to_datetime(df["Data/Hora"], errors="coerce"), periodo),
+            "valor": pd.to_numeric(df["Valor Normalizado"], errors="coerce"),
+        }
+    ).dropna(subset=["Início", "valor"])
+    out = (
+        base.groupby(["Indicador (PT)", "Início"])["valor"]
+        .agg(["count", "mean", "min", "max"])
+        .reset_index()
+    )
+    out.columns = ROLLUP_COLUMNS
+    return out
@@ -0,0 +1,44 @@
+# =========================
+# indicadores/apresentacao.py - Ícone e imagem por inovação
+# =========================
+"""
+Elementos visuais associados a cada inovação (ícone e imagem ilustrativa),
+escolhidos a partir do nome, sem dependência da interface.
+
+Cada inovação pertence a uma categoria visual (clima, vinha, energia, ...);
+o ícone e a ilustração (ver indicadores.recursos) são os da categoria.
+"""
+
+# (categoria, palavras-chave, ícone), pela ordem em que são testadas
+_CATEGORIAS = [
+    ("clima", ("clima", "climate"), "🌱"),
+    ("vinha", ("vine", "wine"), "🍇"),
+    ("energia", ("energia", "energy"), "⚡"),
+    ("agua", ("agua", "água", "water"), "💧"),
+    ("digital", ("digital", "data", "smart"), "💻"),
+    ("carbono", ("carbon", "co2"), "🌍"),
+]
+
+CATEGORIA_GERAL = "geral"
+_ICONES = {cat: icone for cat, _, icone in _CATEGORIAS}
+_ICONES[CATEGORIA_GERAL] = "💡"
+
+VISUAL_CATEGORIES = [cat for cat, _, _ in _CATEGORIAS] + [CATEGORIA_GERAL]
+
+
+def innovation_category(name: str) -> str:
+    """Categoria visual da inovação (chave das ilustrações locais)."""
+    n = name.lower()
+    for cat, palavras, _ in _CATEGORIAS:
+        if any(p in n for p in palavras):
+            return cat
+    return CATEGORIA_GERAL
+
+
+def icon_for_innovation(name: str) -> str:
+    return _ICONES[innovation_category(name)]
+
+
+def illustration_for_innovation(name: str) -> str:
+    """Nome do recurso (ilustração local) a mostrar para a inovação."""
+    return f"ilustracao_{innovation_category(name)}"
@@ -0,0 +1,494 @@
+# =========================
+# indicadores/catalogo.py - Catálogo de inovações e indicadores
+# =========================
+"""
+Leitura das quatro planilhas do catálogo e snapshot binário compilado.
+
+A leitura de xlsx (openpyxl) é lenta; por isso as tabelas validadas e o
+mapeamento PT ↔ EN são gravados num único ficheiro binário, invalidado quando
+o conteúdo (ou a data de modificação) de alguma planilha de origem muda.
+`LazyCatalog` dá acesso às mesmas tabelas a pedido, lendo cada uma só no
+primeiro uso, com pré-carregamento opcional em segundo plano.
+
+Uso em linha de comando:
+    python -m indicadores.catalogo [--snapshot CAMINHO] [--force]
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+import pandas as pd
+
+from indicadores import config
+from indicadores.diagnostico import span
+from indicadores.mapeamento import build_indicator_mapping
+from indicadores.tags import build_tag_index
+
+SNAPSHOT_VERSION = 1
+
+
+def load_inov_tags(path: str) -> pd.DataFrame:
+    """Carrega a tabela de inovações, tags e descrição."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Arquivo não encontrado: {path}")
+    df = pd.read_excel(path)
+    for col in ["Inovação", "Descrição", "Tags"]:
+        if col not in df.columns:
+            raise ValueError(f"A planilha InoDescTagsEng.xlsx deve conter a coluna '{col}'.")
+    return df
+
+
+def load_ind_meta(path: str) -> pd.DataFrame:
+    """Carrega a tabela de metadados de indicadores (modelo do App3)."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Arquivo não encontrado: {path}")
+    df = pd.read_excel(path)
+    for col in ["Indicadores", "Descrição", "Mensuração", "Categoria"]:
+        if col not in df.columns:
+            raise ValueError(f"A planilha IndDescMensCat.xlsx deve conter as colunas 'Indicadores', 'Descrição', 'Mensuração', 'Categoria'.")
+    return df
+
+
+def load_ind_ref(path: str) -> pd.DataFrame:
+    """Carrega a tabela de métricas de referência (indicadores_classificados_114.xlsx)."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Arquivo não encontrado: {path}")
+    df = pd.read_excel(path)
+    for col in ["Indicadores", "Descrição", "Mensuração"]:
+        if col not in df.columns:
+            raise ValueError("A planilha indicadores_classificados_114.xlsx deve conter as colunas 'Indicadores', 'Descrição', 'Mensuração'.")
+    df = df.rename(
+        columns={
+            "Descrição": "Descricao_Ref",
+            "Mensuração": "Mensuracao_Ref",
+            "Categoria": "Categoria_Ref" if "Categoria" in df.columns else "Categoria_Ref"
+        }
+    )
+    return df
+
+
+def load_link_inv_ind(path: str) -> pd.DataFrame:
+    """Carrega a tabela que liga Inovação ↔ Indicador."""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Arquivo não encontrado: {path}")
+    df = pd.read_excel(path)
+    for col in ["Inovação", "Indicador"]:
+        if col not in df.columns:
+            raise ValueError("A planilha Inovação_Ind.xlsx deve conter as colunas 'Inovação' e 'Indicador'.")
+    df["Inovação"] = df["Inovação"].ffill()
+    return df
+
+
+_LOADERS = {
+    "inov_tags": load_inov_tags,
+    "ind_meta": load_ind_meta,
+    "ind_ref": load_ind_ref,
+    "link": load_link_inv_ind,
+}
+
+
+@dataclass
+class Catalogo:
+    """Tabelas do catálogo já validadas, mais o mapeamento PT ↔ EN."""
+
+    inov_tags: pd.DataFrame
+    ind_meta: pd.DataFrame
+    ind_ref: pd.DataFrame
+    link: pd.DataFrame
+    map_ind: pd.DataFrame
+    versao: str
+
+
+def indicator_ids(inovacao: pd.Series, indicador: pd.Series) -> pd.Series:
+    """
+    IDs inteiros estáveis de cada ligação Inovação ↔ Indicador: hash dos
+    nomes (e da ordem de repetição, se o par aparecer mais de uma vez), pelo
+    que não mudam quando outras linhas do catálogo são acrescentadas ou
+    reordenadas.
+    """
+    inov = inovacao.fillna("").astype(str).str.strip()
+    ind = indicador.fillna("").astype(str).str.strip()
+    rep = pd.DataFrame({"i": inov, "n": ind}).groupby(["i", "n"], sort=False).cumcount()
+    ids = [
+        int.from_bytes(
+            hashlib.blake2b(f"{a}\x1f{b}\x1f{k}".encode("utf-8"), digest_size=8).digest(), "big"
+        ) >> 1
+        for a, b, k in zip(inov, ind, rep)
+    ]
+    return pd.Series(ids, index=inovacao.index, dtype="int64", name="Indicador_ID")
+
+
+def build_innovation_view(cat: Catalogo) -> dict:
+    """
+    Vista materializada: para cada inovação, os indicadores ligados já
+    juntos com o mapeamento PT ↔ EN, o modelo (IndDescMensCat) e as métricas
+    de referência (114 indicadores). Calculada uma vez por versão do catálogo.
+    Cada DataFrame é indexado pelo ID estável do indicador (`indicator_ids`).
+    """
+    with span("vista_inovacoes") as sp:
+        vista = _innovation_view(cat)
+        sp["linhas"] = sum(len(g) for g in vista.values())
+    return vista
+
+
+# colunas de nomes guardadas como categóricas na vista (códigos inteiros)
+CATEGORICAL_COLUMNS = [
+    "Inovação",
+    "Indicador",
+    "Indicador_PT",
+    "Indicador_EN",
+    "Indicadores_EN",
+    "Indicadores",
+    "Indicadores_ref",
+    "Categoria",
+]
+
+
+def _codigos(*colunas):
+    """Códigos inteiros (vocabulário comum; -1 = em falta) de várias colunas de nomes."""
+    vocab = pd.Index(pd.unique(pd.concat(colunas, ignore_index=True).dropna()))
+    return [vocab.get_indexer(c) for c in colunas]
+
+
+def _innovation_view(cat: Catalogo) -> dict:
+    # as junções usam códigos inteiros de nomes PT e EN, calculados uma vez
+    # por tabela, em vez de comparar as colunas de texto
+    link, map_ind = cat.link, cat.map_ind
+    c_link, c_map = _codigos(link["Indicador"], map_ind["Indicador_PT"])
+    c_en, c_meta, c_ref = _codigos(map_ind["Indicador_EN"], cat.ind_meta["Indicadores"], cat.ind_ref["Indicadores"])
+
+    df_inv = link.assign(_pt=c_link).merge(map_ind.assign(_pt=c_map, _en=c_en), on="_pt", how="left")
+    df_inv["_en"] = df_inv["_en"].fillna(-1).astype("int64")
+    df_inv["Indicadores_EN"] = df_inv["Indicador_EN"]
+    df_inv_inds = df_inv.merge(
+        cat.ind_meta.assign(_en=c_meta),
+        on="_en",
+        how="left",
+        suffixes=("", "_modelo"),
+    )
+    df_inv_inds = df_inv_inds.merge(
+        cat.ind_ref.assign(_en=c_ref),
+        on="_en",
+        how="left",
+        suffixes=("", "_ref"),
+    )
+    df_inv_inds = df_inv_inds.drop(columns=["_pt", "_en"])
+    df_inv_inds["Indicador_ID"] = indicator_ids(df_inv_inds["Inovação"], df_inv_inds["Indicador"])
+    for col in CATEGORICAL_COLUMNS:
+        if col in df_inv_inds.columns:
+            df_inv_inds[col] = df_inv_inds[col].astype("category")
+
+    inov = df_inv_inds["Inovação"]
+    nomes = [str(v) for v in inov.cat.categories]
+    return {
+        (nomes[k] if k >= 0 else "nan"): grupo.set_axis(pd.Index(grupo["Indicador_ID"].to_numpy()), axis=0)
+        for k, grupo in df_inv_inds.groupby(inov.cat.codes.to_numpy(), sort=False)
+    }
+
+
+# =========================
+# Impressão digital das planilhas de origem
+# =========================
+def _sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for bloco in iter(lambda: fh.read(1 << 20), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _fonte_info(path: str, sha: str = None) -> dict:
+    st_ = os.stat(path)
+    return {
+        "path": os.path.abspath(path),
+        "size": st_.st_size,
+        "mtime_ns": st_.st_mtime_ns,
+        "sha256": sha if sha is not None else _sha256(path),
+    }
+
+
+def _versao(fontes: dict) -> str:
+    h = hashlib.sha256()
+    for nome in sorted(fontes):
+        h.update(nome.encode("utf-8"))
+        h.update(fontes[nome]["sha256"].encode("ascii"))
+    return h.hexdigest()[:16]
+
+
+def _snapshot_valido(snap: dict, paths: dict) -> bool:
+    """Verifica se o snapshot corresponde às planilhas atuais (mtime, senão hash)."""
+    if snap.get("versao_formato") != SNAPSHOT_VERSION:
+        return False
+    fontes = snap.get("fontes", {})
+    for nome, path in paths.items():
+        info = fontes.get(nome)
+        if info is None or not os.path.exists(path):
+            return False
+        if info["path"] != os.path.abspath(path):
+            return False
+        st_ = os.stat(path)
+        if st_.st_size == info["size"] and st_.st_mtime_ns == info["mtime_ns"]:
+            continue
+        if st_.st_size != info["size"] or _sha256(path) != info["sha256"]:
+            return False
+    return True
+
+
+# =========================
+# Compilação e leitura do snapshot
+# =========================
+def compile_catalog(
+    paths: dict = None, snapshot_path: str = None, mapping_cache: str = None, workers: int = None
+) -> Catalogo:
+    """
+    Lê e valida as quatro planilhas, calcula o mapeamento PT ↔ EN (reutilizando
+    a cache `mapping_cache`, se indicada; em `workers` processos, se > 1) e
+    grava tudo num snapshot binário (se `snapshot_path` for indicado).
+    """
+    paths = paths or config.CATALOG_PATHS
+    versao, fontes, tabelas = _compila(paths, mapping_cache, workers)
+    if snapshot_path:
+        _write_snapshot(snapshot_path, versao, fontes, tabelas)
+    return Catalogo(versao=versao, **tabelas)
+
+
+def _compila(paths: dict, mapping_cache: str = None, workers: int = None):
+    """Lê as planilhas e calcula o mapeamento; devolve (versao, fontes, tabelas)."""
+    fontes = {}
+    tabelas = {}
+    for nome, loader in _LOADERS.items():
+        with span(f"ler_planilha_{nome}") as sp:
+            tabelas[nome] = loader(paths[nome])
+            sp["linhas"] = len(tabelas[nome])
+        fontes[nome] = _fonte_info(paths[nome])
+    with span("mapeamento_pt_en") as sp:
+        tabelas["map_ind"] = build_indicator_mapping(tabelas["link"], tabelas["ind_meta"], mapping_cache, workers)
+        sp["linhas"] = len(tabelas["map_ind"])
+    return _versao(fontes), fontes, tabelas
+
+
+def _write_snapshot(snapshot_path: str, versao: str, fontes: dict, tabelas: dict):
+    snap = {
+        "versao_formato": SNAPSHOT_VERSION,
+        "versao": versao,
+        "fontes": fontes,
+        "tabelas": tabelas,
+    }
+    tmp = f"{snapshot_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as fh:
+        pickle.dump(snap, fh, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, snapshot_path)
+
+
+def read_snapshot(snapshot_path: str, paths: dict = None):
+    """Devolve o Catalogo do snapshot, ou None se não existir ou estiver desatualizado."""
+    paths = paths or config.CATALOG_PATHS
+    if not snapshot_path or not os.path.exists(snapshot_path):
+        return None
+    try:
+        with span("ler_snapshot"), open(snapshot_path, "rb") as fh:
+            snap = pickle.load(fh)
+    except Exception:
+        return None
+    if not isinstance(snap, dict) or not _snapshot_valido(snap, paths):
+        return None
+    return Catalogo(versao=snap["versao"], **snap["tabelas"])
+
+
+def load_catalog(paths: dict = None, snapshot_path: str = None, mapping_cache: str = None) -> Catalogo:
+    """Carrega o catálogo do snapshot; compila-o automaticamente se necessário."""
+    paths = paths or config.CATALOG_PATHS
+    if snapshot_path is None:
+        snapshot_path = config.CATALOG_SNAPSHOT
+    cat = read_snapshot(snapshot_path, paths)
+    if cat is not None:
+        return cat
+    versao, fontes, tabelas = _compila(paths, mapping_cache)
+    if snapshot_path:
+        try:
+            _write_snapshot(snapshot_path, versao, fontes, tabelas)
+        except OSError:
+            # sem permissão de escrita para o snapshot: segue com o catálogo já compilado
+            pass
+    return Catalogo(versao=versao, **tabelas)
+
+
+# =========================
+# Catálogo carregado a pedido
+# =========================
+class LazyCatalog:
+    """
+    Catálogo com os mesmos atributos de `Catalogo`, mas carregado a pedido:
+    cada tabela ou estrutura derivada ("map_ind", "vista", "indice_tags") é
+    lida do snapshot (se válido) ou das planilhas no primeiro acesso, uma
+    única vez mesmo com acessos simultâneos (se falhar, o acesso seguinte
+    tenta de novo). `prefetch` antecipa o carregamento em threads de
+    segundo plano.
+    """
+
+    def __init__(self, paths: dict = None, snapshot_path: str = None, mapping_cache: str = None):
+        self.paths = paths or config.CATALOG_PATHS
+        self.snapshot_path = config.CATALOG_SNAPSHOT if snapshot_path is None else snapshot_path
+        self.mapping_cache = mapping_cache
+        self._lock = threading.Lock()
+        self._futuros = {}
+
+    def get(self, nome: str):
+        """Devolve a tabela/estrutura `nome`, carregando-a se necessário."""
+        with self._lock:
+            fut = self._futuros.get(nome)
+            dono = fut is None
+            if dono:
+                fut = self._futuros[nome] = Future()
+        if dono:
+            try:
+                fut.set_result(self._produz(nome))
+            except BaseException as e:
+                # uma falha (ex.: planilha bloqueada) não fica memorizada: o próximo pedido tenta de novo
+                with self._lock:
+                    if self._futuros.get(nome) is fut:
+                        del self._futuros[nome]
+                fut.set_exception(e)
+        return fut.result()
+
+    def loaded(self, nome: str) -> bool:
+        """Indica se `nome` já está disponível (sem erro)."""
+        fut = self._futuros.get(nome)
+        return fut is not None and fut.done() and fut.exception() is None
+
+    def prefetch(self, *nomes: str):
+        """Começa a carregar `nomes` em segundo plano (ignora os já pedidos)."""
+        for nome in nomes:
+            if nome not in self._futuros:
+                threading.Thread(target=self._prefetch, args=(nome,), name=f"catalogo-{nome}", daemon=True).start()
+
+    def _prefetch(self, nome: str):
+        try:
+            self.get(nome)
+        except Exception:
+            pass  # o próximo acesso volta a tentar (e mostra o erro, se persistir)
+
+    def _produz(self, nome: str):
+        if nome == "snapshot":
+            return read_snapshot(self.snapshot_path, self.paths)
+        snap = self.get("snapshot")
+        if snap is not None and nome in ("versao", "map_ind", *_LOADERS):
+            return getattr(snap, nome)
+        if nome in _LOADERS:
+            with span(f"ler_planilha_{nome}") as sp:
+                df = _LOADERS[nome](self.paths[nome])
+                sp["linhas"] = len(df)
+            return df
+        if nome == "fontes":
+            return {n: _fonte_info(self.paths[n]) for n in _LOADERS}
+        if nome == "versao":
+            return _versao(self.get("fontes"))
+        if nome == "map_ind":
+            with span("mapeamento_pt_en") as sp:
+                map_ind = build_indicator_mapping(self.link, self.ind_meta, self.mapping_cache)
+                sp["linhas"] = len(map_ind)
+            self._grava_snapshot(map_ind)
+            return map_ind
+        if nome == "vista":
+            return build_innovation_view(self)
+        if nome == "indice_tags":
+            return build_tag_index(self.inov_tags)
+        raise KeyError(f"Tabela do catálogo desconhecida: '{nome}'")
+
+    def _grava_snapshot(self, map_ind: pd.DataFrame):
+        """Grava o snapshot completo depois de ler as planilhas (melhor esforço)."""
+        if not self.snapshot_path:
+            return
+        tabelas = {n: self.get(n) for n in _LOADERS}
+        tabelas["map_ind"] = map_ind
+        try:
+            _write_snapshot(self.snapshot_path, self.versao, self.get("fontes"), tabelas)
+        except OSError:
+            pass
+
+    @property
+    def inov_tags(self) -> pd.DataFrame:
+        return self.get("inov_tags")
+
+    @property
+    def ind_meta(self) -> pd.DataFrame:
+        return self.get("ind_meta")
+
+    @property
+    def ind_ref(self) -> pd.DataFrame:
+        return self.get("ind_ref")
+
+    @property
+    def link(self) -> pd.DataFrame:
+        return self.get("link")
+
+    @property
+    def map_ind(self) -> pd.DataFrame:
+        return self.get("map_ind")
+
+    @property
+    def versao(self) -> str:
+        return self.get("versao")
+
+
+def sources_signature(paths: dict = None) -> tuple:
+    """Assinatura barata (tamanho, mtime) das planilhas, para chaves de cache."""
+    paths = paths or config.CATALOG_PATHS
+    sig = []
+    for nome in sorted(paths):
+        try:
+            st_ = os.stat(paths[nome])
+            sig.append((nome, st_.st_size, st_.st_mtime_ns))
+        except OSError:
+            sig.append((nome, None, None))
+    return tuple(sig)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Compila as planilhas do catálogo num snapshot binário."
+    )
+    parser.add_argument("--ino-tags", default=config.PATH_INO_TAGS)
+    parser.add_argument("--ind-meta", default=config.PATH_IND_META)
+    parser.add_argument("--ind-ref", default=config.PATH_IND_REF)
+    parser.add_argument("--link", default=config.PATH_LINK_INV_IND)
+    parser.add_argument("--snapshot", default=config.CATALOG_SNAPSHOT)
+    parser.add_argument("--mapping-cache", default=config.MAPPING_CACHE, help="cache do mapeamento PT ↔ EN ('' para não usar)")
+    parser.add_argument("--workers", type=int, default=None, help="processos para o mapeamento PT ↔ EN (por omissão, sequencial)")
+    parser.add_argument("--force", action="store_true", help="recompila mesmo se o snapshot estiver atualizado")
+    args = parser.parse_args(argv)
+
+    paths = {
+        "inov_tags": args.ino_tags,
+        "ind_meta": args.ind_meta,
+        "ind_ref": args.ind_ref,
+        "link": args.link,
+    }
+    t0 = time.perf_counter()
+    try:
+        cat = None if args.force else read_snapshot(args.snapshot, paths)
+        estado = "atualizado"
+        if cat is None:
+            cat = compile_catalog(paths, args.snapshot, args.mapping_cache or None, args.workers)
+            estado = "compilado"
+    except (OSError, ValueError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    dt = (time.perf_counter() - t0) * 1000
+    print(
+        f"Snapshot {estado}: {args.snapshot} (versão {cat.versao}, "
+        f"{len(cat.inov_tags)} inovações, {len(cat.ind_meta)} indicadores, "
+        f"{len(cat.link)} ligações, {len(cat.map_ind)} mapeamentos) em {dt:.0f} ms"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+# =========================
+# indicadores/comparacao.py - Comparação entre projetos
+# =========================
+"""
+Comparação dos projetos entre si, em todos os indicadores.
+
+Os resultados são dispostos numa matriz projetos × indicadores (média dos
+valores de cada projeto, em todas as suas inovações). Cada indicador é
+normalizado por min-max ou z-score, depois de ajustado à escala do seu tipo
+de métrica (`infere_tipo`): contagens, montantes e quantidades físicas,
+muito assimétricos, passam por log(1 + x); percentagens e valores livres
+ficam como estão. As pontuações por Categoria são as médias dos indicadores
+normalizados da categoria, e a pontuação global é a média ponderada das
+categorias. Tudo é calculado com operações sobre a matriz, sem ciclos por
+projeto.
+
+O sentido de cada indicador (maior ou menor é melhor) é deduzido do nome e
+da mensuração (`lower_is_better`: custos, emissões, tempo de retorno, ...)
+e pode ser corrigido por quem consulta a comparação.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from indicadores.mapeamento import normalize_key
+from indicadores.validacao import infere_tipo
+
+NORMALIZATIONS = ["minmax", "zscore"]
+
+# Tipos de métrica (infere_tipo) com valores assimétricos, comparados em log(1 + x)
+_TIPOS_LOG = {"money", "nonneg", "integer"}
+
+# Colunas lidas dos resultados guardados
+COMPARISON_COLUMNS = ["Projeto", "Indicador (PT)", "Categoria", "Mensuração (modelo)", "Valor Normalizado"]
+
+SCORE_COLUMN = "Pontuação global"
+SEM_CATEGORIA = "(sem categoria)"
+
+# Termos (texto normalizado) de indicadores em que menor é melhor...
+_MENOR_MELHOR = (
+    "cost", "custo", "payback", "tempo de retorno", "emiss", "pollution", "polui",
+    "consumo", "consumption", "perda", "loss", "desperdicio", "waste", "residuo",
+)
+# ...exceto se o texto também tiver um destes (benefício/custo, redução de custos, ...)
+_MAIOR_MELHOR = (
+    "benefit", "beneficio", "revenue", "receita", "profit", "lucro", "reduc", "saving",
+    "poupanca", "avoided", "evitad", "sequest", "efficien", "eficien",
+)
+# ...e estes prevalecem sobre as exceções
+_MENOR_MELHOR_SEMPRE = ("inefficien", "ineficien")
+
+
+def lower_is_better(indicador: str, metrica: str = "") -> bool:
+    """Indica se, pelo nome e pela mensuração, um valor menor do indicador é melhor."""
+    texto = f" {normalize_key(indicador or '')} {normalize_key(metrica or '')} "
+    if any(t in texto for t in _MENOR_MELHOR_SEMPRE):
+        return True
+    if any(t in texto for t in _MAIOR_MELHOR):
+        return False
+    return any(t in texto for t in _MENOR_MELHOR)
+
+
+@dataclass(frozen=True)
+class Comparacao:
+    """
+    Matriz projetos × indicadores.
+    - valores: médias por (projeto, indicador); NaN onde o projeto não tem valor
+    - categorias/tipos: categoria e tipo de métrica de cada indicador (colunas)
+    - menor_melhor: sentido deduzido de cada indicador (`lower_is_better`)
+    """
+
+    projetos: list
+    indicadores: list
+    categorias: list
+    tipos: list
+    menor_melhor: list
+    valores: np.ndarray
+
+
+def _primeiro(codigos: np.ndarray, serie: pd.Series, n: int) -> list:
+    """Primeiro valor não vazio de `serie` para cada um dos `n` códigos."""
+    s = serie.fillna("").astype(str)
+    s = s[s != ""]
+    primeiro = s.groupby(codigos[s.index.to_numpy()], sort=True).first()
+    return primeiro.reindex(range(n), fill_value="").tolist()
+
+
+def comparison_matrix(df: pd.DataFrame) -> Comparacao:
+    """
+    Matriz de comparação a partir de resultados (colunas COMPARISON_COLUMNS).
+    Valores não numéricos são ignorados; Projeto/Indicador em falta passam a "".
+    """
+    df = df.reindex(columns=COMPARISON_COLUMNS).reset_index(drop=True)
+    valor = pd.to_numeric(df["Valor Normalizado"], errors="coerce").to_numpy(dtype="float64")
+    cod_proj, projetos = pd.factorize(df["Projeto"].fillna("").astype(str), sort=True)
+    cod_ind, indicadores = pd.factorize(df["Indicador (PT)"].fillna("").astype(str), sort=True)
+    n_proj, n_ind = len(projetos), len(indicadores)
+
+    # médias por célula: somas e contagens num único bincount sobre o índice linear
+    ok = ~np.isnan(valor)
+    celula = cod_proj[ok] * n_ind + cod_ind[ok]
+    soma = np.bincount(celula, weights=valor[ok], minlength=n_proj * n_ind)
+    contagem = np.bincount(celula, minlength=n_proj * n_ind)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        valores = (soma / contagem).reshape(n_proj, n_ind)
+
+    metricas = _primeiro(cod_ind, df["Mensuração (modelo)"], n_ind)
+    return Comparacao(
+        projetos=list(projetos),
+        indicadores=list(indicadores),
+        categorias=_primeiro(cod_ind, df["Categoria"], n_ind),
+        tipos=[infere_tipo(m) if m else "livre" for m in metricas],
+        menor_melhor=[lower_is_better(ind, m) for ind, m in zip(indicadores, metricas)],
+        valores=valores,
+    )
+
+
+def normalize_matrix(comp: Comparacao, metodo: str = "minmax", menor_melhor=None) -> np.ndarray:
+    """
+    Normaliza cada coluna (indicador) da matriz, ignorando os valores em falta:
+    - minmax: 0 (pior) a 1 (melhor); indicadores com um único valor ficam em 0.5
+    - zscore: desvios-padrão em relação à média; sem variação ficam em 0
+    `menor_melhor`: indicadores em que menor é melhor (por omissão, os
+    deduzidos em `comp.menor_melhor`); os seus valores são invertidos.
+    """
+    if metodo not in NORMALIZATIONS:
+        raise ValueError(f"Normalização desconhecida: '{metodo}' (disponíveis: {', '.join(NORMALIZATIONS)}).")
+    x = comp.valores.copy()
+    if x.size == 0:
+        return x
+    log = np.array([t in _TIPOS_LOG for t in comp.tipos], dtype=bool)
+    if log.any():
+        x[:, log] = np.log1p(np.clip(x[:, log], 0, None))
+    if menor_melhor is None:
+        inverte = np.array(comp.menor_melhor, dtype=bool)
+    else:
+        menor_melhor = set(menor_melhor)
+        inverte = np.array([ind in menor_melhor for ind in comp.indicadores], dtype=bool)
+    x[:, inverte] = -x[:, inverte]
+
+    vazia = np.isnan(x).all(axis=0)
+    x_cheio = np.where(vazia, 0.0, x)  # evita avisos do nan* em colunas sem valores
+    if metodo == "minmax":
+        lo, hi = np.nanmin(x_cheio, axis=0), np.nanmax(x_cheio, axis=0)
+        amplitude = hi - lo
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z = np.where(amplitude > 0, (x - lo) / amplitude, 0.5)
+    else:
+        media, desvio = np.nanmean(x_cheio, axis=0), np.nanstd(x_cheio, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            z = np.where(desvio > 0, (x - media) / desvio, 0.0)
+    return np.where(np.isnan(x), np.nan, z)
+
+
+def composite_scores(
+    comp: Comparacao,
+    metodo: str = "minmax",
+    pesos: dict = None,
+    menor_melhor=None,
+) -> pd.DataFrame:
+    """
+    Pontuações por projeto: uma coluna por Categoria (média dos indicadores
+    normalizados), SCORE_COLUMN (média das categorias ponderada por `pesos`,
+    {categoria: peso}, 1 por omissão), "Indicadores" (nº de valores) e
+    "Posição" (1 = melhor). Categorias sem valores não entram na média.
+    `menor_melhor`: como em `normalize_matrix`.
+    """
+    z = normalize_matrix(comp, metodo, menor_melhor)
+    nomes_cat = pd.Series(comp.categorias, dtype=object).replace("", SEM_CATEGORIA)
+    cod_cat, categorias = pd.factorize(nomes_cat, sort=True)
+    # pertença de cada indicador à sua categoria (indicadores × categorias)
+    pertenca = np.zeros((len(comp.indicadores), len(categorias)))
+    pertenca[np.arange(len(comp.indicadores)), cod_cat] = 1.0
+
+    preenchido = ~np.isnan(z)
+    soma_cat = np.where(preenchido, z, 0.0) @ pertenca
+    n_cat = preenchido.astype("float64") @ pertenca
+    with np.errstate(invalid="ignore", divide="ignore"):
+        por_cat = np.where(n_cat > 0, soma_cat / n_cat, np.nan)
+
+    w = np.array([(pesos or {}).get(c, 1.0) for c in categorias], dtype="float64")
+    com_valor = ~np.isnan(por_cat)
+    peso_total = com_valor @ w
+    with np.errstate(invalid="ignore", divide="ignore"):
+        global_ = np.where(peso_total > 0, np.where(com_valor, por_cat, 0.0) @ w / peso_total, np.nan)
+
+    df = pd.DataFrame(por_cat, columns=list(categorias), index=pd.Index(comp.projetos, name="Projeto"))
+    df.insert(0, SCORE_COLUMN, global_)
+    df.insert(1, "Indicadores", preenchido.sum(axis=1))
+    df.insert(0, "Posição", df[SCORE_COLUMN].rank(ascending=False, method="min").astype("Int64"))
+    return df.sort_values(["Posição", SCORE_COLUMN], na_position="last").reset_index()
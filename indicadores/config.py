@@ -0,0 +1,44 @@
+# =========================
+# indicadores/config.py - Caminhos dos ficheiros de dados
+# =========================
+
+# Caminhos dos arquivos (ajuste se necessário no seu ambiente local)
+PATH_INO_TAGS = r"C:\Users\User\Formulario3\InoDescTagsEng.xlsx"
+PATH_IND_META = r"C:\Users\User\Formulario3\IndDescMensCat.xlsx"
+PATH_LINK_INV_IND = r"C:\Users\User\Formulario3\Inovação_Ind.xlsx"
+PATH_IND_REF = r"C:\Users\User\Formulario3\indicadores_classificados_114.xlsx"
+RESULTS_DB = r"C:\Users\User\Formulario3\Resultados_Inovacoes.sqlite"
+# Exportação Excel dos resultados (gerada a pedido na Página 4)
+RESULTS_FILE = r"C:\Users\User\Formulario3\Resultados_Inovacoes.xlsx"
+# Manter as versões substituídas quando um resultado é submetido de novo
+RESULTS_HISTORY = True
+
+# Pasta dos ficheiros exportados a pedido na Página 4 (CSV/Parquet/Excel)
+EXPORT_DIR = r"C:\Users\User\Formulario3\exportacoes"
+
+# Logos (rodapé) e pasta de recursos de imagem: ilustrações de origem
+# opcionais em `ilustracoes/` e miniaturas geradas em `miniaturas/`
+LOGO_CETRAD = r"C:\Users\User\Formulario3\cetrad.png"
+LOGO_VINEWINE = r"C:\Users\User\Formulario3\vinewine.png"
+ASSETS_DIR = r"C:\Users\User\Formulario3\recursos"
+
+# Snapshot binário do catálogo (gerado a partir das quatro planilhas)
+CATALOG_SNAPSHOT = r"C:\Users\User\Formulario3\catalogo.snapshot.pkl"
+
+# Cache do mapeamento PT ↔ EN (por nome de indicador PT)
+MAPPING_CACHE = r"C:\Users\User\Formulario3\mapeamento.cache.pkl"
+
+# Log rotativo com os tempos de cada execução da aplicação
+DIAGNOSTICS_LOG = r"C:\Users\User\Formulario3\diagnostico.log"
+
+CATALOG_PATHS = {
+    "inov_tags": PATH_INO_TAGS,
+    "ind_meta": PATH_IND_META,
+    "ind_ref": PATH_IND_REF,
+    "link": PATH_LINK_INV_IND,
+}
+
+LOGOS = {
+    "logo_cetrad": LOGO_CETRAD,
+    "logo_vinewine": LOGO_VINEWINE,
+}
@@ -0,0 +1,137 @@
+# =========================
+# indicadores/diagnostico.py - Tempos por etapa de cada execução
+# =========================
+"""
+Medição leve do tempo gasto em cada etapa de uma execução da aplicação.
+
+Cada execução (rerun) regista a duração das etapas (leitura das planilhas,
+mapeamento, junções, gravação, gráficos, ...) e o nº de linhas tratadas. No
+fim, acrescenta uma linha JSON a um log local rotativo e atualiza as
+estatísticas do processo, usadas no painel de diagnóstico (p50/p95).
+
+O código do pacote usa `span(nome)`, que só mede quando há uma execução
+ativa na thread atual; fora da aplicação não faz nada.
+"""
+
+import contextlib
+import datetime
+import json
+import logging
+import logging.handlers
+import threading
+import time
+from collections import defaultdict, deque
+
+import numpy as np
+import pandas as pd
+
+# nº de medições guardadas por etapa para os percentis
+MAX_AMOSTRAS = 2000
+LOG_MAX_BYTES = 1_000_000
+LOG_BACKUPS = 3
+
+_AMOSTRAS = defaultdict(lambda: deque(maxlen=MAX_AMOSTRAS))
+_LOCK = threading.Lock()
+_LOCAL = threading.local()
+_LOGGERS = {}
+
+
+def _logger(path: str):
+    """Logger com rotação por tamanho para `path` (None se não puder ser aberto)."""
+    with _LOCK:
+        if path not in _LOGGERS:
+            logger = logging.getLogger(f"indicadores.diagnostico.{len(_LOGGERS)}")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            try:
+                handler = logging.handlers.RotatingFileHandler(
+                    path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+                )
+            except OSError:
+                logger = None
+            else:
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                logger.addHandler(handler)
+            _LOGGERS[path] = logger
+        return _LOGGERS[path]
+
+
+class Rerun:
+    """Tempos de uma execução; usar `start_rerun` para a tornar a execução ativa."""
+
+    def __init__(self, sessao: str, log_path: str = None):
+        self.sessao = sessao
+        self.log_path = log_path
+        self.pagina = None
+        self.etapas = defaultdict(float)
+        self.linhas = {}
+        self._t0 = time.perf_counter()
+        self._terminado = False
+
+    @contextlib.contextmanager
+    def span(self, nome: str):
+        """Mede o bloco; o dicionário devolvido aceita `linhas` (nº de linhas tratadas)."""
+        info = {}
+        t0 = time.perf_counter()
+        try:
+            yield info
+        finally:
+            self.etapas[nome] += (time.perf_counter() - t0) * 1000
+            if "linhas" in info:
+                self.linhas[nome] = int(info["linhas"])
+
+    def finish(self) -> dict:
+        """Fecha a execução: grava a linha no log e atualiza as estatísticas."""
+        if self._terminado:
+            return {}
+        self._terminado = True
+        if getattr(_LOCAL, "atual", None) is self:
+            _LOCAL.atual = None
+        total = (time.perf_counter() - self._t0) * 1000
+        registo = {
+            "ts": datetime.datetime.now().isoformat(timespec="milliseconds"),
+            "sessao": self.sessao,
+            "pagina": self.pagina,
+            "total_ms": round(total, 2),
+            "etapas_ms": {k: round(v, 2) for k, v in self.etapas.items()},
+            "linhas": self.linhas,
+        }
+        with _LOCK:
+            _AMOSTRAS["execucao_total"].append(total)
+            for nome, ms in self.etapas.items():
+                _AMOSTRAS[nome].append(ms)
+        if self.log_path:
+            logger = _logger(self.log_path)
+            if logger is not None:
+                logger.info(json.dumps(registo, ensure_ascii=False))
+        return registo
+
+
+def start_rerun(sessao: str, log_path: str = None) -> Rerun:
+    """Inicia a medição de uma execução e torna-a ativa na thread atual."""
+    rerun = Rerun(sessao, log_path)
+    _LOCAL.atual = rerun
+    return rerun
+
+
+@contextlib.contextmanager
+def span(nome: str):
+    """Mede o bloco na execução ativa (se existir); senão, não faz nada."""
+    rerun = getattr(_LOCAL, "atual", None)
+    if rerun is None:
+        yield {}
+        return
+    with rerun.span(nome) as info:
+        yield info
+
+
+def stage_percentiles() -> pd.DataFrame:
+    """p50/p95 (ms) por etapa, para as execuções deste processo."""
+    with _LOCK:
+        amostras = {k: np.fromiter(v, dtype=float) for k, v in _AMOSTRAS.items() if v}
+    linhas = [
+        (nome, len(v), float(np.percentile(v, 50)), float(np.percentile(v, 95)), float(v.max()))
+        for nome, v in amostras.items()
+    ]
+    df = pd.DataFrame(linhas, columns=["Etapa", "N", "p50 (ms)", "p95 (ms)", "máx (ms)"])
+    return df.sort_values("p95 (ms)", ascending=False, ignore_index=True)
@@ -0,0 +1,135 @@
+# =========================
+# indicadores/escrita.py - Fila única de escrita dos resultados
+# =========================
+"""
+Serializa as gravações de resultados de todas as sessões.
+
+As submissões entram numa fila atendida por uma única thread, que agrupa os
+pedidos pendentes numa só transação (group commit) protegida por um bloqueio
+de ficheiro, para que vários processos também não escrevam em simultâneo.
+Cada submissão recebe um `Future` resolvido só depois da gravação durável.
+"""
+
+import datetime
+import os
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+
+try:  # POSIX
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@dataclass(frozen=True)
+class Confirmacao:
+    """Confirmação de gravação devolvida a cada sessão (registos: nº de registos gravados)."""
+
+    registos: int
+    primeiro_id: int | None
+    ultimo_id: int | None
+    gravado_em: str
+
+
+class FileLock:
+    """Bloqueio exclusivo entre processos, baseado num ficheiro `.lock`."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fh = None
+
+    def __enter__(self):
+        self._fh = open(self.path, "a+b")
+        if fcntl is not None:
+            fcntl.flock(self._fh.fileno(), fcntl.LOCK_EX)
+        else:
+            self._fh.seek(0)
+            msvcrt.locking(self._fh.fileno(), msvcrt.LK_LOCK, 1)
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fh.fileno(), fcntl.LOCK_UN)
+            else:
+                self._fh.seek(0)
+                msvcrt.locking(self._fh.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._fh.close()
+            self._fh = None
+        return False
+
+
+class ResultsWriter:
+    """
+    Escritor único de resultados.
+    - max_lote: número máximo de submissões agrupadas numa transação
+    - espera_lote: tempo (s) que o escritor espera por mais submissões
+    """
+
+    def __init__(self, store, max_lote: int = 64, espera_lote: float = 0.02):
+        self.store = store
+        self.max_lote = max_lote
+        self.espera_lote = espera_lote
+        self._fila = queue.Queue()
+        self._lock_path = os.path.abspath(getattr(store, "path", "resultados")) + ".lock"
+        self._thread = None
+        self._arranque = threading.Lock()
+
+    def submit(self, df) -> Future:
+        """Coloca `df` na fila de escrita e devolve um Future com a Confirmacao."""
+        fut = Future()
+        self._garante_thread()
+        self._fila.put((df, fut))
+        return fut
+
+    def _garante_thread(self):
+        with self._arranque:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="results-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _proximo_lote(self):
+        lote = [self._fila.get()]
+        while len(lote) < self.max_lote:
+            try:
+                lote.append(self._fila.get(timeout=self.espera_lote))
+            except queue.Empty:
+                break
+        return lote
+
+    def _grava(self, lote):
+        with FileLock(self._lock_path):
+            intervalos = self.store.append_many([df for df, _ in lote])
+        agora = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        for (df, fut), intervalo in zip(lote, intervalos):
+            # registos efetivamente gravados (valores iguais aos já guardados não contam)
+            if isinstance(intervalo, tuple):
+                primeiro, ultimo = intervalo
+                n = ultimo - primeiro + 1
+            else:
+                primeiro, ultimo, n = None, None, intervalo or 0
+            fut.set_result(Confirmacao(n, primeiro, ultimo, agora))
+
+    def _run(self):
+        while True:
+            lote = self._proximo_lote()
+            lote = [(df, fut) for df, fut in lote if fut.set_running_or_notify_cancel()]
+            if not lote:
+                continue
+            try:
+                self._grava(lote)
+            except Exception:
+                # uma submissão inválida não deve derrubar as restantes do lote
+                for df, fut in lote:
+                    if fut.done():
+                        continue
+                    try:
+                        self._grava([(df, fut)])
+                    except Exception as e:
+                        fut.set_exception(e)
@@ -0,0 +1,204 @@
+# =========================
+# indicadores/exportacao.py - Exportação dos resultados filtrados
+# =========================
+"""
+Exportação da vista filtrada dos resultados (Página 4) para CSV, Parquet ou
+Excel.
+
+Os resultados são lidos do armazenamento em blocos e escritos à medida, sem
+montar a tabela completa em memória. Cada exportação corre numa thread de
+segundo plano (`Exportador`), partilhada por todas as sessões, e termina
+num ficheiro temporário pronto a descarregar.
+"""
+
+import datetime
+import importlib.util
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+import pandas as pd
+
+from indicadores.resultados import RESULT_COLUMNS
+
+EXPORT_CHUNK_ROWS = 50_000
+
+# Limite de linhas de uma folha Excel (incluindo o cabeçalho)
+XLSX_MAX_ROWS = 1_048_576
+
+# formato → (descrição, extensão, tipo MIME)
+EXPORT_FORMATS = {
+    "csv": ("CSV", ".csv", "text/csv"),
+    "parquet": ("Parquet", ".parquet", "application/vnd.apache.parquet"),
+    "xlsx": ("Excel", ".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+def available_formats() -> list:
+    """Formatos de exportação suportados neste ambiente (Parquet requer o pyarrow)."""
+    # só verifica se o pyarrow está instalado; é importado apenas ao exportar
+    parquet = importlib.util.find_spec("pyarrow") is not None
+    return [f for f in EXPORT_FORMATS if f != "parquet" or parquet]
+
+
+def _escreve_csv(blocos, path: str, colunas: list) -> int:
+    n = 0
+    # utf-8 com BOM, para o Excel reconhecer os acentos ao abrir o CSV
+    with open(path, "w", encoding="utf-8-sig", newline="") as fh:
+        pd.DataFrame(columns=colunas).to_csv(fh, index=False)
+        for df in blocos:
+            df.to_csv(fh, index=False, header=False)
+            n += len(df)
+    return n
+
+
+_TIPOS_PARQUET = {"Valor Normalizado": "float64", "Data/Hora": "timestamp"}
+
+
+def _esquema_parquet(pa, colunas: list):
+    tipos = {"float64": pa.float64(), "timestamp": pa.timestamp("s")}
+    return pa.schema([(c, tipos.get(_TIPOS_PARQUET.get(c), pa.string())) for c in colunas])
+
+
+def _coluna_parquet(serie: pd.Series) -> pd.Series:
+    tipo = _TIPOS_PARQUET.get(serie.name)
+    if tipo == "float64":
+        return pd.to_numeric(serie, errors="coerce")
+    if tipo == "timestamp":
+        return pd.to_datetime(serie, errors="coerce").astype("datetime64[s]")
+    return serie.map(lambda v: None if pd.isna(v) else str(v))
+
+
+def _escreve_parquet(blocos, path: str, colunas: list) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("A exportação para Parquet requer o pacote 'pyarrow'.") from None
+    esquema = _esquema_parquet(pa, colunas)
+    n = 0
+    with pq.ParquetWriter(path, esquema) as writer:
+        for df in blocos:
+            # esquema fixo: texto em todas as colunas, exceto o valor e a data/hora
+            dados = pd.DataFrame({c: _coluna_parquet(df[c]) for c in colunas})
+            writer.write_table(pa.Table.from_pandas(dados, schema=esquema, preserve_index=False))
+            n += len(df)
+    return n
+
+
+def _escreve_xlsx(blocos, path: str, colunas: list) -> int:
+    from openpyxl import Workbook
+
+    # modo só de escrita: as linhas vão para o disco à medida que são acrescentadas
+    wb = Workbook(write_only=True)
+    folha, linhas_folha, n = None, XLSX_MAX_ROWS, 0
+    for df in blocos:
+        dados = df.astype(object).where(df.notna(), None)
+        for linha in dados.itertuples(index=False, name=None):
+            if linhas_folha >= XLSX_MAX_ROWS:
+                # históricos maiores do que uma folha continuam na seguinte
+                folha = wb.create_sheet(f"Resultados {len(wb.worksheets) + 1}" if wb.worksheets else "Resultados")
+                folha.append(colunas)
+                linhas_folha = 1
+            folha.append(list(linha))
+            linhas_folha += 1
+            n += 1
+    if folha is None:
+        wb.create_sheet("Resultados").append(colunas)
+    wb.save(path)
+    return n
+
+
+_ESCRITORES = {"csv": _escreve_csv, "parquet": _escreve_parquet, "xlsx": _escreve_xlsx}
+
+
+def write_export(blocos, path: str, formato: str, colunas: list = None) -> int:
+    """
+    Escreve os blocos de resultados em `path` no `formato` indicado e devolve
+    o número de linhas. O ficheiro só aparece em `path` depois de completo.
+    """
+    if formato not in _ESCRITORES:
+        raise ValueError(
+            f"Formato de exportação não suportado: '{formato}' (disponíveis: {', '.join(available_formats())})."
+        )
+    colunas = list(colunas) if colunas is not None else list(RESULT_COLUMNS)
+    blocos = (df.reindex(columns=colunas) for df in blocos)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        n = _ESCRITORES[formato](blocos, tmp, colunas)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return n
+
+
+@dataclass(frozen=True)
+class Exportacao:
+    """Ficheiro exportado, pronto a descarregar."""
+
+    path: str
+    nome_ficheiro: str
+    mime: str
+    linhas: int
+    gerado_em: str
+
+
+class Exportador:
+    """
+    Exportações em segundo plano, partilhadas por todas as sessões.
+    - pasta: onde ficam os ficheiros exportados
+    - max_paralelo: exportações em simultâneo (as restantes esperam na fila)
+    - guardar: nº de ficheiros mantidos; os mais antigos são apagados
+    """
+
+    def __init__(self, store, pasta: str, max_paralelo: int = 2, guardar: int = 16):
+        self.store = store
+        self.pasta = pasta
+        self.guardar = guardar
+        self._executor = ThreadPoolExecutor(max_workers=max_paralelo, thread_name_prefix="results-export")
+        self._ficheiros = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        formato: str,
+        projeto: str = None,
+        inovacao: str = None,
+        columns: list = None,
+        chunksize: int = EXPORT_CHUNK_ROWS,
+    ) -> Future:
+        """Inicia a exportação dos resultados filtrados; o Future devolve uma Exportacao."""
+        if formato not in available_formats():
+            raise ValueError(
+                f"Formato de exportação não suportado: '{formato}' (disponíveis: {', '.join(available_formats())})."
+            )
+        return self._executor.submit(self._exporta, formato, projeto, inovacao, columns, chunksize)
+
+    def _exporta(self, formato, projeto, inovacao, columns, chunksize) -> Exportacao:
+        _, ext, mime = EXPORT_FORMATS[formato]
+        os.makedirs(self.pasta, exist_ok=True)
+        agora = datetime.datetime.now()
+        path = os.path.join(self.pasta, f"resultados_{agora:%Y%m%d_%H%M%S}_{uuid.uuid4().hex[:8]}{ext}")
+        blocos = self.store.read_chunks(projeto=projeto, inovacao=inovacao, columns=columns, chunksize=chunksize)
+        n = write_export(blocos, path, formato, columns)
+        self._regista(path)
+        return Exportacao(path, f"Resultados_Inovacoes{ext}", mime, n, agora.strftime("%Y-%m-%d %H:%M:%S"))
+
+    def _regista(self, path: str):
+        with self._lock:
+            self._ficheiros[path] = True
+            antigos = []
+            while len(self._ficheiros) > self.guardar:
+                antigos.append(self._ficheiros.popitem(last=False)[0])
+        for p in antigos:
+            try:
+                os.remove(p)
+            except OSError:
+                pass
@@ -0,0 +1,72 @@
+# =========================
+# indicadores/formulario.py - Valores do formulário de uma sessão
+# =========================
+"""
+Valores validados e erros do formulário da Página 3, por inovação e por ID
+estável do indicador (ver catalogo.indicator_ids).
+
+Só são mantidas as inovações mais recentes da sessão: ao ativar uma nova
+inovação, as que o utilizador deixou são descartadas (com as chaves dos
+campos do formulário registadas para elas), para que sessões longas não
+cresçam sem limite.
+"""
+
+from collections import OrderedDict
+
+MAX_INOVACOES = 1
+
+
+class FormularioSessao:
+    """
+    Valores (ID → valor normalizado), erros (ID → mensagem) e chaves dos
+    campos do formulário, por inovação.
+    """
+
+    def __init__(self, max_inovacoes: int = MAX_INOVACOES):
+        self.max_inovacoes = max_inovacoes
+        self._inovacoes = OrderedDict()
+
+    def _dados(self, inovacao: str) -> tuple:
+        return self._inovacoes.setdefault(inovacao, ({}, {}, set()))
+
+    def ativa(self, inovacao: str) -> list:
+        """
+        Marca `inovacao` como atual e devolve as chaves dos campos das
+        inovações descartadas (para serem retiradas da sessão).
+        """
+        self._dados(inovacao)
+        self._inovacoes.move_to_end(inovacao)
+        campos = []
+        while len(self._inovacoes) > self.max_inovacoes:
+            _, (_, _, chaves) = self._inovacoes.popitem(last=False)
+            campos.extend(sorted(chaves))
+        return campos
+
+    def valores(self, inovacao: str) -> dict:
+        return self._inovacoes.get(inovacao, ({}, {}, set()))[0]
+
+    def erros(self, inovacao: str) -> dict:
+        return self._inovacoes.get(inovacao, ({}, {}, set()))[1]
+
+    def regista(self, inovacao: str, ind_id: int, valor_bruto, ok: bool, valor, msg: str, campos=()):
+        """
+        Guarda o resultado da validação de um indicador: um valor inválido
+        substitui o valor válido anterior pelo erro; campo vazio limpa ambos.
+        `campos`: chaves dos campos do formulário usados para o indicador.
+        """
+        valores, erros, chaves = self._dados(inovacao)
+        chaves.update(campos)
+        ind_id = int(ind_id)
+        if ok:
+            valores[ind_id] = valor
+            erros.pop(ind_id, None)
+        elif str(valor_bruto).strip() != "":
+            valores.pop(ind_id, None)
+            erros[ind_id] = msg
+        else:
+            valores.pop(ind_id, None)
+            erros.pop(ind_id, None)
+
+    def __len__(self) -> int:
+        """Nº de indicadores com valor válido guardado."""
+        return sum(len(v) for v, _, _ in self._inovacoes.values())
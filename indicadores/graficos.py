@@ -0,0 +1,52 @@
+# =========================
+# indicadores/graficos.py - Preparação dos dados dos gráficos
+# =========================
+"""
+Redução de séries longas antes de as enviar para o navegador.
+
+Os gráficos da Página 4 sobre históricos grandes (10⁵+ pontos) não mostram
+todos os pontos: a série é dividida em intervalos consecutivos e, de cada
+um, só ficam o mínimo e o máximo (os picos continuam visíveis). Acima de
+`WEBGL_MIN_POINTS` pontos, o traçado usa WebGL em vez de SVG.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Nº máximo de pontos enviados para um gráfico de série
+MAX_CHART_POINTS = 4000
+
+# A partir deste nº de pontos, o Plotly desenha com WebGL
+WEBGL_MIN_POINTS = 1000
+
+
+def downsample_minmax(df: pd.DataFrame, x: str, y: str, max_pontos: int = MAX_CHART_POINTS) -> pd.DataFrame:
+    """
+    Reduz `df` (ordenado por `x`) a no máximo `max_pontos` linhas, mantendo
+    o mínimo e o máximo de `y` em cada um de `max_pontos // 2` intervalos
+    consecutivos. Linhas com `y` em falta são descartadas.
+    """
+    df = df[df[y].notna()]
+    n = len(df)
+    if n <= max_pontos:
+        return df.reset_index(drop=True)
+    n_int = max(max_pontos // 2, 1)
+    intervalo = (np.arange(n) * n_int) // n
+    valores = df[y].to_numpy(dtype="float64")
+    # ordena por (intervalo, valor): o primeiro de cada intervalo é o mínimo e o último o máximo
+    ordem = np.lexsort((valores, intervalo))
+    inicio = np.searchsorted(intervalo, np.arange(n_int), side="left")
+    fim = np.searchsorted(intervalo, np.arange(n_int), side="right") - 1
+    escolhidos = np.unique(np.concatenate([ordem[inicio], ordem[fim]]))
+    return df.iloc[escolhidos].reset_index(drop=True)
+
+
+def series_plan(df: pd.DataFrame, x: str, y: str, max_pontos: int = MAX_CHART_POINTS):
+    """
+    Dados e modo de desenho de um gráfico de série: devolve (dados
+    reduzidos, "webgl" ou "svg", nº de pontos originais).
+    """
+    n = int(df[y].notna().sum())
+    dados = downsample_minmax(df, x, y, max_pontos)
+    modo = "webgl" if len(dados) >= WEBGL_MIN_POINTS else "svg"
+    return dados, modo, n
@@ -0,0 +1,260 @@
+# =========================
+# indicadores/ingestao.py - Importação em massa de valores de indicadores
+# =========================
+"""
+Importação de ficheiros CSV/Excel com valores recolhidos fora da aplicação.
+
+Cada ficheiro deve ter as colunas Projeto, Inovação, Indicador e Valor. Os
+indicadores são resolvidos pelo nome da planilha Inovação_Ind.xlsx ou, se não
+coincidir, pelo mesmo mapeamento PT ↔ EN da aplicação; os valores são
+validados com as regras de `valida_valor`. Os ficheiros são preparados em
+paralelo e todos os registos aceites são gravados numa única transação.
+
+Uso em linha de comando:
+    python -m indicadores.ingestao FICHEIRO [FICHEIRO ...] [--workers N] [--dry-run]
+"""
+
+import argparse
+import datetime
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from indicadores import config
+from indicadores.catalogo import build_innovation_view, load_catalog
+from indicadores.escrita import FileLock
+from indicadores.mapeamento import build_indicator_mapping, normalize_key
+from indicadores.resultados import make_result_records, open_results_store
+from indicadores.validacao import valida_lote
+
+INPUT_COLUMNS = ["Projeto", "Inovação", "Indicador", "Valor"]
+_INPUT_KEYS = {normalize_key(c): c for c in INPUT_COLUMNS}
+
+MOTIVO_INOVACAO = "Inovação desconhecida."
+MOTIVO_INDICADOR = "Indicador não associado a esta inovação."
+
+
+def read_input(path: str) -> pd.DataFrame:
+    """Lê um ficheiro CSV/Excel de entrada, com os valores como texto."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xlsx", ".xlsm", ".xls"):
+        df = pd.read_excel(path, dtype=str)
+    elif ext in (".csv", ".txt"):
+        df = pd.read_csv(path, dtype=str, sep=None, engine="python", encoding="utf-8-sig")
+    else:
+        raise ValueError(f"Formato de ficheiro não suportado: '{ext}' (use CSV ou Excel).")
+    df = df.rename(columns=lambda c: _INPUT_KEYS.get(normalize_key(c), c))
+    for col in INPUT_COLUMNS:
+        if col not in df.columns:
+            raise ValueError(f"O ficheiro {os.path.basename(path)} deve conter a coluna '{col}'.")
+    df = df[INPUT_COLUMNS].copy()
+    # nº da linha no ficheiro original (cabeçalho = linha 1)
+    df.insert(0, "Linha", df.index + 2)
+    return df
+
+
+def _lookup_tables(view: dict):
+    """Tabelas de procura (Inovação, Indicador PT) e (Inovação, Indicador EN)."""
+    todas = pd.concat(view.values(), ignore_index=True) if view else pd.DataFrame(columns=["Inovação", "Indicador", "Indicadores_EN"])
+    todas["Inovação"] = todas["Inovação"].astype(str)
+    por_pt = todas.assign(_chave=todas["Indicador"].astype(str).str.strip())
+    por_pt = por_pt.drop_duplicates(["Inovação", "_chave"])
+    por_en = todas[todas["Indicadores_EN"].notna()].assign(_chave=lambda d: d["Indicadores_EN"].astype(str))
+    por_en = por_en.drop_duplicates(["Inovação", "_chave"])
+    return por_pt, por_en, set(view.keys())
+
+
+def prepare_file(path: str, catalogo, tabelas=None, data_hora: datetime.datetime = None) -> dict:
+    """
+    Resolve e valida um ficheiro de entrada. Devolve um dicionário com os
+    registos aceites (formato RESULT_COLUMNS), as linhas rejeitadas e as
+    estatísticas do ficheiro.
+    """
+    t0 = time.perf_counter()
+    if tabelas is None:
+        tabelas = _lookup_tables(build_innovation_view(catalogo))
+    por_pt, por_en, inovacoes = tabelas
+
+    df = read_input(path)
+    df["Inovação"] = df["Inovação"].fillna("").astype(str).str.strip()
+    df["Indicador"] = df["Indicador"].fillna("").astype(str).str.strip()
+
+    # 1) pelo nome do indicador na planilha Inovação_Ind.xlsx
+    res = df.merge(
+        por_pt,
+        how="left",
+        left_on=["Inovação", "Indicador"],
+        right_on=["Inovação", "_chave"],
+        suffixes=("", "_cat"),
+    )
+    res.index = df.index
+
+    # 2) pelo mapeamento PT ↔ EN (mesma lógica da aplicação)
+    falta = res["_chave"].isna()
+    if falta.any():
+        nomes = pd.DataFrame({"Indicador": df.loc[falta, "Indicador"].unique()})
+        mapa = build_indicator_mapping(nomes, catalogo.ind_meta)
+        mapa = dict(zip(mapa["Indicador_PT"], mapa["Indicador_EN"]))
+        alt = df.loc[falta].assign(_en=lambda d: d["Indicador"].map(mapa))
+        alt = alt.merge(
+            por_en,
+            how="left",
+            left_on=["Inovação", "_en"],
+            right_on=["Inovação", "_chave"],
+            suffixes=("", "_cat"),
+        )
+        alt.index = df.index[falta]
+        res = pd.concat([res[~falta], alt.drop(columns="_en")]).reindex(df.index)
+
+    resolvido = res["_chave"].notna()
+    motivo = pd.Series("", index=df.index, dtype=object)
+    motivo[~resolvido & ~df["Inovação"].isin(inovacoes)] = MOTIVO_INOVACAO
+    motivo[~resolvido & df["Inovação"].isin(inovacoes)] = MOTIVO_INDICADOR
+
+    # 3) validação em bloco dos valores resolvidos
+    ok_rows = res[resolvido]
+    metricas = ok_rows["Mensuração"].where(ok_rows["Mensuração"].notna(), "").astype(str)
+    val = valida_lote(df.loc[resolvido, "Valor"], metricas)
+    motivo[val.index[~val["ok"]]] = val.loc[~val["ok"], "msg"]
+
+    aceites = val.index[val["ok"]]
+    linhas_ok = res.loc[aceites].assign(Indicador=res.loc[aceites, "Indicador_cat"])
+    registos = make_result_records(
+        linhas_ok,
+        val.loc[aceites, "valor"],
+        df.loc[aceites, "Projeto"].fillna("").astype(str).str.strip().tolist(),
+        df.loc[aceites, "Inovação"].tolist(),
+        data_hora=data_hora,
+    )
+    rejeitados = df[motivo != ""].assign(Motivo=motivo[motivo != ""])
+
+    return {
+        "ficheiro": path,
+        "linhas": len(df),
+        "aceites": len(registos),
+        "rejeitados": rejeitados,
+        "registos": registos,
+        "segundos": time.perf_counter() - t0,
+    }
+
+
+# =========================
+# Execução em paralelo (um ficheiro por tarefa)
+# =========================
+_WORKER = {}
+
+
+def _init_worker(catalogo):
+    _WORKER["catalogo"] = catalogo
+    _WORKER["tabelas"] = _lookup_tables(build_innovation_view(catalogo))
+
+
+def _prepare_worker(path: str, data_hora: datetime.datetime) -> dict:
+    try:
+        return prepare_file(path, _WORKER["catalogo"], _WORKER["tabelas"], data_hora)
+    except Exception as e:
+        return {"ficheiro": path, "erro": str(e)}
+
+
+def ingest_files(paths, catalogo, store=None, workers: int = None, dry_run: bool = False) -> dict:
+    """
+    Prepara os ficheiros em paralelo e grava todos os registos aceites numa
+    única transação (salvo `dry_run`). Devolve os relatórios por ficheiro.
+    """
+    data_hora = datetime.datetime.now().replace(microsecond=0)
+    workers = workers or min(len(paths), os.cpu_count() or 1)
+    if workers <= 1 or len(paths) <= 1:
+        _init_worker(catalogo)
+        relatorios = [_prepare_worker(p, data_hora) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(catalogo,)) as ex:
+            relatorios = list(ex.map(_prepare_worker, paths, [data_hora] * len(paths)))
+
+    blocos = [r["registos"] for r in relatorios if "registos" in r and len(r["registos"])]
+    t0 = time.perf_counter()
+    gravados = 0
+    if blocos and not dry_run:
+        with FileLock(os.path.abspath(store.path) + ".lock"):
+            store.append_many(blocos)
+        gravados = sum(len(b) for b in blocos)
+    return {
+        "relatorios": relatorios,
+        "gravados": gravados,
+        "segundos_gravacao": time.perf_counter() - t0,
+    }
+
+
+def _imprime_relatorio(resultado: dict, max_erros: int, out=sys.stdout):
+    print(f"{'ficheiro':<40} {'linhas':>8} {'aceites':>8} {'rejeit.':>8} {'tempo (s)':>10} {'linhas/s':>10}", file=out)
+    for r in resultado["relatorios"]:
+        nome = os.path.basename(r["ficheiro"])
+        if "erro" in r:
+            print(f"{nome:<40} ERRO: {r['erro']}", file=out)
+            continue
+        taxa = r["linhas"] / r["segundos"] if r["segundos"] > 0 else float("inf")
+        print(
+            f"{nome:<40} {r['linhas']:>8} {r['aceites']:>8} {len(r['rejeitados']):>8} "
+            f"{r['segundos']:>10.2f} {taxa:>10.0f}",
+            file=out,
+        )
+    for r in resultado["relatorios"]:
+        rej = r.get("rejeitados")
+        if rej is None or rej.empty:
+            continue
+        print(f"\nLinhas rejeitadas em {os.path.basename(r['ficheiro'])}:", file=out)
+        for lin in rej.head(max_erros).itertuples(index=False):
+            valor = "" if pd.isna(lin.Valor) else lin.Valor
+            print(f"  linha {lin.Linha}: {lin.Inovação} / {lin.Indicador} = '{valor}' -> {lin.Motivo}", file=out)
+        if len(rej) > max_erros:
+            print(f"  ... e mais {len(rej) - max_erros} linhas", file=out)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Importa valores de indicadores (Projeto, Inovação, Indicador, Valor) de ficheiros CSV/Excel."
+    )
+    parser.add_argument("ficheiros", nargs="+")
+    parser.add_argument("--db", default=config.RESULTS_DB, help="armazenamento de resultados")
+    parser.add_argument("--snapshot", default=config.CATALOG_SNAPSHOT)
+    parser.add_argument("--workers", type=int, default=None, help="nº de processos (por omissão, 1 por ficheiro até ao nº de CPUs)")
+    parser.add_argument("--dry-run", action="store_true", help="só valida, sem gravar")
+    parser.add_argument("--rejeitados", default=None, help="grava as linhas rejeitadas neste CSV")
+    parser.add_argument("--max-erros", type=int, default=20, help="linhas rejeitadas mostradas por ficheiro")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    try:
+        catalogo = load_catalog(config.CATALOG_PATHS, args.snapshot, config.MAPPING_CACHE)
+        store = None if args.dry_run else open_results_store(args.db, history=config.RESULTS_HISTORY)
+        resultado = ingest_files(args.ficheiros, catalogo, store, workers=args.workers, dry_run=args.dry_run)
+    except (OSError, ValueError) as e:
+        print(f"Erro: {e}", file=sys.stderr)
+        return 1
+    total = time.perf_counter() - t0
+
+    _imprime_relatorio(resultado, args.max_erros)
+
+    rejeitados = [
+        r["rejeitados"].assign(Ficheiro=r["ficheiro"])
+        for r in resultado["relatorios"]
+        if r.get("rejeitados") is not None and not r["rejeitados"].empty
+    ]
+    if args.rejeitados and rejeitados:
+        pd.concat(rejeitados, ignore_index=True).to_csv(args.rejeitados, index=False)
+
+    linhas = sum(r.get("linhas", 0) for r in resultado["relatorios"])
+    acao = "validados (dry-run)" if args.dry_run else f"gravados em '{args.db}'"
+    n = sum(r.get("aceites", 0) for r in resultado["relatorios"]) if args.dry_run else resultado["gravados"]
+    print(
+        f"\n{n} de {linhas} registos {acao} em {total:.2f} s "
+        f"({linhas / total if total > 0 else 0:.0f} linhas/s; gravação {resultado['segundos_gravacao']:.2f} s)"
+    )
+    erros = any("erro" in r for r in resultado["relatorios"])
+    return 2 if erros or rejeitados else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
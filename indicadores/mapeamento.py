@@ -0,0 +1,282 @@
+# =========================
+# indicadores/mapeamento.py - Mapeamento Indicador (PT) ↔ Indicadores (modelo)
+# =========================
+"""
+Mapeamento entre os nomes dos indicadores da Inovação_Ind.xlsx (PT) e os da
+IndDescMensCat.xlsx (modelo).
+
+O resultado de cada nome PT pode ser guardado numa cache em disco, associada
+ao conjunto de nomes candidatos: quando as planilhas mudam, só os nomes PT
+novos são comparados; a cache inteira é descartada quando a lista de
+indicadores da IndDescMensCat.xlsx muda.
+
+Para catálogos grandes, os nomes PT podem ser comparados em paralelo num
+conjunto de processos (`workers`), com resultado idêntico ao modo sequencial.
+"""
+
+import difflib
+import hashlib
+import os
+import pickle
+import re
+import threading
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+MAPPING_CACHE_VERSION = 2
+
+# abaixo deste nº de nomes PT a comparar, o modo paralelo não compensa
+MIN_PARALLEL = 500
+
+
+def normalize_key(s: str) -> str:
+    """Normaliza texto para comparação (sem acentos, minúsculo, sem pontuação)."""
+    s = unicodedata.normalize("NFKD", str(s))
+    s = "".join(ch for ch in s if not unicodedata.combining(ch))
+    s = s.lower()
+    s = re.sub(r"[^a-z0-9]+", " ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+
+def extract_abbrev_token(name: str):
+    """Extrai um token de abreviação entre parênteses, ex.: (ROI), (PBP), (LCC)."""
+    m = re.search(r"\(([^)]+)\)", str(name))
+    if m:
+        content = m.group(1).strip()
+        token = re.split(r"[ /]", content)[0].strip()
+        if len(token) >= 2:
+            return token
+    return None
+
+
+class FuzzyIndex:
+    """
+    Procura do nome mais parecido sobre chaves já normalizadas, com o mesmo
+    resultado de `difflib.get_close_matches(query, keys, n=1, cutoff)`.
+
+    As chaves ficam ordenadas por comprimento, com as contagens de
+    caracteres numa matriz. Para cada consulta, só a faixa de chaves com
+    comprimento compatível com o `cutoff` (o `real_quick_ratio`) é
+    considerada; nessa faixa, o limite superior de `SequenceMatcher.ratio()`
+    (o `quick_ratio`) é calculado de uma só vez. As chaves são depois
+    pontuadas por ordem decrescente desse limite, parando quando nenhuma das
+    restantes pode igualar a melhor pontuação ou o `cutoff`.
+    """
+
+    def __init__(self, keys):
+        self.keys = list(dict.fromkeys(keys))
+        self._exatas = set(self.keys)
+        self._ordenadas = sorted(self.keys, key=len)
+        self._comprimentos = np.array([len(k) for k in self._ordenadas], dtype=np.float64)
+        self._alfabeto = {ch: j for j, ch in enumerate(sorted({ch for k in self.keys for ch in k}))}
+        self._contagens = np.zeros((len(self.keys), len(self._alfabeto)), dtype=np.int32)
+        for i, k in enumerate(self._ordenadas):
+            for ch in k:
+                self._contagens[i, self._alfabeto[ch]] += 1
+
+    def _faixa(self, lq: int, cutoff: float) -> tuple:
+        """Posições [inicio, fim) das chaves com 2·min(lq, lk)/(lq + lk) ≥ cutoff."""
+        if cutoff <= 0:
+            return 0, len(self._ordenadas)
+        # lk ∈ [lq·c/(2−c), lq·(2−c)/c], com margem; o teste exato é feito na faixa
+        lo = lq * cutoff / (2 - cutoff) - 1
+        hi = lq * (2 - cutoff) / cutoff + 1
+        inicio = int(np.searchsorted(self._comprimentos, lo, side="left"))
+        fim = int(np.searchsorted(self._comprimentos, hi, side="right"))
+        return inicio, fim
+
+    def _limites(self, query: str, inicio: int, fim: int) -> np.ndarray:
+        """`quick_ratio()` de `query` com as chaves da faixa (limite superior de `ratio()`)."""
+        q = np.zeros(len(self._alfabeto), dtype=np.int32)
+        for ch in query:
+            j = self._alfabeto.get(ch)
+            if j is not None:
+                q[j] += 1
+        comuns = np.minimum(self._contagens[inicio:fim], q).sum(axis=1)
+        total = self._comprimentos[inicio:fim] + len(query)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(total > 0, 2.0 * comuns / total, 1.0)
+
+    def candidates(self, query: str, cutoff: float = 0.8) -> list:
+        """Chaves que podem atingir o `cutoff`, por ordem decrescente do limite superior."""
+        inicio, fim = self._faixa(len(query), cutoff)
+        if inicio >= fim:
+            return []
+        # real_quick_ratio, calculado como no difflib
+        lk = self._comprimentos[inicio:fim]
+        total = lk + len(query)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            comprimento_ok = np.where(total > 0, 2.0 * np.minimum(lk, len(query)) / total, 1.0) >= cutoff
+        limites = self._limites(query, inicio, fim)
+        elegiveis = np.flatnonzero(comprimento_ok & (limites >= cutoff))
+        ordem = elegiveis[np.argsort(-limites[elegiveis], kind="stable")]
+        return [(float(limites[i]), self._ordenadas[inicio + i]) for i in ordem]
+
+    def best_match(self, query: str, cutoff: float = 0.8):
+        """Equivalente a `get_close_matches(query, keys, n=1, cutoff)`."""
+        if query in self._exatas:
+            return query
+        s = difflib.SequenceMatcher()
+        s.set_seq2(query)
+        melhor = None
+        for limite, k in self.candidates(query, cutoff):
+            if melhor is not None and limite < melhor[0]:
+                break  # nenhuma das restantes chega à melhor pontuação
+            s.set_seq1(k)
+            # os mesmos testes, pela mesma ordem, de get_close_matches
+            if s.real_quick_ratio() >= cutoff and s.quick_ratio() >= cutoff:
+                score = s.ratio()
+                if score >= cutoff and (melhor is None or (score, k) > melhor):
+                    melhor = (score, k)
+        return melhor[1] if melhor else None
+
+
+def _hash_texto(texto: str) -> str:
+    return hashlib.sha1(texto.encode("utf-8")).hexdigest()
+
+
+def _hash_candidatos(en_list: list) -> str:
+    h = hashlib.sha256()
+    for name in en_list:
+        h.update(name.encode("utf-8"))
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+def _le_cache(path: str, candidatos: str) -> dict:
+    """Entradas {hash do nome PT: (Indicador_EN, método)} válidas para `candidatos`."""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "rb") as fh:
+            cache = pickle.load(fh)
+    except Exception:
+        return {}
+    if (
+        not isinstance(cache, dict)
+        or cache.get("versao_formato") != MAPPING_CACHE_VERSION
+        or cache.get("candidatos") != candidatos
+    ):
+        return {}
+    return cache.get("entradas", {})
+
+
+def _grava_cache(path: str, candidatos: str, entradas: dict):
+    """Grava a cache de forma atómica (melhor esforço: erros de escrita são ignorados)."""
+    cache = {"versao_formato": MAPPING_CACHE_VERSION, "candidatos": candidatos, "entradas": entradas}
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as fh:
+            pickle.dump(cache, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+class _Matcher:
+    """Estruturas de procura sobre os nomes candidatos (abreviações e texto normalizado)."""
+
+    def __init__(self, en_list: list):
+        # mapa de abreviações
+        self.meta_abbrev = {}
+        for name in en_list:
+            ab = extract_abbrev_token(name)
+            if ab:
+                self.meta_abbrev.setdefault(ab, []).append(name)
+
+        # mapa de texto normalizado e índice de procura (construídos uma vez)
+        self.meta_norm_map = {normalize_key(n): n for n in en_list}
+        self.index = FuzzyIndex(self.meta_norm_map.keys())
+
+    def match(self, pt_name: str):
+        """Devolve (Indicador_EN, método) para um nome PT."""
+        ab = extract_abbrev_token(pt_name)
+        chosen = None
+        method = None
+
+        # 1) tentar por abreviação
+        if ab and ab in self.meta_abbrev and len(self.meta_abbrev[ab]) == 1:
+            chosen = self.meta_abbrev[ab][0]
+            method = "abbrev"
+
+        # 2) se ainda não casou, tentar similaridade de texto
+        if chosen is None:
+            n = normalize_key(pt_name)
+            candidate = self.index.best_match(n, cutoff=0.8)
+            if candidate is not None:
+                chosen = self.meta_norm_map[candidate]
+                method = "similar"
+
+        return chosen, method if chosen is not None else "nenhum"
+
+
+# =========================
+# Execução em paralelo (cada processo tem a sua cópia dos candidatos)
+# =========================
+_WORKER = {}
+
+
+def _init_worker(en_list: list):
+    _WORKER["matcher"] = _Matcher(en_list)
+
+
+def _match_chunk(nomes: list) -> list:
+    matcher = _WORKER["matcher"]
+    return [matcher.match(n) for n in nomes]
+
+
+def _match_all(en_list: list, nomes: list, workers: int = None) -> list:
+    """Resultados de `nomes`, pela mesma ordem; em paralelo se `workers` > 1."""
+    if not workers or workers <= 1 or len(nomes) < MIN_PARALLEL:
+        matcher = _Matcher(en_list)
+        return [matcher.match(n) for n in nomes]
+    # blocos contíguos, recombinados pela ordem original (resultado determinístico)
+    tamanho = -(-len(nomes) // (workers * 4))
+    blocos = [nomes[i:i + tamanho] for i in range(0, len(nomes), tamanho)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(en_list,)) as ex:
+        return [r for bloco in ex.map(_match_chunk, blocos) for r in bloco]
+
+
+def build_indicator_mapping(
+    df_link: pd.DataFrame, df_meta: pd.DataFrame, cache_path: str = None, workers: int = None
+) -> pd.DataFrame:
+    """
+    Constrói uma tabela de mapeamento entre:
+    - Indicador (PT) da Inovação_Ind.xlsx
+    - Indicadores (EN/PT misto) da IndDescMensCat.xlsx
+    Usa abreviações (ROI, PBP, LCC...) e similaridade (via FuzzyIndex).
+    Com `cache_path`, reutiliza os resultados guardados para os nomes PT já
+    conhecidos e só compara os restantes; com `workers` > 1, compara-os num
+    conjunto de processos.
+    """
+    pt_list = df_link["Indicador"].dropna().astype(str).unique().tolist()
+    en_list = df_meta["Indicadores"].dropna().astype(str).unique().tolist()
+
+    candidatos = _hash_candidatos(en_list) if cache_path else None
+    guardadas = _le_cache(cache_path, candidatos) if cache_path else {}
+    chaves = [_hash_texto(n) for n in pt_list] if cache_path else [None] * len(pt_list)
+
+    faltam = [n for n, k in zip(pt_list, chaves) if k not in guardadas]
+    novos = iter(_match_all(en_list, faltam, workers) if faltam else [])
+    resultados = [guardadas[k] if k in guardadas else next(novos) for k in chaves]
+
+    if cache_path and faltam:
+        # só os nomes PT atuais (a cache não cresce com nomes removidos)
+        _grava_cache(cache_path, candidatos, dict(zip(chaves, resultados)))
+    return _mapping_frame(pt_list, resultados)
+
+
+def _mapping_frame(pt_list: list, resultados: list) -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            {"Indicador_PT": pt, "Indicador_EN": en, "Metodo_Mapeamento": metodo}
+            for pt, (en, metodo) in zip(pt_list, resultados)
+        ]
+    )
@@ -0,0 +1,229 @@
+# =========================
+# indicadores/recursos.py - Imagens locais (logos e ilustrações)
+# =========================
+"""
+Recursos de imagem da aplicação, preparados localmente (sem acesso à rede).
+
+As logos e as ilustrações por categoria de inovação (ver
+indicadores.apresentacao) são redimensionadas com o Pillow para o tamanho em
+que são mostradas e gravadas numa pasta de miniaturas com o hash do conteúdo
+no nome: só voltam a ser geradas quando a imagem de origem ou o tamanho
+mudam. Uma vez carregadas, ficam em memória (`AssetCache`), pelo que mostrar
+uma página não lê o disco nem a rede.
+
+Se existir `ilustracoes/<categoria>.png` (ou .jpg) na pasta de recursos, essa
+imagem é usada como ilustração da categoria; caso contrário, é desenhada uma
+ilustração simples com as cores da categoria.
+
+Uso em linha de comando (pré-gera as miniaturas):
+    python -m indicadores.recursos
+"""
+
+import argparse
+import hashlib
+import io
+import os
+import sys
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageOps
+
+from indicadores.apresentacao import VISUAL_CATEGORIES
+
+ASSET_FORMAT_VERSION = 1
+
+# Tamanhos gerados (o dobro do tamanho mostrado, para ecrãs de alta densidade)
+LOGO_WIDTH = 300
+ILLUSTRATION_SIZE = (640, 400)
+
+# Cores das ilustrações geradas, por categoria (início e fim do degradê)
+_CORES = {
+    "clima": ("#6a9739", "#184868"),
+    "vinha": ("#6d2e5a", "#b5577b"),
+    "energia": ("#f0b323", "#d35400"),
+    "agua": ("#1f78b4", "#7fc4e8"),
+    "digital": ("#184868", "#3a7ca5"),
+    "carbono": ("#2f4f4f", "#6a9739"),
+    "geral": ("#184868", "#6a9739"),
+}
+
+_EXTENSOES_ORIGEM = (".png", ".jpg", ".jpeg", ".webp")
+
+
+@dataclass(frozen=True)
+class Recurso:
+    """Imagem pronta a mostrar."""
+
+    nome: str
+    dados: bytes
+    mime: str
+    largura: int
+    altura: int
+    hash: str
+
+
+def _hash(*partes: bytes) -> str:
+    h = hashlib.blake2b(digest_size=8)
+    h.update(str(ASSET_FORMAT_VERSION).encode())
+    for p in partes:
+        h.update(p)
+        h.update(b"\x1f")
+    return h.hexdigest()
+
+
+def _png(img: Image.Image) -> bytes:
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", optimize=True)
+    return buf.getvalue()
+
+
+def render_logo(origem: bytes, largura: int = LOGO_WIDTH) -> bytes:
+    """Logo redimensionada para `largura` píxeis (proporções mantidas), em PNG."""
+    img = Image.open(io.BytesIO(origem))
+    img.load()
+    if img.width > largura:
+        img = img.resize((largura, round(img.height * largura / img.width)), Image.Resampling.LANCZOS)
+    return _png(img)
+
+
+def render_photo(origem: bytes, tamanho: tuple = ILLUSTRATION_SIZE) -> bytes:
+    """Imagem de origem recortada ao centro e redimensionada para `tamanho`, em PNG."""
+    img = Image.open(io.BytesIO(origem))
+    img = ImageOps.fit(ImageOps.exif_transpose(img).convert("RGB"), tamanho, Image.Resampling.LANCZOS)
+    return _png(img)
+
+
+def _rgb(cor: str) -> tuple:
+    return tuple(int(cor[i:i + 2], 16) for i in (1, 3, 5))
+
+
+def render_illustration(categoria: str, tamanho: tuple = ILLUSTRATION_SIZE) -> bytes:
+    """Ilustração gerada para uma categoria: degradê diagonal e círculos translúcidos, em PNG."""
+    largura, altura = tamanho
+    inicio, fim = (_rgb(c) for c in _CORES.get(categoria, _CORES["geral"]))
+    # degradê diagonal: máscara proporcional a x + y
+    diagonal = np.add.outer(np.arange(altura), np.arange(largura)) * 255 // max(largura + altura - 2, 1)
+    mascara = Image.fromarray(diagonal.astype(np.uint8), mode="L")
+    img = Image.composite(Image.new("RGB", tamanho, fim), Image.new("RGB", tamanho, inicio), mascara)
+
+    camada = Image.new("RGBA", tamanho, (0, 0, 0, 0))
+    desenho = ImageDraw.Draw(camada)
+    # posições derivadas do nome da categoria (sempre as mesmas)
+    semente = hashlib.blake2b(categoria.encode(), digest_size=16).digest()
+    for i in range(5):
+        cx = semente[3 * i] * largura // 255
+        cy = semente[3 * i + 1] * altura // 255
+        r = altura // 8 + semente[3 * i + 2] * altura // (255 * 3)
+        desenho.ellipse((cx - r, cy - r, cx + r, cy + r), fill=(255, 255, 255, 40))
+    img = Image.alpha_composite(img.convert("RGBA"), camada)
+    return _png(img.convert("RGB"))
+
+
+def _le(path: str) -> bytes:
+    with open(path, "rb") as fh:
+        return fh.read()
+
+
+class AssetCache:
+    """
+    Logos e ilustrações em memória, partilhadas por todas as sessões.
+    - logos: {nome: caminho da imagem de origem}
+    - pasta: pasta de recursos (`ilustracoes/` de origem e `miniaturas/` geradas)
+    """
+
+    def __init__(self, logos: dict, pasta: str = None):
+        self.logos = dict(logos)
+        self.pasta = pasta
+        self._recursos = {}
+        self._lock = threading.Lock()
+
+    def _origem_ilustracao(self, categoria: str):
+        if not self.pasta:
+            return None
+        for ext in _EXTENSOES_ORIGEM:
+            p = os.path.join(self.pasta, "ilustracoes", categoria + ext)
+            if os.path.exists(p):
+                return p
+        return None
+
+    def _prepara(self, nome: str, chave: str, gera) -> Recurso:
+        """Miniatura `nome` com hash `chave`: lida da pasta de miniaturas ou gerada e gravada."""
+        dados = None
+        path = os.path.join(self.pasta, "miniaturas", f"{nome}.{chave}.png") if self.pasta else None
+        if path and os.path.exists(path):
+            dados = _le(path)
+        if dados is None:
+            dados = gera()
+            if path:
+                # melhor esforço: sem permissão de escrita, fica só em memória
+                tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                try:
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    with open(tmp, "wb") as fh:
+                        fh.write(dados)
+                    os.replace(tmp, path)
+                except OSError:
+                    try:
+                        os.remove(tmp)
+                    except OSError:
+                        pass
+        with Image.open(io.BytesIO(dados)) as img:
+            largura, altura = img.size
+        return Recurso(nome, dados, "image/png", largura, altura, chave)
+
+    def _produz(self, nome: str):
+        if nome in self.logos:
+            path = self.logos[nome]
+            if not os.path.exists(path):
+                return None
+            origem = _le(path)
+            return self._prepara(nome, _hash(origem, str(LOGO_WIDTH).encode()), lambda: render_logo(origem))
+        if nome.startswith("ilustracao_"):
+            categoria = nome[len("ilustracao_"):]
+            path = self._origem_ilustracao(categoria)
+            tamanho = "x".join(map(str, ILLUSTRATION_SIZE)).encode()
+            if path is not None:
+                origem = _le(path)
+                return self._prepara(nome, _hash(origem, tamanho), lambda: render_photo(origem))
+            return self._prepara(
+                nome,
+                _hash(b"gerada", categoria.encode(), repr(_CORES.get(categoria)).encode(), tamanho),
+                lambda: render_illustration(categoria),
+            )
+        raise KeyError(nome)
+
+    def get(self, nome: str):
+        """Recurso `nome` (logo ou "ilustracao_<categoria>"), ou None se a origem não existir."""
+        with self._lock:
+            if nome not in self._recursos:
+                self._recursos[nome] = self._produz(nome)
+            return self._recursos[nome]
+
+    def names(self) -> list:
+        return list(self.logos) + [f"ilustracao_{c}" for c in VISUAL_CATEGORIES]
+
+    def preload(self) -> int:
+        """Prepara todos os recursos; devolve quantos ficaram disponíveis."""
+        return sum(self.get(n) is not None for n in self.names())
+
+
+def main(argv=None) -> int:
+    from indicadores import config
+
+    parser = argparse.ArgumentParser(description="Pré-gera as miniaturas das logos e das ilustrações.")
+    parser.add_argument("--pasta", default=config.ASSETS_DIR, help="pasta de recursos")
+    args = parser.parse_args(argv)
+    cache = AssetCache(config.LOGOS, args.pasta)
+    for nome in cache.names():
+        r = cache.get(nome)
+        if r is None:
+            print(f"{nome}: imagem de origem não encontrada")
+        else:
+            print(f"{nome}: {r.largura}×{r.altura}, {len(r.dados) / 1024:.0f} KB ({r.hash})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
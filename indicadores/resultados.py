@@ -0,0 +1,674 @@
+# =========================
+# indicadores/resultados.py - Armazenamento dos resultados das inovações
+# =========================
+"""
+Backends de armazenamento para os resultados submetidos na Página 3.
+
+Cada indicador tem um único valor atual por projeto e inovação: gravar de
+novo a mesma chave (Projeto, Inovação, Indicador (PT)) substitui o valor
+anterior, sem reler nem reescrever o resto do histórico; gravar o mesmo
+valor outra vez não altera nada. As versões substituídas podem ser mantidas
+numa tabela de revisões. A exportação para
+Excel é uma operação explícita, feita a pedido.
+
+Os resultados estão organizados por inovação e por mês de submissão (índices
+do SQLite); os filtros e as colunas pedidas na leitura são aplicados na
+própria consulta, pelo que só é lida a parte do histórico selecionada.
+
+A data/hora de cada registo é guardada como instante (segundos desde 1970,
+coluna `ts`) e lida como datetime. A cada gravação são também atualizadas as
+séries por indicador e por dia, semana e mês (ver agregados.rollup_results).
+Os agregados e as contagens usam só os valores atuais; as séries mostram a
+evolução dos valores submetidos: com `history`, incluem também as versões
+substituídas, cada uma no período em que foi submetida; sem histórico (e nos
+backends sem revisões), só os valores atuais.
+"""
+
+import datetime
+import os
+import sqlite3
+
+import pandas as pd
+
+from indicadores.agregados import AGG_KEYS, ROLLUP_COLUMNS, ROLLUP_PERIODS, aggregate_results, rollup_results
+
+# Colunas (nome apresentado, nome no armazenamento)
+_COLUMN_MAP = [
+    ("Projeto", "projeto"),
+    ("Inovação", "inovacao"),
+    ("Indicador (PT)", "indicador_pt"),
+    ("Indicador (modelo/ref)", "indicador_modelo"),
+    ("Descrição (modelo)", "descricao_modelo"),
+    ("Mensuração (modelo)", "mensuracao_modelo"),
+    ("Categoria", "categoria"),
+    ("Descrição Referência", "descricao_ref"),
+    ("Mensuração Referência", "mensuracao_ref"),
+    ("Valor Normalizado", "valor"),
+    ("Data/Hora", "data_hora"),
+]
+
+RESULT_COLUMNS = [c for c, _ in _COLUMN_MAP]
+# Chave única de cada resultado (o valor atual do indicador no projeto)
+RESULT_KEY = ["Projeto", "Inovação", "Indicador (PT)"]
+_TO_SQL = dict(_COLUMN_MAP)
+_FROM_SQL = {s: c for c, s in _COLUMN_MAP}
+# a data/hora é lida do instante guardado (ts), não do texto
+_SELECT = {**_TO_SQL, "Data/Hora": "ts AS data_hora"}
+
+_EPOCH = pd.Timestamp(0)
+
+_CHAVE_SQL = [_TO_SQL[c] for c in RESULT_KEY]
+
+# versão do conteúdo da tabela `series`; outra versão faz recalcular as séries
+_FORMATO_SERIES = 3
+
+# Registos de origem das séries por período: os valores atuais e, com histórico,
+# também as revisões (que lá continuam quando um valor é substituído)
+_COLUNAS_SERIE = "projeto, inovacao, indicador_pt, ts, valor"
+_ORIGEM_ATUAIS = f"SELECT {_COLUNAS_SERIE} FROM resultados"
+_ORIGEM_HISTORICO = f"{_ORIGEM_ATUAIS} UNION ALL SELECT {_COLUNAS_SERIE} FROM revisoes"
+_ORIGEM_IDS = f"{_ORIGEM_ATUAIS} WHERE id BETWEEN ? AND ?"
+_ORIGEM_CHAVE = f"{_ORIGEM_ATUAIS} WHERE projeto = ? AND inovacao = ? AND indicador_pt = ?"
+
+
+def _agora_ts() -> int:
+    """Instante atual (hora local), em segundos, como na coluna `ts`."""
+    return int((pd.Timestamp.now().floor("s") - _EPOCH) // pd.Timedelta(seconds=1))
+
+# Início de cada período, a partir do instante `ts` (semanas a começar à segunda-feira)
+_PERIODOS_SQL = {
+    "dia": "date(ts, 'unixepoch')",
+    "semana": "date(ts, 'unixepoch', 'weekday 0', '-6 days')",
+    "mes": "date(ts, 'unixepoch', 'start of month')",
+}
+
+
+def _texto(serie) -> list:
+    return [str(v) if pd.notna(v) else "" for v in serie]
+
+
+def make_result_records(
+    rows: pd.DataFrame, valores, projeto, inovacao, data_hora: datetime.datetime = None
+) -> pd.DataFrame:
+    """
+    Constrói os registos de resultados (colunas RESULT_COLUMNS) a partir de
+    linhas da vista por inovação (ver catalogo.build_innovation_view) e dos
+    valores já validados. `projeto` e `inovacao` podem ser escalares ou
+    sequências alinhadas com `rows`.
+    """
+    data_hora = pd.Timestamp(data_hora if data_hora is not None else datetime.datetime.now()).floor("s")
+    n = len(rows)
+
+    def col(nome):
+        return _texto(rows[nome]) if nome in rows.columns else [""] * n
+
+    return pd.DataFrame(
+        {
+            "Projeto": projeto if projeto is not None else "",
+            "Inovação": inovacao,
+            "Indicador (PT)": [str(v) for v in rows["Indicador"]],
+            "Indicador (modelo/ref)": col("Indicadores_EN"),
+            "Descrição (modelo)": col("Descrição"),
+            "Mensuração (modelo)": col("Mensuração"),
+            "Categoria": col("Categoria"),
+            "Descrição Referência": col("Descricao_Ref"),
+            "Mensuração Referência": col("Mensuracao_Ref"),
+            "Valor Normalizado": list(valores),
+            "Data/Hora": data_hora,
+        },
+        index=range(n),
+        columns=RESULT_COLUMNS,
+    )
+
+
+class ResultsStore:
+    """Interface comum dos backends de resultados."""
+
+    def append(self, df: pd.DataFrame) -> int:
+        """
+        Grava os registos de `df` (substituindo os de chave RESULT_KEY já
+        guardados) e devolve o número de linhas gravadas.
+        """
+        raise NotImplementedError
+
+    def append_many(self, dfs) -> list:
+        """Grava vários blocos de registos; por omissão, um de cada vez."""
+        return [self.append(df) for df in dfs]
+
+    def read(
+        self,
+        projeto: str = None,
+        inovacao: str = None,
+        limit: int = None,
+        columns: list = None,
+        mes: str = None,
+        indicador: str = None,
+    ) -> pd.DataFrame:
+        """
+        Devolve os resultados guardados (colunas em RESULT_COLUMNS, ou só as de
+        `columns`), opcionalmente filtrados por projeto, inovação, mês de
+        submissão ("AAAA-MM") e indicador (PT); com `limit`, só os registos
+        mais recentes.
+        """
+        raise NotImplementedError
+
+    def read_chunks(
+        self,
+        projeto: str = None,
+        inovacao: str = None,
+        columns: list = None,
+        mes: str = None,
+        indicador: str = None,
+        chunksize: int = 50_000,
+        revisoes: bool = False,
+    ):
+        """
+        Como `read`, mas devolve os resultados em blocos de até `chunksize`
+        linhas; com `revisoes`, também as versões substituídas que o backend
+        mantém (por ordem de submissão).
+        """
+        df = self.read(projeto=projeto, inovacao=inovacao, columns=columns, mes=mes, indicador=indicador)
+        for i in range(0, len(df), chunksize):
+            yield df.iloc[i:i + chunksize]
+
+    def aggregates(self, projeto: str = None, inovacao: str = None) -> pd.DataFrame:
+        """Somas e contagens por (Projeto, Inovação, Categoria); ver indicadores.agregados."""
+        return aggregate_results(self.read(projeto=projeto, inovacao=inovacao))
+
+    def rollups(
+        self, periodo: str, projeto: str = None, inovacao: str = None, indicador: str = None
+    ) -> pd.DataFrame:
+        """
+        Nº de valores, média, mínimo e máximo por indicador e por `periodo`
+        ("dia", "semana" ou "mes"); ver agregados.rollup_results. Incluem as
+        revisões que o backend mantém (aqui, só os valores atuais).
+        """
+        return rollup_results(self.read(projeto=projeto, inovacao=inovacao, indicador=indicador), periodo)
+
+    def filter_options(self):
+        """Listas ordenadas de projetos e de inovações com resultados."""
+        agg = self.aggregates()
+        return sorted(agg["Projeto"].unique().tolist()), sorted(agg["Inovação"].unique().tolist())
+
+    def revisions(self, projeto: str, inovacao: str, indicador: str) -> pd.DataFrame:
+        """
+        Valores gravados para uma chave, por ordem cronológica: as revisões
+        mantidas e o valor atual (coluna "Atual").
+        """
+        return self.read(projeto=projeto, inovacao=inovacao, indicador=indicador).assign(Atual=True)
+
+    def count(self) -> int:
+        """Número de registos guardados (valores atuais)."""
+        raise NotImplementedError
+
+    def data_version(self) -> int:
+        """
+        Versão dos dados guardados: muda a cada gravação (também quando um
+        valor é substituído), pelo que serve de chave para caches de
+        resultados derivados (gráficos, resumos).
+        """
+        raise NotImplementedError
+
+    def export_excel(self, path: str) -> int:
+        """Exporta todos os resultados para um ficheiro Excel."""
+        df = self.read()
+        df.to_excel(path, index=False)
+        return len(df)
+
+
+class SQLiteResultsStore(ResultsStore):
+    """
+    Resultados numa tabela SQLite, com índice único sobre a chave
+    (projeto, inovacao, indicador_pt).
+    - history: mantém as versões substituídas na tabela `revisoes` (e nas séries)
+    """
+
+    def __init__(self, path: str, history: bool = True):
+        self.path = path
+        self.history = history
+        # as séries dependem do modo: mudar `history` faz recalculá-las
+        self._formato_series = f"{_FORMATO_SERIES}:{'historico' if history else 'atual'}"
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        con = sqlite3.connect(self.path, timeout=30)
+        con.execute("PRAGMA journal_mode=WAL")
+        return con
+
+    def _init_schema(self):
+        cols = ", ".join(
+            f"{s} NUMERIC" if s == "valor" else f"{s} TEXT" for _, s in _COLUMN_MAP
+        )
+        con = self._connect()
+        try:
+            with con:
+                con.execute(
+                    f"CREATE TABLE IF NOT EXISTS resultados (id INTEGER PRIMARY KEY AUTOINCREMENT, {cols})"
+                )
+                con.execute("CREATE TABLE IF NOT EXISTS meta (chave TEXT PRIMARY KEY, valor TEXT)")
+                con.execute(
+                    "CREATE TABLE IF NOT EXISTS agregados ("
+                    "projeto TEXT NOT NULL, inovacao TEXT NOT NULL, categoria TEXT NOT NULL, "
+                    "soma REAL NOT NULL, contagem INTEGER NOT NULL, linhas INTEGER NOT NULL, "
+                    "PRIMARY KEY (projeto, inovacao, categoria))"
+                )
+                con.execute("CREATE INDEX IF NOT EXISTS agregados_inovacao ON agregados (inovacao)")
+                colunas = [r[1] for r in con.execute("PRAGMA table_xinfo(resultados)")]
+                if "mes" not in colunas:
+                    # mês de submissão (AAAA-MM), calculado a partir de data_hora
+                    con.execute(
+                        "ALTER TABLE resultados ADD COLUMN "
+                        "mes TEXT GENERATED ALWAYS AS (substr(data_hora, 1, 7)) VIRTUAL"
+                    )
+                con.execute("CREATE INDEX IF NOT EXISTS resultados_inovacao_mes ON resultados (inovacao, mes)")
+                con.execute("CREATE INDEX IF NOT EXISTS resultados_inovacao_id ON resultados (inovacao, id)")
+                con.execute("CREATE INDEX IF NOT EXISTS resultados_projeto_id ON resultados (projeto, id)")
+                con.execute("CREATE INDEX IF NOT EXISTS resultados_indicador_id ON resultados (indicador_pt, id)")
+                if "ts" not in colunas:
+                    # instante de submissão; bases anteriores só tinham o texto de data_hora
+                    con.execute("ALTER TABLE resultados ADD COLUMN ts INTEGER")
+                    con.execute(
+                        "UPDATE resultados SET ts = CAST(strftime('%s', data_hora) AS INTEGER) "
+                        "WHERE data_hora IS NOT NULL"
+                    )
+                con.execute(
+                    f"CREATE TABLE IF NOT EXISTS revisoes (id INTEGER PRIMARY KEY, {cols}, "
+                    "ts INTEGER, substituido_em INTEGER)"
+                )
+                con.execute(
+                    "CREATE INDEX IF NOT EXISTS revisoes_chave ON revisoes (projeto, inovacao, indicador_pt)"
+                )
+                indices = {r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+                if "resultados_chave" not in indices:
+                    self._migra_chave_unica(con)
+                con.execute(
+                    "CREATE TABLE IF NOT EXISTS series ("
+                    "periodo TEXT NOT NULL, projeto TEXT NOT NULL, inovacao TEXT NOT NULL, "
+                    "indicador_pt TEXT NOT NULL, inicio INTEGER NOT NULL, "
+                    "contagem INTEGER NOT NULL, soma REAL NOT NULL, minimo REAL NOT NULL, maximo REAL NOT NULL, "
+                    "PRIMARY KEY (periodo, inovacao, indicador_pt, projeto, inicio))"
+                )
+                formato = con.execute("SELECT valor FROM meta WHERE chave = 'formato_series'").fetchone()
+                if formato is None or str(formato[0]) != self._formato_series:
+                    # bases criadas antes das séries por período (ou noutro modo de histórico)
+                    con.execute("DELETE FROM series")
+                    self._update_series(con, _ORIGEM_HISTORICO if self.history else _ORIGEM_ATUAIS, [()])
+                    con.execute(
+                        "INSERT OR REPLACE INTO meta (chave, valor) VALUES ('formato_series', ?)",
+                        (self._formato_series,),
+                    )
+                (n_agg,) = con.execute("SELECT COUNT(*) FROM agregados").fetchone()
+                if n_agg == 0:
+                    # bases criadas antes da tabela de agregados
+                    con.execute(
+                        "INSERT INTO agregados "
+                        "SELECT COALESCE(projeto, ''), COALESCE(inovacao, ''), COALESCE(categoria, ''), "
+                        "TOTAL(CASE WHEN typeof(valor) IN ('integer', 'real') THEN valor END), "
+                        "SUM(typeof(valor) IN ('integer', 'real')), COUNT(*) "
+                        "FROM resultados GROUP BY 1, 2, 3"
+                    )
+        finally:
+            con.close()
+
+    def _migra_chave_unica(self, con: sqlite3.Connection):
+        """
+        Bases anteriores ao índice único: só o registo mais recente de cada
+        chave fica em `resultados`; os anteriores passam para `revisoes`.
+        """
+        for col in _CHAVE_SQL:
+            con.execute(f"UPDATE resultados SET {col} = '' WHERE {col} IS NULL")
+        nomes = ", ".join(["id"] + [s for _, s in _COLUMN_MAP] + ["ts"])
+        antigos = (
+            "SELECT id FROM resultados WHERE id NOT IN "
+            f"(SELECT MAX(id) FROM resultados GROUP BY {', '.join(_CHAVE_SQL)})"
+        )
+        con.execute(
+            f"INSERT INTO revisoes ({nomes}, substituido_em) SELECT {nomes}, ? FROM resultados WHERE id IN ({antigos})",
+            (_agora_ts(),),
+        )
+        con.execute(f"DELETE FROM resultados WHERE id IN ({antigos})")
+        # os agregados passam a contar só os valores atuais (recalculados em _init_schema)
+        con.execute("DELETE FROM agregados")
+        con.execute("DELETE FROM meta WHERE chave = 'formato_series'")
+        con.execute(f"CREATE UNIQUE INDEX resultados_chave ON resultados ({', '.join(_CHAVE_SQL)})")
+
+    def _insert(self, con: sqlite3.Connection, df: pd.DataFrame):
+        """
+        Grava `df` na ligação aberta e devolve (primeiro_id, ultimo_id) dos
+        registos inseridos, ou None se todos os valores já estavam guardados.
+        """
+        dados = df.reindex(columns=RESULT_COLUMNS)
+        dados[RESULT_KEY] = dados[RESULT_KEY].astype(object).where(dados[RESULT_KEY].notna(), "").astype(str)
+        # a mesma chave repetida no bloco: cada repetição substitui a anterior, por ordem
+        repeticao = dados.groupby(RESULT_KEY, sort=False).cumcount()
+        intervalos = [self._upsert(con, dados[repeticao == k]) for k in range(int(repeticao.max()) + 1)]
+        intervalos = [i for i in intervalos if i is not None]
+        return (intervalos[0][0], intervalos[-1][1]) if intervalos else None
+
+    def _upsert(self, con: sqlite3.Connection, dados: pd.DataFrame):
+        """
+        Grava um bloco sem chaves repetidas, substituindo os valores atuais
+        dessas chaves. Chaves cujo valor não mudou ficam como estão (sem nova
+        revisão nem novo id); devolve None se nenhum registo foi inserido.
+        """
+        chaves = dados[RESULT_KEY + ["Valor Normalizado"]].astype(object)
+        chaves = chaves.where(chaves.notna(), None)
+        # mesma afinidade (NUMERIC) da coluna valor, para comparar como o SQLite guarda
+        con.execute(f"CREATE TEMP TABLE IF NOT EXISTS chaves ({', '.join(_CHAVE_SQL)}, valor NUMERIC)")
+        con.execute("DELETE FROM temp.chaves")
+        con.executemany("INSERT INTO temp.chaves VALUES (?, ?, ?, ?)", chaves.itertuples(index=False, name=None))
+        # valores atuais das mesmas chaves (procura pelo índice único)
+        juncao = " AND ".join(f"r.{c} = k.{c}" for c in _CHAVE_SQL)
+        antigos = pd.read_sql_query(
+            "SELECT r.id, r.projeto, r.inovacao, r.indicador_pt, r.categoria, r.valor, r.valor IS k.valor AS igual "
+            f"FROM temp.chaves k JOIN resultados r ON {juncao}",
+            con,
+        ).rename(columns=_FROM_SQL)
+        iguais = antigos[antigos["igual"] == 1]
+        if len(iguais):
+            # reenvio do mesmo valor: nada a gravar para essas chaves
+            mantidas = pd.MultiIndex.from_frame(iguais[RESULT_KEY])
+            dados = dados[~pd.MultiIndex.from_frame(dados[RESULT_KEY]).isin(mantidas)]
+            antigos = antigos[antigos["igual"] != 1]
+        if dados.empty:
+            return None
+        if len(antigos):
+            self._update_aggregates(con, antigos, sinal=-1)
+            ids = [(int(i),) for i in antigos["id"]]
+            if self.history:
+                nomes = ", ".join(["id"] + [s for _, s in _COLUMN_MAP] + ["ts"])
+                con.executemany(
+                    f"INSERT INTO revisoes ({nomes}, substituido_em) SELECT {nomes}, {_agora_ts()} "
+                    "FROM resultados WHERE id = ?",
+                    ids,
+                )
+            con.executemany("DELETE FROM resultados WHERE id = ?", ids)
+
+        # instante em segundos; o texto de data_hora mantém o formato anterior
+        # (e o original, se não for uma data reconhecível)
+        linhas = dados.copy()
+        horas = pd.to_datetime(linhas["Data/Hora"], errors="coerce")
+        linhas["Data/Hora"] = horas.dt.strftime("%Y-%m-%d %H:%M:%S").where(horas.notna(), linhas["Data/Hora"])
+        linhas["ts"] = ((horas - _EPOCH) // pd.Timedelta(seconds=1)).astype("Int64")
+        linhas = linhas.astype(object).where(linhas.notna(), None)
+        nomes = [s for _, s in _COLUMN_MAP] + ["ts"]
+        con.executemany(
+            f"INSERT INTO resultados ({', '.join(nomes)}) VALUES ({', '.join('?' for _ in nomes)})",
+            linhas.itertuples(index=False, name=None),
+        )
+        (ultimo,) = con.execute("SELECT last_insert_rowid()").fetchone()
+        primeiro = ultimo - len(linhas) + 1
+        self._update_aggregates(con, dados)
+        self._update_series(con, _ORIGEM_IDS, [(primeiro, ultimo)])
+        if len(antigos) and not self.history:
+            # sem histórico, o valor substituído sai das séries: as dessas chaves são refeitas
+            substituidas = list(antigos[RESULT_KEY].itertuples(index=False, name=None))
+            con.executemany(
+                "DELETE FROM series WHERE periodo = ? AND inovacao = ? AND indicador_pt = ? AND projeto = ?",
+                [(periodo, i, ind, p) for p, i, ind in substituidas for periodo in ROLLUP_PERIODS],
+            )
+            self._update_series(con, _ORIGEM_CHAVE, substituidas)
+        return primeiro, ultimo
+
+    def _update_aggregates(self, con: sqlite3.Connection, df: pd.DataFrame, sinal: int = 1):
+        """Soma (ou, com `sinal` -1, subtrai) o bloco `df` aos agregados, na mesma transação."""
+        agg = aggregate_results(df)
+        con.executemany(
+            "INSERT INTO agregados (projeto, inovacao, categoria, soma, contagem, linhas) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (projeto, inovacao, categoria) DO UPDATE SET "
+            "soma = soma + excluded.soma, contagem = contagem + excluded.contagem, "
+            "linhas = linhas + excluded.linhas",
+            (
+                (p, i, c, sinal * float(soma), sinal * int(cont), sinal * int(lin))
+                for p, i, c, soma, cont, lin in agg[AGG_KEYS + ["soma", "contagem", "linhas"]].itertuples(index=False, name=None)
+            ),
+        )
+        if sinal < 0:
+            con.execute("DELETE FROM agregados WHERE linhas <= 0")
+
+    def _update_series(self, con: sqlite3.Connection, origem: str, params: list):
+        """
+        Soma às séries por período os registos devolvidos pela consulta
+        `origem` (uma vez por cada conjunto de `params`), na mesma transação.
+        """
+        for periodo in ROLLUP_PERIODS:
+            con.executemany(
+                "INSERT INTO series "
+                "(periodo, projeto, inovacao, indicador_pt, inicio, contagem, soma, minimo, maximo) "
+                f"SELECT ?, COALESCE(projeto, ''), COALESCE(inovacao, ''), COALESCE(indicador_pt, ''), "
+                f"CAST(strftime('%s', {_PERIODOS_SQL[periodo]}) AS INTEGER), "
+                "COUNT(*), TOTAL(valor), MIN(valor), MAX(valor) "
+                f"FROM ({origem}) WHERE ts IS NOT NULL AND typeof(valor) IN ('integer', 'real') "
+                "GROUP BY 2, 3, 4, 5 "
+                "ON CONFLICT (periodo, inovacao, indicador_pt, projeto, inicio) DO UPDATE SET "
+                "contagem = contagem + excluded.contagem, soma = soma + excluded.soma, "
+                "minimo = MIN(minimo, excluded.minimo), maximo = MAX(maximo, excluded.maximo)",
+                [(periodo, *p) for p in params],
+            )
+
+    @staticmethod
+    def _converte(df: pd.DataFrame) -> pd.DataFrame:
+        """Nomes de coluna apresentados e data/hora como datetime (a partir de `ts`)."""
+        df = df.rename(columns=_FROM_SQL)
+        if "Data/Hora" in df.columns:
+            df["Data/Hora"] = pd.to_datetime(df["Data/Hora"], unit="s")
+        return df
+
+    @staticmethod
+    def _where(projeto: str = None, inovacao: str = None, mes: str = None, indicador: str = None):
+        """Condições sobre as colunas indexadas ("" também seleciona valores em falta)."""
+        cond, params = [], []
+        for col, val in (("projeto", projeto), ("inovacao", inovacao), ("mes", mes), ("indicador_pt", indicador)):
+            if val is None:
+                continue
+            if val == "":
+                cond.append(f"({col} IS NULL OR {col} = '')")
+            else:
+                cond.append(f"{col} = ?")
+                params.append(val)
+        return (" WHERE " + " AND ".join(cond)) if cond else "", params
+
+    def append(self, df: pd.DataFrame) -> int:
+        if df is None or df.empty:
+            return 0
+        (intervalo,) = self.append_many([df])
+        return intervalo[1] - intervalo[0] + 1 if intervalo else 0
+
+    def append_many(self, dfs) -> list:
+        """
+        Grava vários blocos de registos numa única transação.
+        Devolve, para cada bloco, o intervalo (primeiro_id, ultimo_id) gravado
+        ou None se o bloco estava vazio ou sem valores novos.
+        """
+        intervalos = []
+        con = self._connect()
+        try:
+            con.execute("PRAGMA synchronous=FULL")
+            with con:
+                for df in dfs:
+                    if df is None or df.empty:
+                        intervalos.append(None)
+                    else:
+                        intervalos.append(self._insert(con, df))
+                if any(intervalos):
+                    con.execute(
+                        "INSERT INTO meta (chave, valor) VALUES ('versao_dados', 1) "
+                        "ON CONFLICT (chave) DO UPDATE SET valor = CAST(valor AS INTEGER) + 1"
+                    )
+        finally:
+            con.close()
+        return intervalos
+
+    def read(
+        self,
+        projeto: str = None,
+        inovacao: str = None,
+        limit: int = None,
+        columns: list = None,
+        mes: str = None,
+        indicador: str = None,
+    ) -> pd.DataFrame:
+        where, params = self._where(projeto, inovacao, mes, indicador)
+        nomes = ", ".join(_SELECT[c] for c in (columns if columns is not None else RESULT_COLUMNS))
+        sql = f"SELECT id, {nomes} FROM resultados{where} ORDER BY id"
+        if limit is not None:
+            # os `limit` registos mais recentes, em ordem cronológica
+            sql = f"SELECT * FROM ({sql} DESC LIMIT {int(limit)}) ORDER BY id"
+        con = self._connect()
+        try:
+            df = pd.read_sql_query(sql, con, params=params)
+        finally:
+            con.close()
+        return self._converte(df.drop(columns="id"))
+
+    def read_chunks(
+        self,
+        projeto: str = None,
+        inovacao: str = None,
+        columns: list = None,
+        mes: str = None,
+        indicador: str = None,
+        chunksize: int = 50_000,
+        revisoes: bool = False,
+    ):
+        # uma só consulta, lida aos blocos (instantâneo consistente em modo WAL)
+        where, params = self._where(projeto, inovacao, mes, indicador)
+        nomes = ", ".join(_SELECT[c] for c in (columns if columns is not None else RESULT_COLUMNS))
+        sql = f"SELECT id, {nomes} FROM resultados{where}"
+        if revisoes:
+            # as revisões mantêm o id original: a ordem por id é a de submissão
+            revs = "(SELECT *, substr(data_hora, 1, 7) AS mes FROM revisoes)"
+            sql += f" UNION ALL SELECT id, {nomes} FROM {revs}{where}"
+            params = params * 2
+        con = self._connect()
+        try:
+            for df in pd.read_sql_query(f"{sql} ORDER BY id", con, params=params, chunksize=chunksize):
+                yield self._converte(df.drop(columns="id"))
+        finally:
+            con.close()
+
+    def aggregates(self, projeto: str = None, inovacao: str = None) -> pd.DataFrame:
+        where, params = self._where(projeto, inovacao)
+        con = self._connect()
+        try:
+            df = pd.read_sql_query(
+                f"SELECT projeto, inovacao, categoria, soma, contagem, linhas FROM agregados{where}",
+                con,
+                params=params,
+            )
+        finally:
+            con.close()
+        return df.rename(columns={"projeto": "Projeto", "inovacao": "Inovação", "categoria": "Categoria"})
+
+    def rollups(
+        self, periodo: str, projeto: str = None, inovacao: str = None, indicador: str = None
+    ) -> pd.DataFrame:
+        if periodo not in _PERIODOS_SQL:
+            raise ValueError(f"Período desconhecido: '{periodo}' (disponíveis: {', '.join(ROLLUP_PERIODS)}).")
+        where, params = self._where(projeto, inovacao, indicador=indicador)
+        where = (where + " AND" if where else " WHERE") + " periodo = ?"
+        con = self._connect()
+        try:
+            df = pd.read_sql_query(
+                "SELECT indicador_pt, inicio, SUM(contagem), TOTAL(soma) / SUM(contagem), MIN(minimo), MAX(maximo) "
+                f"FROM series{where} GROUP BY indicador_pt, inicio ORDER BY indicador_pt, inicio",
+                con,
+                params=params + [periodo],
+            )
+        finally:
+            con.close()
+        df.columns = ROLLUP_COLUMNS
+        df["Início"] = pd.to_datetime(df["Início"], unit="s")
+        return df
+
+    def revisions(self, projeto: str, inovacao: str, indicador: str) -> pd.DataFrame:
+        nomes = ", ".join(_SELECT[c] for c in RESULT_COLUMNS)
+        chave = " AND ".join(f"{c} = ?" for c in _CHAVE_SQL)
+        params = [projeto or "", inovacao or "", indicador or ""]
+        con = self._connect()
+        try:
+            df = pd.read_sql_query(
+                f"SELECT id, {nomes}, 0 AS atual FROM revisoes WHERE {chave} "
+                f"UNION ALL SELECT id, {nomes}, 1 FROM resultados WHERE {chave} ORDER BY id",
+                con,
+                params=params * 2,
+            )
+        finally:
+            con.close()
+        df = self._converte(df.drop(columns="id"))
+        return df.rename(columns={"atual": "Atual"}).astype({"Atual": bool})
+
+    def filter_options(self):
+        con = self._connect()
+        try:
+            projetos = [r[0] for r in con.execute("SELECT DISTINCT projeto FROM agregados ORDER BY projeto")]
+            inovacoes = [r[0] for r in con.execute("SELECT DISTINCT inovacao FROM agregados ORDER BY inovacao")]
+        finally:
+            con.close()
+        return projetos, inovacoes
+
+    def count(self) -> int:
+        con = self._connect()
+        try:
+            (n,) = con.execute("SELECT COALESCE(SUM(linhas), 0) FROM agregados").fetchone()
+        finally:
+            con.close()
+        return int(n)
+
+    def data_version(self) -> int:
+        con = self._connect()
+        try:
+            linha = con.execute("SELECT valor FROM meta WHERE chave = 'versao_dados'").fetchone()
+        finally:
+            con.close()
+        return int(linha[0]) if linha is not None else 0
+
+    def import_excel_once(self, path: str) -> int:
+        """
+        Importa um ficheiro de resultados Excel antigo (formato anterior ao
+        armazenamento SQLite). Só é executado uma vez por base de dados.
+        """
+        con = self._connect()
+        try:
+            ja = con.execute("SELECT valor FROM meta WHERE chave = 'importado_excel'").fetchone()
+        finally:
+            con.close()
+        if ja is not None or not os.path.exists(path):
+            return 0
+        antigo = pd.read_excel(path)
+        n = self.append(antigo)
+        con = self._connect()
+        try:
+            with con:
+                con.execute(
+                    "INSERT OR REPLACE INTO meta (chave, valor) VALUES ('importado_excel', ?)",
+                    (path,),
+                )
+        finally:
+            con.close()
+        return n
+
+
+# Backends disponíveis, por extensão do ficheiro
+_BACKENDS = {
+    ".sqlite": SQLiteResultsStore,
+    ".sqlite3": SQLiteResultsStore,
+    ".db": SQLiteResultsStore,
+}
+
+
+def register_backend(extension: str, cls):
+    """Regista um novo backend de resultados para uma extensão de ficheiro."""
+    _BACKENDS[extension.lower()] = cls
+
+
+def open_results_store(path: str, **opcoes) -> ResultsStore:
+    """Abre o backend de resultados adequado à extensão de `path` (`opcoes` seguem para o backend)."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in _BACKENDS:
+        raise ValueError(
+            f"Formato de armazenamento de resultados não suportado: '{ext}' "
+            f"(disponíveis: {', '.join(sorted(_BACKENDS))})."
+        )
+    return _BACKENDS[ext](path, **opcoes)
@@ -0,0 +1,55 @@
+# =========================
+# indicadores/tags.py - Índice invertido tag → inovações
+# =========================
+"""
+Tags das inovações (coluna Tags da InoDescTagsEng.xlsx) e índice invertido
+tag → inovações.
+
+O índice é construído uma vez por catálogo (ver catalogo.LazyCatalog,
+"indice_tags"); o filtro por tags da Página 1 é então uma interseção (todas
+as tags) ou união (pelo menos uma) de conjuntos, sem percorrer a tabela de
+inovações.
+"""
+
+import re
+
+import pandas as pd
+
+
+def split_tags(texto) -> list:
+    """Separa o texto da coluna Tags (separadores ';' ou ',')."""
+    if texto is None or (not isinstance(texto, str) and pd.isna(texto)):
+        return []
+    return [p.strip() for p in re.split(r"[;,]", str(texto)) if p.strip()]
+
+
+def build_tag_index(df_inov_tags: pd.DataFrame) -> dict:
+    """
+    Constrói o índice tag → inovações (tuplo ordenado, sem repetições).
+    Calculado uma vez por carregamento do catálogo.
+    """
+    index = {}
+    for inov, tags in zip(df_inov_tags["Inovação"].astype(str), df_inov_tags["Tags"]):
+        for t in split_tags(tags):
+            index.setdefault(t, set()).add(inov)
+    return {t: tuple(sorted(inovs)) for t, inovs in sorted(index.items())}
+
+
+def query_tags(index: dict, tags, mode: str = "AND") -> list:
+    """
+    Inovações que têm as `tags` indicadas (correspondência exata).
+    - mode="AND": todas as tags
+    - mode="OR": pelo menos uma das tags
+    """
+    tags = list(tags)
+    if not tags:
+        return []
+    conjuntos = [set(index.get(t, ())) for t in tags]
+    if mode.upper() == "AND":
+        conjuntos.sort(key=len)
+        res = conjuntos[0].intersection(*conjuntos[1:])
+    elif mode.upper() == "OR":
+        res = set().union(*conjuntos)
+    else:
+        raise ValueError(f"Modo de combinação de tags desconhecido: '{mode}' (use 'AND' ou 'OR').")
+    return sorted(res)
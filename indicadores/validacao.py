@@ -0,0 +1,168 @@
+# =========================
+# indicadores/validacao.py - Validação dos valores dos indicadores
+# =========================
+"""
+Validação dos valores introduzidos para cada indicador.
+
+`valida_valor` valida um valor isolado; `valida_lote` valida uma coluna
+inteira de uma só vez (formulário da Página 3 e importações em massa), com
+exatamente os mesmos resultados por linha.
+"""
+
+import functools
+import math
+
+import numpy as np
+import pandas as pd
+
+MSG_VAZIO = "Obrigatório preencher um valor."
+MSG_FRACAO = "Para fração, use 0–1 (ex.: 0.25 para 25%)."
+MSG_PERCENT = "Percentual deve estar entre 0 e 100."
+MSG_MONEY = "Valor monetário deve ser ≥ 0."
+MSG_INTEGER = "Deve ser inteiro ≥ 0."
+MSG_NONNEG = "Valor deve ser ≥ 0."
+MSG_FORMATO = "Formato inválido. Utilize apenas números (ponto ou vírgula)."
+
+
+def normaliza_num(texto: str) -> str:
+    if texto is None or (isinstance(texto, float) and math.isnan(texto)):
+        return ""
+    t = str(texto).strip().replace(",", ".")
+    return t
+
+
+@functools.lru_cache(maxsize=4096)
+def _infere_tipo(m: str) -> str:
+    if "%" in m or "percent" in m:
+        return "percent"
+    if "€" in m or "eur" in m or "euro" in m or "r$" in m or "$" in m:
+        return "money"
+    if any(u in m for u in ["tco2", "t co2", "t co₂", "t co2e", " t", "ton", "kg", "kwh", "m³", "m3", " l", " l/"]):
+        return "nonneg"
+    if "hora" in m or m.strip() == "h" or " h/" in m:
+        return "nonneg"
+    if "nº" in m or "num" in m or "publica" in m or "patent" in m or "contagem" in m:
+        return "integer"
+    return "nonneg"
+
+
+def infere_tipo(metrica: str) -> str:
+    """Classifica a métrica para validação numérica (memorizado por texto)."""
+    if not isinstance(metrica, str):
+        return "livre"
+    return _infere_tipo(metrica.lower())
+
+
+def valida_valor(valor_texto: str, metrica: str, fracao_percent=False):
+    """
+    Retorna (ok, valor_normalizado, msg_erro).
+    - percent: 0..100 (ou 0..1 se fracao_percent=True, converte para %)
+    - money/nonneg: >= 0
+    - integer: inteiro >= 0
+    """
+    tipo = infere_tipo(metrica)
+    t = normaliza_num(valor_texto)
+    if t == "":
+        return False, None, MSG_VAZIO
+    try:
+        if tipo == "percent":
+            x = float(t)
+            if fracao_percent:
+                if 0 <= x <= 1:
+                    return True, x * 100, ""
+                return False, None, MSG_FRACAO
+            else:
+                if 0 <= x <= 100:
+                    return True, x, ""
+                return False, None, MSG_PERCENT
+        elif tipo == "money":
+            x = float(t)
+            if x < 0:
+                return False, None, MSG_MONEY
+            return True, x, ""
+        elif tipo == "integer":
+            x = int(float(t))
+            if x < 0:
+                return False, None, MSG_INTEGER
+            return True, x, ""
+        else:
+            x = float(t)
+            if x < 0:
+                return False, None, MSG_NONNEG
+            return True, x, ""
+    except Exception:
+        return False, None, MSG_FORMATO
+
+
+def _broadcast(valor, index) -> pd.Series:
+    if isinstance(valor, pd.Series):
+        return pd.Series(valor.to_numpy(), index=index)
+    if np.ndim(valor) == 0:
+        return pd.Series([valor] * len(index), index=index, dtype=object)
+    return pd.Series(list(valor), index=index)
+
+
+def valida_lote(valores, metricas, fracao_percent=False) -> pd.DataFrame:
+    """
+    Valida uma coluna de valores brutos de uma só vez.
+    `metricas` e `fracao_percent` podem ser escalares ou sequências alinhadas
+    com `valores`. Devolve um DataFrame (ok, valor, msg), com o mesmo índice,
+    em que cada linha é igual a `valida_valor(valor, metrica, fracao)`.
+    """
+    valores = valores if isinstance(valores, pd.Series) else pd.Series(list(valores), dtype=object)
+    index = valores.index
+    n = len(valores)
+    metricas = _broadcast(metricas, index)
+    fracao = _broadcast(fracao_percent, index).fillna(False).astype(bool).to_numpy()
+
+    # 1) classificar cada texto de Mensuração distinto uma única vez
+    codes, uniques = pd.factorize(metricas.astype(object), use_na_sentinel=True)
+    tipos_u = np.array([infere_tipo(u) for u in uniques] + ["livre"], dtype=object)
+    tipos = tipos_u[codes]
+
+    # 2) normalizar e converter os textos em bloco
+    txt = valores.astype(object)
+    vazio = txt.isna().to_numpy()
+    t = txt.where(~vazio, "").astype(str).str.strip().str.replace(",", ".", regex=False)
+    vazio = vazio | (t == "").to_numpy()
+    # to_numeric só identifica os textos numéricos; a conversão usa float()
+    # (arredondamento exato, como em valida_valor)
+    parseavel = ~vazio & pd.to_numeric(t.where(~vazio, None), errors="coerce").notna().to_numpy()
+    x = np.full(n, np.nan)
+    try:
+        x[parseavel] = t.to_numpy(dtype=object)[parseavel].astype("float64")
+    except (ValueError, TypeError):
+        parseavel[:] = False
+
+    ok = np.zeros(n, dtype=bool)
+    valor = np.full(n, None, dtype=object)
+    msg = np.full(n, MSG_VAZIO, dtype=object)
+
+    # casos não numéricos/não finitos seguem o caminho escalar (mesma semântica de float())
+    especial = ~vazio & ~(parseavel & np.isfinite(x))
+    num = ~vazio & ~especial
+
+    def aplica(mask, valido, erro, conv=None):
+        sel_ok = mask & valido
+        sel_err = mask & ~valido
+        ok[sel_ok] = True
+        msg[sel_ok] = ""
+        vals = x[sel_ok] if conv is None else conv(x[sel_ok])
+        valor[sel_ok] = vals.tolist() if isinstance(vals, np.ndarray) else vals
+        msg[sel_err] = erro
+
+    with np.errstate(invalid="ignore"):
+        pct = num & (tipos == "percent")
+        aplica(pct & fracao, (x >= 0) & (x <= 1), MSG_FRACAO, conv=lambda v: v * 100)
+        aplica(pct & ~fracao, (x >= 0) & (x <= 100), MSG_PERCENT)
+        aplica(num & (tipos == "money"), x >= 0, MSG_MONEY)
+        aplica(num & (tipos == "integer"), np.trunc(x) >= 0, MSG_INTEGER, conv=lambda v: [int(i) for i in np.trunc(v)])
+        outros = num & ~np.isin(tipos, ["percent", "money", "integer"])
+        aplica(outros, x >= 0, MSG_NONNEG)
+
+    for pos in np.flatnonzero(especial):
+        ok[pos], valor[pos], msg[pos] = valida_valor(
+            valores.iloc[pos], metricas.iloc[pos], fracao_percent=bool(fracao[pos])
+        )
+
+    return pd.DataFrame({"ok": ok, "valor": valor, "msg": msg}, index=index)
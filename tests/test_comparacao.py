@@ -0,0 +1,111 @@
+"""Comparação entre projetos: sentido dos indicadores e pesos das categorias na pontuação global."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicadores.comparacao import (
+    SCORE_COLUMN,
+    SEM_CATEGORIA,
+    comparison_matrix,
+    composite_scores,
+    lower_is_better,
+    normalize_matrix,
+)
+
+
+def _resultados(linhas) -> pd.DataFrame:
+    return pd.DataFrame(
+        linhas, columns=["Projeto", "Indicador (PT)", "Categoria", "Mensuração (modelo)", "Valor Normalizado"]
+    )
+
+
+@pytest.fixture
+def comp():
+    # P1: mais barato e mais produtivo; P3: o contrário; "Área" sem categoria
+    return comparison_matrix(
+        _resultados(
+            [
+                ("P1", "Custo de produção", "Económica", "€", 100),
+                ("P2", "Custo de produção", "Económica", "€", 400),
+                ("P3", "Custo de produção", "Económica", "€", 900),
+                ("P1", "Produção anual", "Técnica", "kWh", 50),
+                ("P2", "Produção anual", "Técnica", "kWh", 30),
+                ("P3", "Produção anual", "Técnica", "kWh", 10),
+                ("P1", "Área", "", "índice", 1),
+                ("P2", "Área", "", "índice", 2),
+                ("P3", "Área", "", "índice", 3),
+            ]
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "indicador, metrica, esperado",
+    [
+        ("Custo total de manutenção", "€", True),
+        ("Emissões de CO2", "t CO2e", True),
+        ("Tempo de retorno (PBP)", "anos", True),
+        ("Redução de custos", "€", False),
+        ("Rácio benefício/custo", "", False),
+        ("Ineficiência energética", "%", True),
+        ("Produção anual", "kWh", False),
+    ],
+)
+def test_lower_is_better(indicador, metrica, esperado):
+    assert lower_is_better(indicador, metrica) is esperado
+
+
+def test_sentido_deduzido(comp):
+    assert dict(zip(comp.indicadores, comp.menor_melhor)) == {
+        "Custo de produção": True,
+        "Produção anual": False,
+        "Área": False,
+    }
+    z = normalize_matrix(comp, "minmax")
+    custo = comp.indicadores.index("Custo de produção")
+    # menor custo = melhor (1), maior custo = pior (0)
+    assert z[comp.projetos.index("P1"), custo] == 1.0
+    assert z[comp.projetos.index("P3"), custo] == 0.0
+
+
+def test_sentido_corrigido(comp):
+    z = normalize_matrix(comp, "zscore", menor_melhor=[])
+    custo = comp.indicadores.index("Custo de produção")
+    assert np.argmax(z[:, custo]) == comp.projetos.index("P3")
+
+
+@pytest.mark.parametrize("metodo", ["minmax", "zscore"])
+def test_pontuacao_e_posicao(comp, metodo):
+    pont = composite_scores(comp, metodo, pesos={SEM_CATEGORIA: 0})
+    assert pont["Projeto"].tolist() == ["P1", "P2", "P3"]
+    assert pont["Posição"].tolist() == [1, 2, 3]
+    assert SEM_CATEGORIA in pont.columns
+    assert pont["Indicadores"].tolist() == [3, 3, 3]
+
+
+def test_pesos(comp):
+    # "Área" favorece P3: com peso grande na categoria vazia, P3 passa à frente
+    pont = composite_scores(comp, "minmax", pesos={SEM_CATEGORIA: 10})
+    assert pont["Projeto"].iloc[0] == "P3"
+
+    # a média ponderada das categorias, com os pesos indicados
+    pesos = {"Económica": 2, "Técnica": 1, SEM_CATEGORIA: 0.5}
+    pont = composite_scores(comp, "minmax", pesos=pesos).set_index("Projeto")
+    esperado = sum(pont[c] * w for c, w in pesos.items()) / sum(pesos.values())
+    pd.testing.assert_series_equal(pont[SCORE_COLUMN], esperado, check_names=False)
+
+
+def test_categoria_sem_valores_nao_conta():
+    comp = comparison_matrix(
+        _resultados(
+            [
+                ("P1", "Produção anual", "Técnica", "kWh", 50),
+                ("P2", "Produção anual", "Técnica", "kWh", 30),
+                ("P2", "Receita", "Económica", "€", 10),
+            ]
+        )
+    )
+    pont = composite_scores(comp, "minmax", pesos={"Económica": 5}).set_index("Projeto")
+    assert np.isnan(pont.loc["P1", "Económica"])
+    assert pont.loc["P1", SCORE_COLUMN] == pont.loc["P1", "Técnica"] == 1.0
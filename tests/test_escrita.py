@@ -0,0 +1,57 @@
+"""ResultsWriter: cada submissão concorrente recebe a confirmação dos seus próprios registos."""
+
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.gerar_catalogo import generate_results
+from indicadores.escrita import ResultsWriter
+from indicadores.resultados import RESULT_KEY, SQLiteResultsStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteResultsStore(str(tmp_path / "r.sqlite"))
+
+
+def _submissao(k: int):
+    # um projeto por submissão, para reconhecer os registos de cada uma
+    df = generate_results(20 + k % 7, n_inovacoes=2, seed=k).assign(Projeto=f"Sessão {k:02d}")
+    return df.drop_duplicates(RESULT_KEY)
+
+
+def test_confirmacoes_concorrentes(store):
+    writer = ResultsWriter(store, espera_lote=0.05)
+    submissoes = [_submissao(k) for k in range(40)]
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        futuros = list(ex.map(writer.submit, submissoes))
+    confs = [f.result(timeout=30) for f in futuros]
+
+    con = sqlite3.connect(store.path)
+    try:
+        for k, (df, conf) in enumerate(zip(submissoes, confs)):
+            assert conf.registos == len(df)
+            assert conf.ultimo_id - conf.primeiro_id + 1 == len(df)
+            projetos = con.execute(
+                "SELECT DISTINCT projeto FROM resultados WHERE id BETWEEN ? AND ?", (conf.primeiro_id, conf.ultimo_id)
+            ).fetchall()
+            assert projetos == [(f"Sessão {k:02d}",)]
+    finally:
+        con.close()
+    assert store.count() == sum(len(df) for df in submissoes)
+
+
+def test_reenvio_e_erro_isolado(store):
+    writer = ResultsWriter(store, espera_lote=0.05)
+    df = _submissao(1)
+    assert writer.submit(df).result(timeout=30).registos == len(df)
+
+    # no mesmo lote: um reenvio sem alterações, uma submissão inválida e uma nova
+    futuros = [writer.submit(df), writer.submit("não é uma tabela"), writer.submit(_submissao(2))]
+    sem_alteracoes, invalida, nova = futuros
+    conf = sem_alteracoes.result(timeout=30)
+    assert (conf.registos, conf.primeiro_id, conf.ultimo_id) == (0, None, None)
+    with pytest.raises(Exception):
+        invalida.result(timeout=30)
+    assert nova.result(timeout=30).registos == len(_submissao(2))
@@ -0,0 +1,76 @@
+"""prepare_file: linhas aceites e motivo de cada linha rejeitada."""
+
+import datetime
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from indicadores.ingestao import MOTIVO_INDICADOR, MOTIVO_INOVACAO, _lookup_tables, prepare_file
+from indicadores.validacao import MSG_FORMATO, MSG_PERCENT, MSG_VAZIO
+
+
+@pytest.fixture(scope="module")
+def catalogo():
+    # vista por inovação (como em catalogo.build_innovation_view) e nomes do modelo
+    vista = {
+        "Rega": pd.DataFrame(
+            {
+                "Inovação": "Rega",
+                "Indicador": ["Poupança de água", "Taxa de adoção"],
+                "Indicadores_EN": ["Water savings (WS)", "Adoption rate"],
+                "Mensuração": ["m3", "%"],
+                "Categoria": ["Ambiental", "Social"],
+            }
+        ),
+    }
+    ind_meta = pd.DataFrame({"Indicadores": ["Water savings (WS)", "Adoption rate"]})
+    return SimpleNamespace(ind_meta=ind_meta), _lookup_tables(vista)
+
+
+def _ficheiro(tmp_path, linhas) -> str:
+    path = tmp_path / "entrada.csv"
+    pd.DataFrame(linhas, columns=["Projeto", "Inovação", "Indicador", "Valor"]).to_csv(path, index=False)
+    return str(path)
+
+
+def test_motivos(tmp_path, catalogo):
+    cat, tabelas = catalogo
+    path = _ficheiro(
+        tmp_path,
+        [
+            ("P1", "Rega", "Poupança de água", "12,5"),  # aceite pelo nome PT
+            ("P1", "Rega", "Water savings (WS)", "3"),  # aceite pelo mapeamento PT ↔ EN
+            ("P1", "Estufa", "Poupança de água", "1"),
+            ("P1", "Rega", "Indicador que não existe", "1"),
+            ("P1", "Rega", "Taxa de adoção", "150"),
+            ("P1", "Rega", "Taxa de adoção", "muito"),
+            ("P1", "Rega", "Poupança de água", ""),
+        ],
+    )
+    quando = datetime.datetime(2025, 3, 1, 12, 0, 0)
+    res = prepare_file(path, cat, tabelas, data_hora=quando)
+
+    assert (res["linhas"], res["aceites"]) == (7, 2)
+    registos = res["registos"]
+    assert registos["Indicador (PT)"].tolist() == ["Poupança de água", "Poupança de água"]
+    assert registos["Valor Normalizado"].tolist() == [12.5, 3.0]
+    assert (registos["Data/Hora"] == pd.Timestamp(quando)).all()
+
+    rejeitados = res["rejeitados"]
+    # nº da linha no ficheiro (cabeçalho = linha 1) e motivo
+    assert dict(zip(rejeitados["Linha"], rejeitados["Motivo"])) == {
+        4: MOTIVO_INOVACAO,
+        5: MOTIVO_INDICADOR,
+        6: MSG_PERCENT,
+        7: MSG_FORMATO,
+        8: MSG_VAZIO,
+    }
+
+
+def test_coluna_em_falta(tmp_path, catalogo):
+    cat, tabelas = catalogo
+    path = tmp_path / "sem_valor.csv"
+    pd.DataFrame({"Projeto": ["P1"], "Inovação": ["Rega"], "Indicador": ["Taxa de adoção"]}).to_csv(path, index=False)
+    with pytest.raises(ValueError, match="Valor"):
+        prepare_file(str(path), cat, tabelas)
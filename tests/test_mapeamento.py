@@ -0,0 +1,70 @@
+"""FuzzyIndex deve devolver sempre o mesmo que difflib.get_close_matches."""
+
+import difflib
+import random
+
+import pytest
+
+from indicadores.mapeamento import FuzzyIndex
+
+# vocabulário partilhado: muitas chaves com os mesmos trigramas
+_VOCABULARIO = "producao vinho media da hora area agua energia custo total emissoes taxa indice".split()
+
+
+def _catalogo(n: int, seed: int = 1) -> list:
+    rng = random.Random(seed)
+    chaves = set()
+    while len(chaves) < n:
+        nome = " ".join(rng.choice(_VOCABULARIO) for _ in range(rng.randint(1, 4)))
+        chaves.add(nome if rng.random() < 0.5 else f"{nome} {rng.randint(0, 99)}")
+    return sorted(chaves) + ["producao vinho", "producao media", "producao da"]
+
+
+def _altera(chave: str, rng: random.Random) -> str:
+    c = list(chave)
+    for _ in range(rng.randint(1, 3)):
+        p = rng.randrange(len(c) + 1)
+        op = rng.random()
+        if op < 0.4 and c:
+            c[min(p, len(c) - 1)] = rng.choice("abcdefghijklmnopqrstuvwxyz ")
+        elif op < 0.7:
+            c.insert(p, rng.choice("abcdefghijklmnopqrstuvwxyz "))
+        elif c:
+            del c[min(p, len(c) - 1)]
+    return "".join(c)
+
+
+def _difflib(query: str, chaves: list, cutoff: float = 0.8):
+    m = difflib.get_close_matches(query, chaves, n=1, cutoff=cutoff)
+    return m[0] if m else None
+
+
+@pytest.fixture(scope="module")
+def catalogo():
+    chaves = _catalogo(4000)
+    return chaves, FuzzyIndex(chaves)
+
+
+@pytest.mark.parametrize(
+    "query, esperado",
+    [
+        ("producao iinbo hor", "producao vinho"),
+        ("producao ihdia", "producao da"),
+    ],
+)
+def test_casos_adversos(catalogo, query, esperado):
+    chaves, index = catalogo
+    assert _difflib(query, chaves) == esperado
+    assert index.best_match(query) == esperado
+
+
+def test_igual_a_difflib(catalogo):
+    chaves, index = catalogo
+    rng = random.Random(7)
+    consultas = [_altera(rng.choice(chaves), rng) for _ in range(300)] + ["", "xyz", chaves[0]]
+    for q in consultas:
+        assert index.best_match(q) == _difflib(q, chaves), q
+
+
+def test_indice_vazio():
+    assert FuzzyIndex([]).best_match("producao") is None
@@ -0,0 +1,112 @@
+"""SQLiteResultsStore: upsert por chave, migração de bases antigas e agregados/séries coerentes com os registos."""
+
+import sqlite3
+
+import pandas as pd
+import pytest
+
+from benchmarks.gerar_catalogo import generate_results
+from indicadores.agregados import ROLLUP_PERIODS, aggregate_results, rollup_results
+from indicadores.resultados import _COLUMN_MAP, RESULT_KEY, SQLiteResultsStore
+
+
+def _ordena(df: pd.DataFrame, chaves: list) -> pd.DataFrame:
+    return df.sort_values(chaves).reset_index(drop=True)
+
+
+def _submetidos(store: SQLiteResultsStore) -> pd.DataFrame:
+    """Valores atuais e revisões mantidas, como lidos na vista "Valores submetidos"."""
+    return pd.concat(store.read_chunks(revisoes=True), ignore_index=True)
+
+
+def _confere(store: SQLiteResultsStore):
+    """Contagem, agregados e séries iguais aos recalculados a partir dos registos."""
+    atuais = store.read()
+    assert not atuais.duplicated(RESULT_KEY).any()
+    assert store.count() == len(atuais)
+    chaves = ["Projeto", "Inovação", "Categoria"]
+    agg = _ordena(store.aggregates(), chaves)
+    pd.testing.assert_frame_equal(agg, _ordena(aggregate_results(atuais)[agg.columns], chaves), check_dtype=False)
+    # as séries incluem as revisões quando o histórico está ativo
+    origem = _submetidos(store) if store.history else atuais
+    for periodo in ROLLUP_PERIODS:
+        pd.testing.assert_frame_equal(
+            _ordena(store.rollups(periodo), ["Indicador (PT)", "Início"]),
+            _ordena(rollup_results(origem, periodo), ["Indicador (PT)", "Início"]),
+            check_dtype=False,
+        )
+
+
+@pytest.fixture
+def dados():
+    return generate_results(600, n_inovacoes=3, n_projetos=20, seed=1)
+
+
+@pytest.mark.parametrize("history", [True, False])
+def test_upsert_substitui_por_chave(tmp_path, dados, history):
+    store = SQLiteResultsStore(str(tmp_path / "r.sqlite"), history=history)
+    store.append(dados)
+    _confere(store)
+
+    novos = dados.drop_duplicates(RESULT_KEY).iloc[:40].copy()
+    novos["Valor Normalizado"] += 1000
+    novos["Data/Hora"] += pd.Timedelta(days=60)
+    assert store.append(novos) == len(novos)
+    _confere(store)
+
+    k = novos.iloc[0]
+    revs = store.revisions(k["Projeto"], k["Inovação"], k["Indicador (PT)"])
+    assert revs["Atual"].tolist()[-1]
+    assert revs["Valor Normalizado"].tolist()[-1] == k["Valor Normalizado"]
+    assert (len(revs) > 1) == history
+
+
+def test_reenvio_igual_nao_altera(tmp_path, dados):
+    store = SQLiteResultsStore(str(tmp_path / "r.sqlite"))
+    unicos = dados.drop_duplicates(RESULT_KEY)
+    store.append(unicos)
+    antes, versao = store.read(), store.data_version()
+
+    assert store.append(unicos) == 0
+    pd.testing.assert_frame_equal(store.read(), antes)
+    assert store.data_version() == versao
+    assert len(store.revisions(*unicos.iloc[0][RESULT_KEY])) == 1
+
+
+def test_mudar_historico_recalcula_series(tmp_path, dados):
+    path = str(tmp_path / "r.sqlite")
+    store = SQLiteResultsStore(path, history=True)
+    store.append_many([dados, dados.assign(**{"Valor Normalizado": dados["Valor Normalizado"] + 1})])
+    _confere(store)
+    _confere(SQLiteResultsStore(path, history=False))
+    _confere(SQLiteResultsStore(path, history=True))
+
+
+def test_migracao_chave_unica(tmp_path, dados):
+    # base anterior ao índice único: só a tabela de resultados, com chaves repetidas
+    path = str(tmp_path / "antiga.sqlite")
+    cols = ", ".join(f"{s} NUMERIC" if s == "valor" else f"{s} TEXT" for _, s in _COLUMN_MAP)
+    antigos = dados.assign(**{"Data/Hora": dados["Data/Hora"].dt.strftime("%Y-%m-%d %H:%M:%S")})
+    nomes = ", ".join(s for _, s in _COLUMN_MAP)
+    marcas = ", ".join("?" for _ in _COLUMN_MAP)
+    con = sqlite3.connect(path)
+    with con:
+        con.execute(f"CREATE TABLE resultados (id INTEGER PRIMARY KEY AUTOINCREMENT, {cols})")
+        con.executemany(
+            f"INSERT INTO resultados ({nomes}) VALUES ({marcas})", antigos.astype(object).itertuples(index=False, name=None)
+        )
+    con.close()
+    assert dados.duplicated(RESULT_KEY).any()
+
+    store = SQLiteResultsStore(path)
+    atuais = store.read()
+    esperados = dados.drop_duplicates(RESULT_KEY, keep="last")
+    assert len(atuais) == len(esperados)
+    # fica o registo mais recente de cada chave
+    pd.testing.assert_series_equal(
+        atuais.set_index(RESULT_KEY)["Valor Normalizado"].sort_index(),
+        esperados.set_index(RESULT_KEY)["Valor Normalizado"].sort_index(),
+        check_dtype=False,
+    )
+    assert len(_submetidos(store)) == len(dados)
+    _confere(store)
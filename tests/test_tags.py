@@ -0,0 +1,56 @@
+"""Índice de tags: query_tags (AND/OR) igual ao filtro direto sobre a tabela de inovações."""
+
+import itertools
+
+import pandas as pd
+import pytest
+
+from indicadores.tags import build_tag_index, query_tags, split_tags
+
+
+@pytest.fixture(scope="module")
+def inovacoes():
+    return pd.DataFrame(
+        {
+            "Inovação": ["A", "B", "C", "D", "E", "A"],
+            "Tags": ["água; energia", "energia, solo", "solo;água;energia", None, "", "clima"],
+        }
+    )
+
+
+def _filtro(df: pd.DataFrame, tags: list, mode: str) -> list:
+    """Filtro de referência: percorre a tabela, como antes do índice."""
+    por_inov = {}
+    for inov, texto in zip(df["Inovação"], df["Tags"]):
+        por_inov.setdefault(inov, set()).update(split_tags(texto))
+    teste = all if mode == "AND" else any
+    return sorted(i for i, ts in por_inov.items() if tags and teste(t in ts for t in tags))
+
+
+def test_split_tags():
+    assert split_tags(" água ;energia,, solo ") == ["água", "energia", "solo"]
+    assert split_tags(None) == [] and split_tags(float("nan")) == []
+
+
+def test_indice(inovacoes):
+    index = build_tag_index(inovacoes)
+    assert index == {
+        "clima": ("A",),
+        "energia": ("A", "B", "C"),
+        "solo": ("B", "C"),
+        "água": ("A", "C"),
+    }
+
+
+@pytest.mark.parametrize("mode", ["AND", "OR", "and", "or"])
+def test_igual_ao_filtro(inovacoes, mode):
+    index = build_tag_index(inovacoes)
+    todas = list(index) + ["inexistente"]
+    for n in range(len(todas) + 1):
+        for tags in itertools.combinations(todas, n):
+            assert query_tags(index, tags, mode) == _filtro(inovacoes, list(tags), mode.upper()), tags
+
+
+def test_modo_desconhecido(inovacoes):
+    with pytest.raises(ValueError):
+        query_tags(build_tag_index(inovacoes), ["solo"], "XOR")
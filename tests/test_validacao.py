@@ -0,0 +1,56 @@
+"""valida_lote deve dar, linha a linha, o mesmo que valida_valor."""
+
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicadores.validacao import MSG_FORMATO, MSG_VAZIO, valida_lote, valida_valor
+
+_METRICAS = ["%", "Percentagem", "€", "Euros/ano", "t CO2e", "kWh", "Nº de patentes", "horas", "índice", None, 3.5]
+_VALORES = [
+    "", "  ", None, np.nan, "0", "1", "0,25", "0.5", "1.0", "42", "99.9", "100", "100.5", "-1", "-0,5", "2,7",
+    "1e3", "abc", "1,2,3", "nan", "inf", "-inf", " 7 ", "0x10", "1_000", 5, 0.3, -2,
+]
+
+
+def _igual(a, b) -> bool:
+    """Mesmo valor e mesmo tipo (NaN igual a NaN)."""
+    if isinstance(a, float) and isinstance(b, float) and np.isnan(a) and np.isnan(b):
+        return True
+    return a == b and type(a) is type(b)
+
+
+def _compara(valores, metricas, fracoes):
+    lote = valida_lote(pd.Series(valores, dtype=object), metricas, fracoes)
+    esperado = [valida_valor(v, m, f) for v, m, f in zip(valores, metricas, fracoes)]
+    for linha, (ok, valor, msg), v in zip(lote.itertuples(index=False), esperado, valores):
+        assert (linha.ok, linha.msg) == (ok, msg), v
+        assert _igual(linha.valor, valor), (v, linha.valor, valor)
+
+
+@pytest.mark.parametrize("fracao", [False, True])
+def test_todas_as_combinacoes(fracao):
+    pares = [(v, m) for v in _VALORES for m in _METRICAS]
+    valores, metricas = [v for v, _ in pares], [m for _, m in pares]
+    _compara(valores, metricas, [fracao] * len(pares))
+
+
+def test_aleatorio():
+    rng = random.Random(3)
+    n = 2000
+    valores = [
+        rng.choice(_VALORES) if rng.random() < 0.5 else f"{rng.uniform(-10, 200):.{rng.randint(0, 4)}f}"
+        for _ in range(n)
+    ]
+    metricas = [rng.choice(_METRICAS) for _ in range(n)]
+    fracoes = [rng.random() < 0.3 for _ in range(n)]
+    _compara(valores, metricas, fracoes)
+
+
+def test_escalares_e_indice():
+    valores = pd.Series(["1", "", "x"], index=[10, 20, 30])
+    lote = valida_lote(valores, "kWh")
+    assert lote.index.tolist() == [10, 20, 30]
+    assert lote["msg"].tolist() == ["", MSG_VAZIO, MSG_FORMATO]